@@ -0,0 +1,35 @@
+"""
+KCT knowledge build tooling.
+
+Discovers the research generators (``script*.py`` / ``chart_script*.py``)
+under the Update-Info and Customer Facing Chat trees and regenerates their
+CSV/JSON/PNG artifacts from a single entry point::
+
+    python -m kct_build            # rebuild stale generators
+    python -m kct_build --force    # rebuild everything
+    python -m kct_build --list     # show the dependency graph
+"""
+
+from .discovery import Generator, discover_generators
+from .errors import BuildError, GraphError
+from .graph import BuildGraph
+from .manifest import Manifest, stale_nodes
+from .render import FigureJob, RenderFarm, RenderResult
+from .runner import NodeResult, run_graph
+
+__version__ = "1.0.0"
+
+__all__ = [
+    "BuildError",
+    "BuildGraph",
+    "FigureJob",
+    "Generator",
+    "GraphError",
+    "Manifest",
+    "NodeResult",
+    "RenderFarm",
+    "RenderResult",
+    "discover_generators",
+    "run_graph",
+    "stale_nodes",
+]
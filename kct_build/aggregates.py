@@ -0,0 +1,243 @@
+"""
+Precomputed rankings and group-by aggregates.
+
+The generators compute their headline insights (``nlargest(8,
+'Search_Volume_2024')``, ``groupby('Peak_Season')`` ...) only to print
+them. The same tables are declared here and written as build artifacts so
+the API can look them up instead of re-sorting raw rows per request::
+
+    build/knowledge/
+        rankings/<name>.json        ordered rows + {row key: rank}
+        aggregates/<name>.parquet   one row per group
+        aggregates/index.json       every table with its source and hash
+
+Specs reference generated CSVs by file name, like :mod:`kct_build.schemas`,
+and mirror the computation in the script that prints them.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from . import config
+from .artifacts import collect_artifacts
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .schemas import SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.json"
+
+
+@dataclass(frozen=True)
+class TopN:
+    """``df.nlargest(n, column)[fields]``."""
+
+    name: str
+    source: str
+    column: str
+    n: int
+    fields: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class GroupBy:
+    """``df.groupby(by).agg(agg).round(1)``, optionally sorted descending."""
+
+    name: str
+    source: str
+    by: str
+    agg: Dict[str, str] = field(default_factory=dict)
+    sort_by: Optional[str] = None
+
+
+Spec = Union[TopN, GroupBy]
+
+SEARCH = "formal_menswear_search_themes.csv"
+PROM = "prom_to_lifetime_conversion.csv"
+REFERRAL = "referral_recommendation_triggers.csv"
+LIGHTING = "lighting_color_perception.csv"
+SOCIAL_PROOF = "social_proof_dynamics.csv"
+
+RANKINGS: Tuple[TopN, ...] = (
+    # Customer Facing Chat / Most Searched Questions
+    TopN("search_themes_top8", SEARCH, "Search_Volume_2024", 8),
+    TopN("specific_questions_top10", "top_specific_questions_2024.csv", "Monthly_Searches_2024", 10),
+    TopN("trending_patterns_fastest8", "trending_search_patterns.csv", "Growth_Rate_2024", 8),
+    # Emotional Triggers
+    TopN("emotional_triggers_top10", "emotional_triggers_menswear.csv", "Purchase_Likelihood_Increase", 10),
+    TopN("psychological_barriers_top6", "psychological_barriers_formalwear.csv", "Barrier_Strength", 6),
+    # Loyalty Triggers
+    TopN("attachment_triggers_top8", "emotional_attachment_triggers.csv", "Emotional_Impact_Score", 8),
+    TopN("prom_conversion_top8", PROM, "Conversion_Probability", 8),
+    TopN("prom_segments_ltv_top6", PROM, "Lifetime_Value_Multiplier", 6, (
+        "Conversion_Factor", "Customer_Segment", "Lifetime_Value_Multiplier",
+        "Conversion_Probability", "Advocacy_Likelihood",
+    )),
+    TopN("referral_triggers_top8", REFERRAL, "Referral_Likelihood", 8),
+    TopN("referral_contexts_reach_top6", REFERRAL, "Word_of_Mouth_Reach", 6, (
+        "Referral_Trigger", "Trigger_Context", "Word_of_Mouth_Reach",
+        "Referral_Likelihood", "Conversion_Rate_Referred",
+    )),
+    # Color Science
+    TopN("lighting_accuracy_top5", LIGHTING, "Overall_Accuracy", 5),
+    TopN("lighting_fabric_shift_top5", LIGHTING, "Fabric_Color_Shift", 5, (
+        "Lighting_Type", "Fabric_Color_Shift", "Color_Temperature_K",
+    )),
+    TopN("video_undertones_top8", "video_call_undertones.csv", "Video_Performance_Score", 8),
+    TopN("colorblind_challenges_top6", "colorblind_perception_analysis.csv", "Formal_Wear_Challenge_Score", 6),
+    # Social Proof
+    TopN("social_proof_top8", SOCIAL_PROOF, "Impact_on_Purchase_Decision", 8),
+    TopN("social_proof_gen_z_top5", SOCIAL_PROOF, "Gen_Z_Effectiveness", 5, (
+        "Social_Proof_Type", "Gen_Z_Effectiveness",
+    )),
+    TopN("social_proof_millennial_top5", SOCIAL_PROOF, "Millennial_Effectiveness", 5, (
+        "Social_Proof_Type", "Millennial_Effectiveness",
+    )),
+    TopN("social_media_behaviors_top8", "social_media_purchase_patterns.csv", "Purchase_Intent_Score", 8),
+    TopN("wedding_party_dynamics_top6", "wedding_party_group_dynamics.csv", "Decision_Weight", 6),
+    # Return Psychology
+    TopN("fit_complaints_top5", "customer_fit_language.csv", "Frequency (%)", 5),
+)
+
+AGGREGATES: Tuple[GroupBy, ...] = (
+    GroupBy("search_themes_by_season", SEARCH, "Peak_Season", {
+        "Search_Volume_2024": "sum", "Growth_Rate": "mean",
+    }),
+    GroupBy("search_themes_by_segment", SEARCH, "Customer_Segment", {
+        "Search_Volume_2024": "sum", "Growth_Rate": "mean",
+    }, sort_by="Search_Volume_2024"),
+    GroupBy("emotional_triggers_by_category", "emotional_triggers_menswear.csv", "Emotional_Category", {
+        "Purchase_Likelihood_Increase": "mean", "Emotional_Intensity": "mean",
+    }),
+    GroupBy("attachment_triggers_by_type", "emotional_attachment_triggers.csv", "Trigger_Type", {
+        "Emotional_Impact_Score": "mean", "Loyalty_Conversion_Rate": "mean", "Brand_Advocacy_Score": "mean",
+    }),
+    GroupBy("fit_issues_by_category", "customer_fit_language.csv", "Fit Issue Category", {
+        "Frequency (%)": "sum",
+    }, sort_by="Frequency (%)"),
+)
+
+
+def _require_pandas():
+    try:
+        import pandas as pd
+    except ImportError as exc:
+        raise BuildError(f"Aggregates require pandas ({exc})") from exc
+    return pd
+
+
+def _plain(value: Any) -> Any:
+    """numpy scalars -> JSON-native values."""
+    item = getattr(value, "item", None)
+    value = item() if callable(item) else value
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def compute_ranking(df, spec: TopN, key: Optional[str]) -> Dict[str, Any]:
+    top = df.nlargest(spec.n, spec.column)
+    if spec.fields:
+        top = top[list(spec.fields)]
+    rows = [{col: _plain(val) for col, val in row.items()} for row in top.to_dict("records")]
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    by_key = {}
+    if key is not None and key in top.columns:
+        by_key = {str(row[key]): row["rank"] for row in rows}
+    return {"name": spec.name, "metric": spec.column, "n": spec.n, "key": key, "rows": rows, "rank_by_key": by_key}
+
+
+def compute_aggregate(df, spec: GroupBy):
+    table = df.groupby(spec.by).agg(spec.agg).round(1)
+    table.insert(0, "count", df.groupby(spec.by).size())
+    if spec.sort_by is not None:
+        table = table.sort_values(spec.sort_by, ascending=False)
+    return table.reset_index()
+
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def write_aggregates(
+    graph: BuildGraph,
+    out_dir: Path = config.ARTIFACT_DIR,
+    rankings: Sequence[TopN] = RANKINGS,
+    aggregates: Sequence[GroupBy] = AGGREGATES,
+) -> Dict[str, Dict[str, Any]]:
+    """Compute every spec whose source CSV exists; returns the index."""
+    pd = _require_pandas()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    frames: Dict[str, Any] = {}
+
+    def frame(name: str):
+        if name not in frames:
+            frames[name] = pd.read_csv(sources[name].path)
+        return frames[name]
+
+    parquet = True
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        parquet = False
+        logger.warning("pyarrow not installed; writing aggregates as JSON")
+
+    ranking_dir = out_dir / config.RANKING_DIR.name
+    aggregate_dir = out_dir / config.AGGREGATE_DIR.name
+    ranking_dir.mkdir(parents=True, exist_ok=True)
+    aggregate_dir.mkdir(parents=True, exist_ok=True)
+    index: Dict[str, Dict[str, Any]] = {}
+
+    specs: List[Spec] = [*rankings, *aggregates]
+    for spec in specs:
+        artifact = sources.get(spec.source)
+        if artifact is None:
+            logger.warning("Aggregate %s: source %s was not generated", spec.name, spec.source)
+            continue
+        try:
+            df = frame(spec.source)
+            if isinstance(spec, TopN):
+                schema = SCHEMAS.get(spec.source)
+                payload = compute_ranking(df, spec, schema.key if schema else None)
+                payload["source"] = config.display_path(artifact.path)
+                path = ranking_dir / f"{spec.name}.json"
+                _write_json(path, payload)
+                rows = len(payload["rows"])
+            else:
+                table = compute_aggregate(df, spec)
+                if parquet:
+                    path = aggregate_dir / f"{spec.name}.parquet"
+                    tmp = path.with_suffix(".parquet.tmp")
+                    table.to_parquet(tmp, index=False)
+                    os.replace(tmp, path)
+                else:
+                    path = aggregate_dir / f"{spec.name}.json"
+                    _write_json(path, {"name": spec.name, "rows": table.to_dict("records")})
+                rows = len(table)
+        except (KeyError, ValueError, TypeError) as exc:
+            logger.warning("Aggregate %s failed: %s", spec.name, exc)
+            continue
+        index[spec.name] = {
+            "path": path.relative_to(out_dir).as_posix(),
+            "kind": "ranking" if isinstance(spec, TopN) else "aggregate",
+            "source": config.display_path(artifact.path),
+            "producer": artifact.producer,
+            "source_sha256": hash_file(artifact.path),
+            "rows": rows,
+        }
+
+    _write_json(aggregate_dir / INDEX_NAME, {"tables": index})
+    logger.info("Wrote %d precomputed rankings/aggregates", len(index))
+    return index
@@ -0,0 +1,260 @@
+"""
+Graduation-season inventory allocation.
+
+Turns ``graduation_season_timing.csv`` into a week-by-week plan for
+sending stock to stores between 1 March and 31 August::
+
+    python -m kct_build.allocation stock.csv --stores stores.csv -o plan.csv
+
+``stock.csv`` has ``Size,Color,Units`` (one row per SKU), ``stores.csv``
+has ``Store,Demand_Share``; the plan has ``Week,Week_Start,Size,Color,
+Store,Units``.
+
+Demand for SKU ``k`` at store ``j`` in week ``w`` is the season total
+(all stock by default) split by
+
+* week: each month's Graduation_Volume_Percentage, bought evenly over
+  the Peak_Purchase_Window_Days before that month's mid-day graduations
+  (purchases before 1 March land in the first week),
+* SKU: the stock mix, with sizes whose fit (``slim``, ``classic`` ...)
+  appears in the month's Size_Range_Demand and colours named in its
+  Color_Preference_Trend weighted up by :data:`PREFERENCE_BOOST`,
+* store: Demand_Share.
+
+The plan is the linear program::
+
+    maximise    sum  value[w] * x[k, j, w]
+    subject to  0 <= x[k, j, w] <= demand[k, j, w]
+                sum_{j, w} x[k, j, w] <= stock[k]
+
+with ``value[k, w]`` the Average_Spend_Per_Customer x
+Inventory_Turnover_Rate (revenue per unit of shelf time) of the months
+whose purchase windows make up SKU ``k``'s demand in week ``w``, weighted
+by that demand. Week and SKU shares are both taken per graduation month,
+not per calendar month: April purchases for May graduations are priced
+and mixed as May demand. SKUs share no constraint and the value does not
+depend on the store, so the optimum is closed-form: each SKU's stock
+fills weeks in descending value order, split across stores in proportion
+to demand. :func:`plan_allocation`
+computes that for every SKU x store x week at once (one sort, one
+cumulative sum) instead of calling a solver per SKU; whole units are
+assigned by flooring the running total, so no SKU is over-allocated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from .errors import BuildError
+
+logger = logging.getLogger(__name__)
+
+GRADUATION = "graduation_season_timing.csv"
+SEASON_START = (3, 1)
+SEASON_END = (8, 31)
+GRADUATION_DAY = 15
+PREFERENCE_BOOST = 2.0
+# Size_Range_Demand phrases that favour no particular fit.
+ALL_SIZES = ("all", "basic")
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"The allocation optimizer requires numpy ({exc})") from exc
+    return np
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in re.split(r"[^a-z]+", text.lower()) if t]
+
+
+def _phrases(text: str) -> List[str]:
+    return [" ".join(_tokens(part)) for part in re.split(r"[,/]", text) if _tokens(part)]
+
+
+@dataclass
+class AllocationPlan:
+    """``units[k, j, w]`` for SKUs ``(sizes[k], colors[k])``, ``stores[j]`` and ``weeks[w]``."""
+
+    sizes: List[str]
+    colors: List[str]
+    stores: List[str]
+    weeks: List[datetime.date]
+    units: Any
+    demand: Any
+
+    def rows(self) -> List[Dict[str, Any]]:
+        np = _require_numpy()
+        out = []
+        for k, j, w in zip(*np.nonzero(self.units)):
+            out.append({
+                "Week": int(w) + 1,
+                "Week_Start": self.weeks[w].isoformat(),
+                "Size": self.sizes[k],
+                "Color": self.colors[k],
+                "Store": self.stores[j],
+                "Units": int(self.units[k, j, w]),
+            })
+        return sorted(out, key=lambda r: (r["Week"], r["Store"], r["Size"], r["Color"]))
+
+
+def season_weeks(year: int) -> List[datetime.date]:
+    start, end = datetime.date(year, *SEASON_START), datetime.date(year, *SEASON_END)
+    return [start + datetime.timedelta(days=7 * i) for i in range(((end - start).days // 7) + 1)]
+
+
+def week_shares(np, timing: Sequence[Mapping[str, Any]], weeks: Sequence[datetime.date]):
+    """``[M, W]`` share of the season bought in each week for each month's graduations."""
+    start = weeks[0]
+    edges = np.array([(week - start).days for week in weeks] + [(weeks[-1] - start).days + 7], dtype=float)
+    share = np.zeros((len(timing), len(weeks)))
+    for m, row in enumerate(timing):
+        month = datetime.datetime.strptime(str(row["Month"]), "%B").month
+        graduation = (datetime.date(start.year, month, GRADUATION_DAY) - start).days
+        window = max(float(row["Peak_Purchase_Window_Days"]), 1.0)
+        low, high = max(graduation - window, 0.0), max(graduation, 0.0)
+        overlap = np.clip(np.minimum(edges[1:], high) - np.maximum(edges[:-1], low), 0, None)
+        if overlap.sum() == 0:
+            overlap[0] = 1.0
+        share[m] = float(row["Graduation_Volume_Percentage"]) / 100 * overlap / overlap.sum()
+    return share / share.sum()
+
+
+def sku_mix(np, sizes: Sequence[str], colors: Sequence[str], stock, timing: Sequence[Mapping[str, Any]]):
+    """``[K, M]`` share of each month's demand falling on each SKU."""
+    weights = np.empty((len(sizes), len(timing)))
+    size_tokens = [set(_tokens(size)) for size in sizes]
+    color_names = [" ".join(_tokens(color)) for color in colors]
+    for m, row in enumerate(timing):
+        fits = set(_tokens(str(row["Size_Range_Demand"]))) - {"fit", "sizes", "peak"}
+        any_fit = bool(fits & set(ALL_SIZES))
+        preferred = set(_phrases(str(row["Color_Preference_Trend"])))
+        fit_hit = np.array([not any_fit and bool(tokens & fits) for tokens in size_tokens])
+        color_hit = np.array([any(p == name or p.endswith(" " + name) for p in preferred) for name in color_names])
+        weights[:, m] = stock * np.where(fit_hit, PREFERENCE_BOOST, 1.0) * np.where(color_hit, PREFERENCE_BOOST, 1.0)
+    totals = weights.sum(axis=0, keepdims=True)
+    return weights / np.where(totals > 0, totals, 1)
+
+
+def plan_allocation(
+    sizes: Sequence[str],
+    colors: Sequence[str],
+    stock: Sequence[float],
+    stores: Mapping[str, float],
+    timing: Sequence[Mapping[str, Any]],
+    season_units: Optional[float] = None,
+    year: Optional[int] = None,
+) -> AllocationPlan:
+    """Solve the allocation LP (see the module docstring) for every SKU x store x week."""
+    np = _require_numpy()
+    stock = np.asarray(stock, dtype=float)
+    store_names = list(stores)
+    store_share = np.array([float(stores[s]) for s in store_names])
+    store_share = store_share / store_share.sum()
+    weeks = season_weeks(year or datetime.date.today().year)
+
+    shares = week_shares(np, timing, weeks)                                       # [M, W]
+    by_month = sku_mix(np, sizes, colors, stock, timing)[:, :, None] * shares[None]   # [K, M, W]
+    mix = by_month.sum(axis=1)                                                    # [K, W]
+    total = stock.sum() if season_units is None else float(season_units)
+    demand = total * mix[:, None, :] * store_share[None, :, None]                 # [K, J, W]
+
+    # A week's units are worth what the graduations buying in it spend.
+    month_value = np.array([
+        float(row["Average_Spend_Per_Customer"]) * float(row["Inventory_Turnover_Rate"]) for row in timing
+    ])
+    value = np.divide(
+        (by_month * month_value[None, :, None]).sum(axis=1), mix, out=np.zeros_like(mix), where=mix > 0,
+    )
+    order = np.argsort(-value, axis=1, kind="stable")                            # [K, W] weeks, best first
+    weekly = np.take_along_axis(demand.sum(axis=1), order, axis=1)               # [K, W]
+    before = np.cumsum(weekly, axis=1) - weekly
+    filled = np.clip(stock[:, None] - before, 0, weekly)                         # fractional optimum
+    ratio = np.divide(filled, weekly, out=np.zeros_like(filled), where=weekly > 0)
+    exact = np.take_along_axis(demand, order[:, None, :], axis=2) * ratio[:, None, :]  # [K, J, W] in value order
+
+    # Whole units: floor the running total per SKU, so sums never exceed stock.
+    flat = exact.transpose(0, 2, 1).reshape(len(stock), -1)
+    running = np.floor(np.cumsum(flat, axis=1) + 1e-9)
+    units = np.diff(running, axis=1, prepend=0).reshape(len(stock), len(weeks), len(store_names))
+    units = np.take_along_axis(units.transpose(0, 2, 1), np.argsort(order, axis=1)[:, None, :], axis=2)
+    units = units.astype(np.int64)
+    return AllocationPlan(list(sizes), list(colors), store_names, weeks, units, demand)
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def _read_csv(path: Path) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        return list(csv.DictReader(fh))
+
+
+def _timing_path() -> Path:
+    from .artifacts import collect_artifacts
+    from .discovery import discover_generators
+    from .graph import BuildGraph
+
+    for artifact in collect_artifacts(BuildGraph(discover_generators()), suffixes=[".csv"]):
+        if artifact.path.name == GRADUATION:
+            return artifact.path
+    raise BuildError(f"{GRADUATION} has not been generated; run python -m kct_build first")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="kct_build.allocation", description="Graduation-season inventory allocation.")
+    parser.add_argument("stock", type=Path, help="CSV with Size,Color,Units per SKU")
+    parser.add_argument("--stores", type=Path, help="CSV with Store,Demand_Share (default: one store)")
+    parser.add_argument("--timing", type=Path, help=f"graduation timing table (default: the generated {GRADUATION})")
+    parser.add_argument("--season-units", type=float, help="expected season demand in units (default: total stock)")
+    parser.add_argument("--year", type=int, help="season year for week dates (default: this year)")
+    parser.add_argument("-o", "--output", type=Path, help="plan CSV (default: stdout)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    try:
+        stock = _read_csv(args.stock)
+        stores = {"all": 1.0}
+        if args.stores:
+            stores = {row["Store"]: float(row["Demand_Share"]) for row in _read_csv(args.stores)}
+        timing = _read_csv(args.timing or _timing_path())
+        plan = plan_allocation(
+            [row["Size"] for row in stock],
+            [row["Color"] for row in stock],
+            [float(row["Units"]) for row in stock],
+            stores, timing, args.season_units, args.year,
+        )
+    except (BuildError, OSError, KeyError, ValueError) as exc:
+        logger.error("%s", exc)
+        return 2
+
+    fields = ["Week", "Week_Start", "Size", "Color", "Store", "Units"]
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(plan.rows())
+    finally:
+        if args.output:
+            out.close()
+    logger.info(
+        "Allocated %d of %d units (%d SKUs x %d stores x %d weeks)",
+        int(plan.units.sum()), int(sum(float(r["Units"]) for r in stock)),
+        len(stock), len(stores), len(plan.weeks),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
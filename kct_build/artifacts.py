@@ -0,0 +1,57 @@
+"""Enumerate the artifacts written by the generators in a build graph."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .graph import BuildGraph
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """One file produced by a generator."""
+
+    path: Path
+    topic: str
+    slug: str
+    producer: str
+
+    @property
+    def name(self) -> str:
+        """Dataset name: the file stem (``promotion_signals``)."""
+        return self.path.stem
+
+    @property
+    def suffix(self) -> str:
+        return self.path.suffix.lower()
+
+    @property
+    def key(self) -> str:
+        """Tree-unique dataset key: ``<topic-slug>/<name>``."""
+        return f"{self.slug}/{self.name}"
+
+
+def collect_artifacts(
+    graph: BuildGraph,
+    suffixes: Optional[Sequence[str]] = None,
+    existing_only: bool = True,
+) -> List[Artifact]:
+    """Artifacts in graph order, optionally filtered by file suffix.
+
+    A file written by several generators (``script.py`` / ``script_1.py``)
+    is reported once, attributed to its last writer.
+    """
+    wanted = {s.lower() for s in suffixes} if suffixes else None
+    by_path = {}
+    for node_id in graph.topological_order():
+        gen = graph.nodes[node_id]
+        for path in gen.output_paths():
+            if wanted is not None and path.suffix.lower() not in wanted:
+                continue
+            if existing_only and not path.is_file():
+                continue
+            by_path.pop(path, None)
+            by_path[path] = Artifact(path=path, topic=gen.topic, slug=gen.slug, producer=node_id)
+    return sorted(by_path.values(), key=lambda a: (a.slug, a.name, a.suffix))
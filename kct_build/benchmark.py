@@ -0,0 +1,225 @@
+"""
+Build benchmarks and regression gates.
+
+``python -m kct_build --benchmark`` regenerates the selected generators and
+records, per run:
+
+* wall time of the whole build,
+* per generator: run time, peak RSS (high-water mark reset before each
+  script, see :func:`kct_build.harness.peak_rss`) and status,
+* per rendered figure: render time and PNG bytes,
+* per artifact: bytes on disk, grouped by kind (csv / json / png),
+* per topic: the sum of its generator and render seconds, its largest
+  peak RSS and its artifact bytes.
+
+Runs are appended to ``.kct-build/benchmarks.json``. Each topic metric is
+compared with the median of the last :data:`BASELINE_RUNS` comparable runs
+(same ``jobs`` / ``renderers``); growth beyond the threshold *and* beyond a
+small absolute floor is a regression and fails the command.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import config
+from .graph import BuildGraph
+from .runner import NodeResult
+
+logger = logging.getLogger(__name__)
+
+HISTORY_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+BASELINE_RUNS = 5
+MAX_HISTORY = 200
+
+# Differences below these floors are noise, whatever the ratio.
+MIN_DELTA = {
+    "seconds": 0.5,
+    "peak_rss": 32 * 1024 * 1024,
+    "bytes": 64 * 1024,
+}
+
+Run = Dict[str, Any]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=config.ROOT, capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def collect(
+    graph: BuildGraph,
+    results: Iterable[NodeResult],
+    wall_seconds: float,
+    jobs: Optional[int],
+    renderers: int,
+    output_root: Optional[Path] = None,
+) -> Run:
+    """Turn one build's results into a benchmark run record."""
+    generators: Dict[str, Dict[str, Any]] = {}
+    renders: Dict[str, Dict[str, Any]] = {}
+    artifacts: Dict[str, Dict[str, Any]] = {}
+    topics: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"seconds": 0.0, "peak_rss": 0, "bytes": 0})
+    incomplete = set()
+
+    for result in results:
+        gen = graph.nodes[result.node_id]
+        topic = topics[gen.slug]
+        generators[result.node_id] = {
+            "status": result.status,
+            "seconds": round(result.duration, 4),
+            "peak_rss": result.peak_rss,
+        }
+        if not result.ok:
+            incomplete.add(gen.slug)
+            continue
+        topic["seconds"] += result.duration
+        topic["peak_rss"] = max(topic["peak_rss"], result.peak_rss)
+        for rendered in result.renders:
+            renders[f"{gen.slug}/{os.path.basename(rendered.path)}"] = {
+                "node": result.node_id,
+                "seconds": round(rendered.duration, 4),
+                "bytes": rendered.size,
+            }
+            topic["seconds"] += rendered.duration
+
+        directory = output_root / gen.topic if output_root is not None else gen.directory
+        for name in gen.outputs:
+            path = Path(os.path.normpath(directory / name))
+            if not path.is_file():
+                continue
+            key = f"{gen.slug}/{os.path.normpath(name)}"
+            if key in artifacts:
+                continue
+            size = path.stat().st_size
+            artifacts[key] = {"topic": gen.slug, "kind": path.suffix.lower().lstrip("."), "bytes": size}
+            topic["bytes"] += size
+
+    for slug, topic in topics.items():
+        topic["seconds"] = round(topic["seconds"], 4)
+        topic["complete"] = slug not in incomplete
+
+    by_kind: Dict[str, int] = defaultdict(int)
+    for entry in artifacts.values():
+        by_kind[entry["kind"]] += entry["bytes"]
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": _git_commit(),
+        "jobs": jobs,
+        "renderers": renderers,
+        "wall_seconds": round(wall_seconds, 4),
+        "bytes_by_kind": dict(sorted(by_kind.items())),
+        "topics": dict(sorted(topics.items())),
+        "generators": generators,
+        "renders": renders,
+        "artifacts": artifacts,
+    }
+
+
+# ----------------------------------------------------------------------
+# History
+# ----------------------------------------------------------------------
+
+def load_history(path: Path = config.BENCHMARK_PATH) -> List[Run]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return []
+    if data.get("version") != HISTORY_VERSION:
+        return []
+    return list(data.get("runs", []))
+
+
+def save_history(runs: List[Run], path: Path = config.BENCHMARK_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": HISTORY_VERSION, "runs": runs[-MAX_HISTORY:]}, fh, indent=1)
+    os.replace(tmp, path)
+
+
+def baseline(history: List[Run], run: Run, slug: str, metric: str) -> Optional[float]:
+    """Median of ``metric`` for ``slug`` over recent comparable runs."""
+    values = [
+        past["topics"][slug][metric]
+        for past in history
+        if past.get("jobs") == run.get("jobs")
+        and past.get("renderers") == run.get("renderers")
+        and past.get("topics", {}).get(slug, {}).get("complete")
+    ][-BASELINE_RUNS:]
+    return statistics.median(values) if values else None
+
+
+def regressions(run: Run, history: List[Run], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Human-readable description of every topic metric that regressed."""
+    found: List[str] = []
+    for slug, topic in run["topics"].items():
+        if not topic.get("complete"):
+            continue
+        for metric, floor in MIN_DELTA.items():
+            base = baseline(history, run, slug, metric)
+            if not base:
+                continue
+            current = topic[metric]
+            if current > base * (1 + threshold) and current - base > floor:
+                found.append(
+                    f"{slug}: {metric} {_fmt(metric, current)} vs baseline {_fmt(metric, base)} "
+                    f"(+{(current / base - 1) * 100:.0f}%)"
+                )
+    return found
+
+
+def _fmt(metric: str, value: float) -> str:
+    if metric == "seconds":
+        return f"{value:.2f}s"
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+def summarize(run: Run) -> None:
+    logger.info("%-52s %8s %10s %10s", "topic", "seconds", "peak RSS", "bytes")
+    for slug, topic in sorted(run["topics"].items(), key=lambda item: -item[1]["seconds"]):
+        logger.info(
+            "%-52s %8.2f %8.1f MB %7.1f KB%s",
+            slug[:52], topic["seconds"], topic["peak_rss"] / (1024 * 1024), topic["bytes"] / 1024,
+            "" if topic["complete"] else "  (incomplete)",
+        )
+    logger.info(
+        "Build wall time %.2fs; artifact bytes %s",
+        run["wall_seconds"],
+        ", ".join(f"{kind} {size / 1024:.0f} KB" for kind, size in run["bytes_by_kind"].items()),
+    )
+
+
+def record(
+    run: Run,
+    threshold: float = DEFAULT_THRESHOLD,
+    path: Path = config.BENCHMARK_PATH,
+) -> bool:
+    """Gate ``run`` against history, then append it. Returns ``False`` on regression."""
+    history = load_history(path)
+    summarize(run)
+    found = regressions(run, history, threshold)
+    for message in found:
+        logger.error("regression  %s", message)
+    history.append(run)
+    save_history(history, path)
+    if not found:
+        logger.info("No regressions beyond %.0f%% (%d earlier runs)", threshold * 100, len(history) - 1)
+    return not found
@@ -0,0 +1,143 @@
+"""
+Typed columnar knowledge bundle.
+
+Every CSV a generator writes is re-read once at build time, given an
+explicit Arrow schema (``int64`` / ``float64`` / ``bool`` / ``string``) and
+written to an uncompressed Arrow IPC file that consumers can memory-map
+instead of stream-parsing CSV text::
+
+    build/knowledge/bundle/
+        <topic-slug>.arrow   one per topic
+        knowledge.arrow      every dataset in the tree
+        schema.json          column types, row counts and source hashes
+
+Each ``.arrow`` file holds a single row with one column per dataset, typed
+``list<struct<...>>``; the struct children are the dataset's typed columns.
+Column keys are the dataset name in topic files and ``<topic-slug>/<name>``
+in the combined file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from . import config
+from .artifacts import Artifact, collect_artifacts
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+COMBINED_NAME = "knowledge.arrow"
+SCHEMA_NAME = "schema.json"
+
+
+def _require_pyarrow():
+    try:
+        import pandas as pd
+        import pyarrow as pa
+    except ImportError as exc:
+        raise BuildError(f"Columnar bundle requires pandas and pyarrow ({exc})") from exc
+    return pd, pa
+
+
+def _arrow_type(pa, dtype):
+    kind = getattr(dtype, "kind", "O")
+    if kind in "iu":
+        return pa.int64()
+    if kind == "f":
+        return pa.float64()
+    if kind == "b":
+        return pa.bool_()
+    return pa.string()
+
+
+def read_typed_table(path: Path):
+    """Read a generated CSV into a ``pyarrow.Table`` with an explicit schema."""
+    pd, pa = _require_pyarrow()
+    df = pd.read_csv(path)
+    schema = pa.schema([pa.field(str(col), _arrow_type(pa, df[col].dtype)) for col in df.columns])
+    for field in schema:
+        if pa.types.is_string(field.type):
+            df[field.name] = df[field.name].astype(object).where(df[field.name].notna(), None)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def _dataset_column(pa, table, artifact: Artifact, key: str):
+    """Wrap ``table`` as a one-element ``list<struct>`` column named ``key``."""
+    children = [table.column(i).combine_chunks() for i in range(table.num_columns)]
+    rows = pa.StructArray.from_arrays(children, fields=list(table.schema))
+    column = pa.ListArray.from_arrays(pa.array([0, table.num_rows], type=pa.int32()), rows)
+    metadata = {
+        "source": config.display_path(artifact.path),
+        "producer": artifact.producer,
+        "rows": str(table.num_rows),
+    }
+    return pa.field(key, column.type, metadata=metadata), column
+
+
+def _write_ipc(pa, path: Path, fields, columns) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_arrays(columns, schema=pa.schema(fields))
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def write_bundle(graph: BuildGraph, out_dir: Path = config.BUNDLE_DIR) -> Dict[str, Dict[str, object]]:
+    """Write per-topic and combined Arrow bundles for every generated CSV.
+
+    Returns the schema description that is also written to ``schema.json``.
+    """
+    _, pa = _require_pyarrow()
+    by_topic: Dict[str, List[Tuple[Artifact, object]]] = defaultdict(list)
+    description: Dict[str, Dict[str, object]] = {}
+
+    for artifact in collect_artifacts(graph, suffixes=[".csv"]):
+        try:
+            table = read_typed_table(artifact.path)
+        except Exception as exc:
+            logger.warning("Skipping %s in bundle: %s", artifact.path.name, exc)
+            continue
+        by_topic[artifact.slug].append((artifact, table))
+        description[artifact.key] = {
+            "source": artifact.path.name,
+            "topic": artifact.topic,
+            "rows": table.num_rows,
+            "sha256": hash_file(artifact.path),
+            "columns": {field.name: str(field.type) for field in table.schema},
+        }
+
+    combined_fields, combined_columns = [], []
+    for slug, entries in sorted(by_topic.items()):
+        fields, columns = [], []
+        for artifact, table in entries:
+            field, column = _dataset_column(pa, table, artifact, artifact.name)
+            fields.append(field)
+            columns.append(column)
+            combined_fields.append(field.with_name(artifact.key))
+            combined_columns.append(column)
+        _write_ipc(pa, out_dir / f"{slug}.arrow", fields, columns)
+
+    _write_ipc(pa, out_dir / COMBINED_NAME, combined_fields, combined_columns)
+    with open(out_dir / SCHEMA_NAME, "w", encoding="utf-8") as fh:
+        json.dump({"datasets": description}, fh, indent=2, sort_keys=True)
+
+    logger.info("Bundled %d datasets from %d topics into %s", len(description), len(by_topic), out_dir)
+    return description
+
+
+def load_dataset(bundle_path: Path, key: str):
+    """Memory-map ``bundle_path`` and return dataset ``key`` as a ``pyarrow.Table``."""
+    _, pa = _require_pyarrow()
+    with pa.memory_map(str(bundle_path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    rows = table.column(key).chunk(0).values
+    return pa.Table.from_arrays(rows.flatten(), schema=pa.schema(list(rows.type)))
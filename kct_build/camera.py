@@ -0,0 +1,282 @@
+"""
+Per-phone colour correction.
+
+``phone_camera_color_distortion.csv`` scores each Phone_Model's accuracy
+(0-100) on navy, gray, brown and black fabric, white balance and skin
+tone, plus its HDR_Color_Distortion. This stage turns every row into a
+3x3 linear-sRGB correction matrix::
+
+    build/knowledge/camera/
+        corrections.npy  float32 [phone, 3, 3]
+        index.json       phones, reference patches, fit error
+
+and :func:`correct_images` applies one to a batch of photos before
+colour extraction::
+
+    python -m kct_build.camera --phone "iPhone 13" photo.jpg ... -o corrected/
+
+The scores only say how far off each patch is, so the capture is
+modelled. Each reference patch (:data:`PATCHES`, palette colours plus the
+ColorChecker light-skin patch) is distorted by ``(100 - score) / 100``
+along the error that patch shows up: a warm white-balance cast for gray
+and white, over-saturation for navy, brown and skin, crushed shadows for
+black. HDR_Color_Distortion / 100 over-saturates every patch on top. The
+matrix is then the ridge-regularised least-squares fit that maps the
+captured patches back onto the references, solved for all phones at
+once; ``index.json`` records the mean CIEDE2000 error of the patches
+before and after correction.
+
+:func:`correct_images` works on ``uint8`` or float ``[..., H, W, 3]``
+arrays: sRGB is decoded with a 256-entry table, the matrix is one
+``matmul`` over the batch and the result is re-encoded through a
+4096-entry table, so no Python loop touches a pixel.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import config
+from .artifacts import collect_artifacts
+from .demand import slug
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .palette import (
+    PALETTE_PATH, SRGB_TO_XYZ, delta_e_2000, hex_to_rgb, linear_to_srgb, load_palette, rgb_to_lab, srgb_to_linear,
+)
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAME = "corrections.npy"
+INDEX_NAME = "index.json"
+PHONES = "phone_camera_color_distortion.csv"
+
+# Score column -> (reference colour, error it shows). References are palette
+# ids or hex codes; "#C29682" is the ColorChecker light-skin patch.
+PATCHES = {
+    "Navy_Color_Accuracy": ("suits/navy/standard", "saturation"),
+    "Gray_Color_Accuracy": ("suits/grey/medium_grey", "cast"),
+    "Brown_Color_Accuracy": ("suits/chocolate_brown/standard", "saturation"),
+    "Black_Color_Accuracy": ("suits/black/soft_black", "shadows"),
+    "White_Balance_Performance": ("shirts/white/crisp_white", "cast"),
+    "Skin_Tone_Accuracy": ("#C29682", "saturation"),
+}
+HDR = "HDR_Color_Distortion"
+RIDGE = 1e-4
+ENCODE_STEPS = 4096
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"Camera colour correction requires numpy ({exc})") from exc
+    return np
+
+
+def _generators(np) -> Dict[str, Any]:
+    luminance = np.array(SRGB_TO_XYZ[1])
+    return {
+        "saturation": np.eye(3) - np.ones((3, 1)) * luminance,
+        "cast": np.diag([1.0, 0.0, -1.0]),
+        "shadows": -np.eye(3),
+    }
+
+
+def reference_patches(palette_source: Path = PALETTE_PATH):
+    """``[P, 3]`` linear-sRGB reference for each :data:`PATCHES` column."""
+    by_id = {c.id: c.hex for c in load_palette(palette_source)}
+    hexes = []
+    for column, (reference, _) in PATCHES.items():
+        hex_code = reference if reference.startswith("#") else by_id.get(reference)
+        if hex_code is None:
+            raise BuildError(f"{column}: palette colour {reference} not in {config.display_path(palette_source)}")
+        hexes.append(hex_code)
+    return srgb_to_linear(hex_to_rgb(hexes))
+
+
+def captured_patches(scores, hdr, reference):
+    """``[F, P, 3]`` modelled capture of the reference patches per phone.
+
+    ``scores`` is ``[F, P]`` accuracy in :data:`PATCHES` order, ``hdr`` ``[F]``.
+    """
+    np = _require_numpy()
+    generators = _generators(np)
+    errors = (100 - np.asarray(scores, dtype=float)) / 100                                   # [F, P]
+    shapes = np.stack([generators[kind] for _, kind in PATCHES.values()])                   # [P, 3, 3]
+    per_patch = np.eye(3) + errors[:, :, None, None] * shapes                                # [F, P, 3, 3]
+    boost = np.eye(3) + (np.asarray(hdr, dtype=float) / 100)[:, None, None] * generators["saturation"]
+    captured = np.einsum("fpij,pj->fpi", per_patch, reference)
+    return np.clip(np.einsum("fij,fpj->fpi", boost, captured), 0, 1)
+
+
+def fit_corrections(captured, reference, ridge: float = RIDGE):
+    """``[F, 3, 3]`` least-squares maps from captured to reference patches, ridged towards identity."""
+    np = _require_numpy()
+    X = np.asarray(captured)
+    Y = np.broadcast_to(reference, X.shape)
+    lhs = np.swapaxes(X, 1, 2) @ X + ridge * np.eye(3)
+    rhs = np.swapaxes(X, 1, 2) @ Y + ridge * np.eye(3)
+    return np.swapaxes(np.linalg.solve(lhs, rhs), 1, 2)
+
+
+def _tables(np):
+    decode = srgb_to_linear(np.arange(256) / 255).astype(np.float32)
+    encode = np.rint(linear_to_srgb(np.arange(ENCODE_STEPS) / (ENCODE_STEPS - 1)) * 255).astype(np.uint8)
+    return decode, encode
+
+
+def correct_images(images, matrices):
+    """Apply correction matrices to ``[..., H, W, 3]`` sRGB images.
+
+    ``matrices`` is one ``[3, 3]`` matrix or ``[N, 3, 3]`` for an
+    ``[N, H, W, 3]`` batch. ``uint8`` input gives ``uint8`` output; float
+    input (0-1) gives float32.
+    """
+    np = _require_numpy()
+    images = np.asarray(images)
+    if images.shape[-1] != 3:
+        raise ValueError(f"expected RGB images [..., H, W, 3], got shape {images.shape}")
+    matrices = np.asarray(matrices, dtype=np.float32)
+    decode, encode = _tables(np)
+    if images.dtype == np.uint8:
+        linear = decode[images]
+    else:
+        linear = srgb_to_linear(images).astype(np.float32)
+    if matrices.ndim == 2:
+        corrected = linear @ matrices.T
+    else:
+        corrected = linear @ np.swapaxes(matrices, -1, -2)[:, None]
+    np.clip(corrected, 0, 1, out=corrected)
+    if images.dtype == np.uint8:
+        return encode[np.rint(corrected * (ENCODE_STEPS - 1)).astype(np.intp)]
+    return linear_to_srgb(corrected).astype(np.float32)
+
+
+def build_corrections(rows: Sequence[Dict[str, Any]], palette_source: Path = PALETTE_PATH) -> Dict[str, Any]:
+    """Matrices and fit errors for the table's rows."""
+    np = _require_numpy()
+    reference = reference_patches(palette_source)
+    scores = np.array([[float(row[column]) for column in PATCHES] for row in rows])
+    hdr = np.array([float(row.get(HDR) or 0) for row in rows])
+    captured = captured_patches(scores, hdr, reference)
+    matrices = fit_corrections(captured, reference)
+    corrected = np.clip(np.einsum("fij,fpj->fpi", matrices, captured), 0, 1)
+    target = rgb_to_lab(linear_to_srgb(reference))
+    before = delta_e_2000(rgb_to_lab(linear_to_srgb(captured)), target).mean(axis=1)
+    after = delta_e_2000(rgb_to_lab(linear_to_srgb(corrected)), target).mean(axis=1)
+    return {"matrices": matrices.astype(np.float32), "before": before, "after": after}
+
+
+def write_corrections(
+    graph: BuildGraph,
+    out_dir: Path = config.CAMERA_DIR,
+    palette_source: Path = PALETTE_PATH,
+) -> Optional[Dict[str, Any]]:
+    """Fit every generated phone; ``None`` if the table is missing."""
+    np = _require_numpy()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    source = sources.get(PHONES)
+    if source is None:
+        logger.warning("Camera correction: %s not generated", PHONES)
+        return None
+    with open(source.path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    try:
+        fit = build_corrections(rows, palette_source)
+        labels = [str(row["Phone_Model"]) for row in rows]
+    except (KeyError, ValueError) as exc:
+        logger.warning("Camera correction failed: %s", exc)
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{ARRAY_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, fit["matrices"])
+    os.replace(tmp, out_dir / ARRAY_NAME)
+    index = {
+        "array": ARRAY_NAME,
+        "dtype": "float32",
+        "space": "linear sRGB",
+        "patches": {column: reference for column, (reference, _) in PATCHES.items()},
+        "phones": [
+            {"id": slug(label), "label": label,
+             "delta_e_before": round(float(b), 3), "delta_e_after": round(float(a), 3)}
+            for label, b, a in zip(labels, fit["before"], fit["after"])
+        ],
+        "sources": {
+            config.display_path(source.path): hash_file(source.path),
+            config.display_path(palette_source): hash_file(palette_source),
+        },
+    }
+    tmp = out_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+    os.replace(tmp, out_dir / INDEX_NAME)
+    logger.info("Wrote colour corrections for %d phones", len(rows))
+    return index
+
+
+def load_correction(phone: str, directory: Path = config.CAMERA_DIR):
+    """The ``[3, 3]`` matrix for a phone id or Phone_Model label."""
+    np = _require_numpy()
+    try:
+        with open(directory / INDEX_NAME, encoding="utf-8") as fh:
+            index = json.load(fh)
+    except OSError:
+        raise BuildError("Camera corrections have not been built; run python -m kct_build first") from None
+    ids = [p["id"] for p in index["phones"]]
+    if slug(phone) not in ids:
+        raise BuildError(f"Unknown phone {phone!r} (known: {', '.join(ids)})")
+    return np.load(directory / index["array"], mmap_mode="r")[ids.index(slug(phone))]
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="kct_build.camera", description="Correct phone photos before colour extraction.",
+    )
+    parser.add_argument("images", nargs="+", type=Path, help="photos to correct")
+    parser.add_argument("--phone", required=True, help="Phone_Model (e.g. 'iPhone 13' or iphone_13)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="directory for the corrected photos")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    try:
+        np = _require_numpy()
+        from PIL import Image
+    except (BuildError, ImportError) as exc:
+        logger.error("Photo correction requires Pillow and numpy (%s)", exc)
+        return 2
+    try:
+        matrix = np.asarray(load_correction(args.phone))
+        photos = [np.asarray(Image.open(path).convert("RGB")) for path in args.images]
+    except (BuildError, OSError) as exc:
+        logger.error("%s", exc)
+        return 2
+
+    # Same-sized photos are corrected as one batch.
+    groups: Dict[Any, List[int]] = {}
+    for i, photo in enumerate(photos):
+        groups.setdefault(photo.shape, []).append(i)
+    args.output.mkdir(parents=True, exist_ok=True)
+    for members in groups.values():
+        batch = correct_images(np.stack([photos[i] for i in members]), matrix)
+        for i, corrected in zip(members, batch):
+            Image.fromarray(corrected).save(args.output / args.images[i].name)
+    logger.info("Corrected %d photos for %s", len(photos), args.phone)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+"""
+Canonical artifact resolution.
+
+The research export left numbered copies next to several artifacts
+(``video_call_undertones_1.csv``) and next to several generators
+(``script_1.py``). Some copies are byte-identical, some are improved
+versions (``lighting_color_perception_1.csv`` adds ``Overall_Accuracy``).
+Instead of tracking which is which by hand, every artifact in a topic is
+content-hashed and collapsed:
+
+* exact duplicates resolve to one file, preferring one a generator writes,
+  then the un-numbered name;
+* differing CSV variants of the same name (``x.csv`` / ``x_1.csv``) resolve
+  to the one whose columns are a strict superset of the others';
+* a generator whose outputs are all rewritten by a later numbered sibling
+  (``script.py`` -> ``script_1.py``) is superseded and not run.
+
+The result is written to ``build/knowledge/canonical.json``; the snapshot
+and the API loaders read through it so redundant copies are never parsed or
+cached twice.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from . import config
+from .discovery import Generator, iter_topic_dirs, topic_slug
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+CANONICAL_VERSION = 1
+ARTIFACT_SUFFIXES = (".csv", ".json", ".png")
+
+_NUMBERED = re.compile(r"^(?P<base>.+?)_(?P<n>\d+)$")
+
+
+def base_stem(stem: str) -> str:
+    """``"lighting_color_perception_1"`` -> ``"lighting_color_perception"``."""
+    match = _NUMBERED.match(stem)
+    return match.group("base") if match else stem
+
+
+def _copy_number(stem: str) -> int:
+    match = _NUMBERED.match(stem)
+    return int(match.group("n")) if match else 0
+
+
+@dataclass
+class CanonicalArtifact:
+    key: str
+    path: Path
+    sha256: str
+    size: int
+    producer: Optional[str] = None
+    aliases: List[Path] = field(default_factory=list)
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "path": config.display_path(self.path),
+            "sha256": self.sha256,
+            "size": self.size,
+            "producer": self.producer,
+            "aliases": [config.display_path(p) for p in self.aliases],
+        }
+
+
+# ----------------------------------------------------------------------
+# Generators
+# ----------------------------------------------------------------------
+
+def superseded_generators(generators: Iterable[Generator]) -> Dict[str, str]:
+    """Map each superseded generator id to the sibling that replaces it.
+
+    ``script.py`` is superseded by ``script_N.py`` in the same topic when
+    the latter writes every file the former writes.
+    """
+    families: Dict[tuple, List[Generator]] = defaultdict(list)
+    for gen in generators:
+        families[(gen.topic, gen.kind, base_stem(gen.path.stem))].append(gen)
+
+    superseded: Dict[str, str] = {}
+    for members in families.values():
+        members.sort(key=lambda g: _copy_number(g.path.stem))
+        for i, gen in enumerate(members):
+            outputs = set(gen.outputs)
+            if not outputs:
+                continue
+            for later in reversed(members[i + 1:]):
+                if outputs <= set(later.outputs):
+                    superseded[gen.id] = later.id
+                    break
+    return superseded
+
+
+def drop_superseded(generators: Sequence[Generator]) -> List[Generator]:
+    superseded = superseded_generators(generators)
+    for old, new in sorted(superseded.items()):
+        logger.info("Skipping %s: superseded by %s", old, os.path.basename(new))
+    return [gen for gen in generators if gen.id not in superseded]
+
+
+# ----------------------------------------------------------------------
+# Artifacts
+# ----------------------------------------------------------------------
+
+def _csv_columns(path: Path) -> Optional[Set[str]]:
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            return set(next(csv.reader(fh), []))
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
+
+
+def _preferred(paths: List[Path], written: Dict[Path, str]) -> Path:
+    return min(paths, key=lambda p: (p not in written, _copy_number(p.stem), p.name))
+
+
+def _superset_variant(variants: List[Path]) -> Optional[Path]:
+    """The CSV whose header strictly contains every other variant's header."""
+    if len(variants) < 2 or any(p.suffix.lower() != ".csv" for p in variants):
+        return None
+    columns = {p: _csv_columns(p) for p in variants}
+    if any(cols is None for cols in columns.values()):
+        return None
+    for candidate in variants:
+        others = [columns[p] for p in variants if p != candidate]
+        if all(cols < columns[candidate] for cols in others):
+            return candidate
+    return None
+
+
+def resolve_topic(topic_dir: Path, written: Dict[Path, str]) -> List[CanonicalArtifact]:
+    """Canonical artifacts for one topic folder.
+
+    ``written`` maps generator output paths to the generator that writes
+    them; those files win ties.
+    """
+    slug = topic_slug(topic_dir.name)
+    files = [
+        p for p in sorted(topic_dir.iterdir())
+        if p.suffix.lower() in ARTIFACT_SUFFIXES and p.is_file()
+    ]
+
+    by_hash: Dict[str, List[Path]] = defaultdict(list)
+    for path in files:
+        by_hash[hash_file(path)].append(path)
+
+    representatives: Dict[Path, List[Path]] = {}
+    for paths in by_hash.values():
+        keep = _preferred(paths, written)
+        representatives[keep] = [p for p in paths if p != keep]
+
+    families: Dict[tuple, List[Path]] = defaultdict(list)
+    for path in representatives:
+        families[(base_stem(path.stem), path.suffix.lower())].append(path)
+
+    resolved: List[CanonicalArtifact] = []
+    for (stem, _), variants in sorted(families.items()):
+        winner = _superset_variant(variants)
+        groups = [(winner, variants)] if winner else [(p, [p]) for p in variants]
+        for keep, members in groups:
+            aliases = sorted(
+                alias for member in members
+                for alias in ([member] if member != keep else []) + representatives[member]
+            )
+            name = stem if winner or len(variants) == 1 else keep.stem
+            resolved.append(CanonicalArtifact(
+                key=f"{slug}/{name}",
+                path=keep,
+                sha256=hash_file(keep),
+                size=keep.stat().st_size,
+                producer=written.get(keep),
+                aliases=aliases,
+            ))
+    return resolved
+
+
+def resolve_canonical(
+    generators: Iterable[Generator],
+    roots: Sequence[Path] = config.SOURCE_ROOTS,
+) -> Dict[str, object]:
+    """Resolve every topic under ``roots`` into the canonical manifest."""
+    generators = list(generators)
+    written: Dict[Path, str] = {}
+    for gen in generators:
+        for path in gen.output_paths():
+            written[path] = gen.id
+
+    artifacts: Dict[str, Dict[str, object]] = {}
+    aliases: Dict[str, str] = {}
+    for topic_dir in iter_topic_dirs(roots):
+        for entry in resolve_topic(topic_dir, written):
+            artifacts[entry.key] = entry.to_json()
+            for alias in entry.aliases:
+                aliases[config.display_path(alias)] = config.display_path(entry.path)
+
+    return {
+        "version": CANONICAL_VERSION,
+        "artifacts": artifacts,
+        "aliases": aliases,
+        "superseded_generators": superseded_generators(generators),
+    }
+
+
+def write_canonical(
+    generators: Iterable[Generator],
+    out_path: Path = config.CANONICAL_PATH,
+    roots: Sequence[Path] = config.SOURCE_ROOTS,
+) -> Dict[str, object]:
+    manifest = resolve_canonical(generators, roots)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, out_path)
+    logger.info(
+        "Resolved %d canonical artifacts (%d duplicate copies collapsed)",
+        len(manifest["artifacts"]), len(manifest["aliases"]),
+    )
+    return manifest
+
+
+def load_canonical(path: Path = config.CANONICAL_PATH) -> Optional[Dict[str, object]]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,214 @@
+"""
+Career-stage Markov model.
+
+Fits a yearly transition matrix over ``(age band, career stage)`` states
+from the Career Trajectory tables and precomputes everything the API asks
+of it::
+
+    build/knowledge/career/
+        transitions.npy    float32 [horizon 0..10, state, state], P**h
+        spend.json         state -> expected spend for 1..10 years ahead
+
+* Stages are the rows of ``career_stage_wardrobe.csv``. A stage's yearly
+  promotion probability is 1 / its length in years, taken from its
+  ``(a-b years)`` label, or the gap to the next stage's start for an
+  open range (``15+ years``); the last stage is absorbing.
+* Age bands are the rows of ``age_career_progression.csv``; a customer
+  moves to the next band with probability 1 / band width per year.
+  Typical_Role_Level ranks are mapped proportionally onto stage ranks,
+  and someone behind the typical stage for their age band is promoted
+  :data:`PLATEAU` times as often per stage of lag.
+* Yearly spend in a stage is Average_Wardrobe_Investment plus
+  Accessory_Investment; a promotion adds the Typical_Spend of the
+  ``New Role`` trigger in ``wardrobe_upgrade_timing.csv``.
+
+``spend.json`` is keyed ``"<age band>|<stage>"`` (``"28-32|mid_level"``)
+and holds, per horizon, the expected spend in that year, the cumulative
+spend and the stage distribution, so "likely spend in 3 years for a
+28-year-old mid-level" is a table read.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import config
+from .artifacts import collect_artifacts
+from .demand import slug
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+MATRIX_NAME = "transitions.npy"
+LOOKUP_NAME = "spend.json"
+HORIZON = 10
+PLATEAU = 0.75
+
+STAGES = "career_stage_wardrobe.csv"
+AGES = "age_career_progression.csv"
+UPGRADES = "wardrobe_upgrade_timing.csv"
+SOURCES = (STAGES, AGES, UPGRADES)
+
+_YEARS = re.compile(r"\((\d+)(?:-(\d+)|\+)\s*years?\)", re.IGNORECASE)
+_AGES = re.compile(r"(\d+)(?:-(\d+)|\+)")
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"The career model requires numpy ({exc})") from exc
+    return np
+
+
+def stage_key(label: str) -> str:
+    """``"Mid-Level (3-7 years)"`` -> ``"mid_level"``."""
+    return slug(_YEARS.sub("", label))
+
+
+def stage_years(labels: Sequence[str]) -> List[Optional[float]]:
+    """Expected years in each stage; ``None`` for the last (absorbing) one."""
+    ranges = []
+    for label in labels:
+        match = _YEARS.search(label)
+        if not match:
+            raise ValueError(f"career stage {label!r} has no '(a-b years)' range")
+        ranges.append((int(match.group(1)), int(match.group(2)) if match.group(2) else None))
+    years: List[Optional[float]] = []
+    for i, (start, end) in enumerate(ranges):
+        if i == len(ranges) - 1:
+            years.append(None)
+        elif end is not None:
+            years.append(float(end - start + 1))
+        else:
+            years.append(float(max(ranges[i + 1][0] - start, 1)))
+    return years
+
+
+def age_bands(labels: Sequence[str]) -> List[Tuple[int, Optional[int]]]:
+    bands = []
+    for label in labels:
+        match = _AGES.search(label)
+        if not match:
+            raise ValueError(f"age range {label!r} is not 'a-b' or 'a+'")
+        bands.append((int(match.group(1)), int(match.group(2)) if match.group(2) else None))
+    return bands
+
+
+def build_model(
+    stages: Sequence[Mapping[str, Any]],
+    ages: Sequence[Mapping[str, Any]],
+    upgrades: Sequence[Mapping[str, Any]],
+    horizon: int = HORIZON,
+) -> Dict[str, Any]:
+    """Transition matrix powers and the spend lookup from the tables' rows."""
+    np = _require_numpy()
+    stage_labels = [str(row["Career_Stage"]) for row in stages]
+    band_labels = [str(row["Age_Range"]) for row in ages]
+    S, A = len(stage_labels), len(band_labels)
+
+    years = stage_years(stage_labels)
+    promote = np.array([0.0 if y is None else min(1.0, 1.0 / y) for y in years])       # [S]
+    bands = age_bands(band_labels)
+    age_up = np.array([0.0 if hi is None else 1.0 / (hi - lo + 1) for lo, hi in bands])  # [A]
+    typical = np.rint(np.arange(A) * (S - 1) / max(A - 1, 1))                            # [A]
+    lag = np.maximum(typical[:, None] - np.arange(S)[None, :], 0)                         # [A, S]
+    promote_as = np.minimum(promote[None, :] * PLATEAU ** lag, 1.0)                       # [A, S]
+
+    # State (a, s) -> index a * S + s; age and stage move independently.
+    stage_step = np.zeros((A, S, S))
+    idx = np.arange(S)
+    stage_step[:, idx, idx] = 1 - promote_as
+    stage_step[:, idx[:-1], idx[:-1] + 1] = promote_as[:, :-1]
+    age_step = np.zeros((A, A))
+    age_step[np.arange(A), np.arange(A)] = 1 - age_up
+    age_step[np.arange(A - 1), np.arange(1, A)] = age_up[:-1]
+    matrix = np.einsum("ab,asu->asbu", age_step, stage_step).reshape(A * S, A * S)
+
+    powers = np.empty((horizon + 1, A * S, A * S))
+    powers[0] = np.eye(A * S)
+    for h in range(1, horizon + 1):
+        powers[h] = powers[h - 1] @ matrix
+
+    yearly = np.array([
+        float(row["Average_Wardrobe_Investment"]) + float(row.get("Accessory_Investment") or 0) for row in stages
+    ])
+    new_role = next(
+        (float(row["Typical_Spend"]) for row in upgrades if "role" in str(row["Upgrade_Trigger"]).lower()), 0.0
+    )
+    state_spend = np.tile(yearly, A) + new_role * promote_as.reshape(-1)                 # [N]
+    expected = powers[:horizon] @ state_spend                                             # [H, N]: year h+1
+    cumulative = np.cumsum(expected, axis=0)
+    distribution = powers[1:].reshape(horizon, A * S, A, S).sum(axis=2)                   # [H, N, S]
+
+    keys = [stage_key(label) for label in stage_labels]
+    lookup: Dict[str, Any] = {}
+    for a, band in enumerate(band_labels):
+        for s, key in enumerate(keys):
+            n = a * S + s
+            lookup[f"{band}|{key}"] = [
+                {
+                    "years": h + 1,
+                    "expected_spend": round(float(expected[h, n]), 2),
+                    "cumulative_spend": round(float(cumulative[h, n]), 2),
+                    "stages": {k: round(float(p), 4) for k, p in zip(keys, distribution[h, n]) if p >= 1e-4},
+                }
+                for h in range(horizon)
+            ]
+    return {
+        "matrix": matrix,
+        "powers": powers.astype(np.float32),
+        "states": [f"{band}|{key}" for band in band_labels for key in keys],
+        "stages": keys,
+        "age_bands": band_labels,
+        "lookup": lookup,
+    }
+
+
+def write_career_model(graph: BuildGraph, out_dir: Path = config.CAREER_DIR) -> Optional[Dict[str, Any]]:
+    """Fit the model from the generated tables; ``None`` if one is missing."""
+    np = _require_numpy()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    missing = [name for name in SOURCES if name not in sources]
+    if missing:
+        logger.warning("Career model: %s not generated", ", ".join(missing))
+        return None
+    rows = {}
+    for name in SOURCES:
+        with open(sources[name].path, newline="", encoding="utf-8") as fh:
+            rows[name] = list(csv.DictReader(fh))
+    try:
+        model = build_model(rows[STAGES], rows[AGES], rows[UPGRADES])
+    except (KeyError, ValueError) as exc:
+        logger.warning("Career model failed: %s", exc)
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{MATRIX_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, model["powers"])
+    os.replace(tmp, out_dir / MATRIX_NAME)
+    payload = {
+        "horizon": HORIZON,
+        "states": model["states"],
+        "stages": model["stages"],
+        "age_bands": model["age_bands"],
+        "sources": {
+            config.display_path(sources[name].path): hash_file(sources[name].path) for name in SOURCES
+        },
+        "lookup": model["lookup"],
+    }
+    tmp = out_dir / f".{LOOKUP_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=1)
+    os.replace(tmp, out_dir / LOOKUP_NAME)
+    logger.info("Wrote career model: %d states, %d-year horizon", len(model["states"]), HORIZON)
+    return payload
@@ -0,0 +1,189 @@
+"""
+Record-level change feed between builds.
+
+Every build keeps the rows of each generated CSV, keyed by its schema's
+primary key (``Signal_Category``, ``Fabric_Type``, ``Weather_Pattern`` ...,
+see :mod:`kct_build.schemas`), in ``.kct-build/records.json``. The next
+build diffs against that state and, when anything moved, writes::
+
+    build/knowledge/changes.json
+        {"sequence": 7, "previous": 6, "datasets": {
+            "career-trajectory-patterns-advanced-personalizati/promotion_signals": {
+                "path": ".../promotion_signals.csv", "status": "changed",
+                "served": ["research/career/promotion_signals.csv"],
+                "key": "Signal_Category",
+                "added": [], "removed": [],
+                "changed": {"Haircut": ["Reliability_Score"]},
+                "derived": ["..."]}}}
+
+``served`` lists the copies published into the data directory and ``derived``
+the precomputed rankings/aggregates built from the dataset, so the API can
+evict exactly those cache entries. Tables without a usable key (and JSON
+files) are compared as a whole and reported with ``"rows": false``.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import config
+from .aggregates import AGGREGATES, RANKINGS
+from .artifacts import Artifact, collect_artifacts
+from .graph import BuildGraph
+from .manifest import hash_file
+from .publish import TARGETS
+from .schemas import SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+FEED_SUFFIXES = (".csv", ".json")
+
+Rows = Dict[str, Dict[str, str]]
+
+
+def read_records(path: Path, key: Optional[str]) -> Optional[Rows]:
+    """Rows of a CSV by primary key; ``None`` when the key cannot identify them."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        if key is None or key not in (reader.fieldnames or ()):
+            return None
+        rows: Rows = {}
+        for row in reader:
+            value = row[key]
+            if value in rows:
+                return None  # duplicate keys: fall back to a whole-file diff
+            rows[value] = {col: val for col, val in row.items() if col is not None}
+    return rows
+
+
+def snapshot_dataset(artifact: Artifact) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {"path": config.display_path(artifact.path), "sha256": hash_file(artifact.path)}
+    schema = SCHEMAS.get(artifact.path.name) if artifact.suffix == ".csv" else None
+    if schema is not None:
+        records = read_records(artifact.path, schema.key)
+        if records is not None:
+            entry["key"] = schema.key
+            entry["rows"] = records
+    return entry
+
+
+def diff_rows(before: Rows, after: Rows) -> Dict[str, Any]:
+    changed: Dict[str, List[str]] = {}
+    for key in before.keys() & after.keys():
+        old, new = before[key], after[key]
+        fields = sorted(col for col in old.keys() | new.keys() if old.get(col) != new.get(col))
+        if fields:
+            changed[key] = fields
+    return {
+        "added": sorted(after.keys() - before.keys()),
+        "removed": sorted(before.keys() - after.keys()),
+        "changed": dict(sorted(changed.items())),
+    }
+
+
+def diff_dataset(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Change entry for one dataset, or ``None`` when it is unchanged."""
+    if before is not None and after is not None and before["sha256"] == after["sha256"]:
+        return None
+    current = after if after is not None else before
+    entry: Dict[str, Any] = {
+        "path": current["path"],
+        "status": "added" if before is None else "removed" if after is None else "changed",
+    }
+    keyed = (
+        before is not None and after is not None
+        and "rows" in before and "rows" in after and before.get("key") == after.get("key")
+    )
+    if keyed:
+        entry["key"] = after["key"]
+        entry.update(diff_rows(before["rows"], after["rows"]))
+        if not (entry["added"] or entry["removed"] or entry["changed"]):
+            return None  # same records, different bytes (e.g. line endings)
+    else:
+        entry["rows"] = False
+    return entry
+
+
+def _dependents(name: str) -> Dict[str, List[str]]:
+    served = sorted(f"{folder}/{name}" for folder, names in TARGETS.items() if name in names)
+    derived = sorted(spec.name for spec in (*RANKINGS, *AGGREGATES) if spec.source == name)
+    return {"served": served, "derived": derived}
+
+
+def load_state(path: Path = config.RECORDS_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get("version") == STATE_VERSION else {}
+
+
+def _write_json(path: Path, payload: Dict[str, Any], indent: Optional[int] = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=indent, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def build_feed(previous: Dict[str, Any], datasets: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-dataset change entries between two record states."""
+    old = previous.get("datasets", {})
+    feed: Dict[str, Dict[str, Any]] = {}
+    for key in sorted(old.keys() | datasets.keys()):
+        entry = diff_dataset(old.get(key), datasets.get(key))
+        if entry is not None:
+            entry.update(_dependents(Path(entry["path"]).name))
+            feed[key] = entry
+    return feed
+
+
+def write_changes(
+    graph: BuildGraph,
+    out_path: Path = config.CHANGES_PATH,
+    state_path: Path = config.RECORDS_PATH,
+    suffixes: Sequence[str] = FEED_SUFFIXES,
+) -> Optional[Dict[str, Any]]:
+    """Diff the generated datasets against the last build's records.
+
+    Writes the feed and the new record state when something changed and
+    returns the feed; returns ``None`` (leaving the last feed in place)
+    otherwise. The very first build only records state.
+    """
+    previous = load_state(state_path)
+    datasets = {a.key: snapshot_dataset(a) for a in collect_artifacts(graph, suffixes=suffixes)}
+    state = {"version": STATE_VERSION, "sequence": previous.get("sequence", 0), "datasets": datasets}
+
+    if not previous:
+        _write_json(state_path, state)
+        logger.info("Recorded %d datasets for change tracking", len(datasets))
+        return None
+
+    changed = build_feed(previous, datasets)
+    if not changed:
+        logger.info("No record-level changes since the last build")
+        return None
+
+    state["sequence"] += 1
+    feed = {
+        "sequence": state["sequence"],
+        "previous": previous.get("sequence", 0),
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "datasets": changed,
+    }
+    _write_json(out_path, feed, indent=2)
+    _write_json(state_path, state)
+    records = sum(
+        len(e.get("added", ())) + len(e.get("removed", ())) + len(e.get("changed", ()))
+        for e in changed.values()
+    )
+    logger.info("Change feed %d: %d datasets, %d records", feed["sequence"], len(changed), records)
+    return feed
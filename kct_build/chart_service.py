@@ -0,0 +1,327 @@
+"""
+On-demand chart rendering with an LRU disk cache.
+
+Instead of shipping every size and format of every chart, the API asks
+this service for the one it needs::
+
+    python -m kct_build.chart_service --port 8765
+
+    GET /charts                                       chart ids
+    GET /charts/<topic-slug>/<chart>.<fmt>?width=&height=&scale=
+
+``<fmt>`` is any of :data:`kct_build.render.FORMATS`. A chart id is the
+topic slug plus the PNG name its script writes
+(``cultural-regional-nuances-navigating-the-unspok/detroit_style_chart``).
+
+The chart scripts need no changes to act as figure functions:
+:meth:`ChartCatalog.figure` runs a script under the build harness with
+``write_image`` captured (see :mod:`kct_build.render`) and returns the
+Plotly figure spec it would have written, built from the script's
+current data. Specs are memoised per generator fingerprint (source and
+input hashes), so a script only reruns when it or its data changes.
+
+Rendered bytes are cached on disk under a key hashed from
+``(spec, format, width, height, scale)``; the least recently used files
+are evicted once the cache exceeds its byte budget. A cache hit never
+touches kaleido.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from . import config, harness, render
+from .discovery import Generator, discover_generators
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .runner import execute_script
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+SIZE_LIMITS = (100, 4000)
+SCALE_LIMITS = (0.25, 4.0)
+
+
+class ChartNotFound(BuildError):
+    """No generator writes a Plotly chart under the requested id."""
+
+
+# ----------------------------------------------------------------------
+# Disk cache
+# ----------------------------------------------------------------------
+
+class DiskLRU:
+    """Files under ``root`` keyed by hash; mtime is the recency.
+
+    ``root`` is made absolute up front: renders ``chdir`` into topic folders
+    while other threads read and write the cache.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.root = Path(root).resolve()
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._bytes = sum(p.stat().st_size for p in self._files())
+
+    def _files(self) -> List[Path]:
+        return [p for p in self.root.glob("*/*") if p.is_file() and not p.name.startswith(".")]
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}.{suffix}"
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def get(self, key: str, suffix: str) -> Optional[bytes]:
+        path = self._path(key, suffix)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, suffix: str, data: bytes) -> None:
+        path = self._path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._bytes += len(data) - previous
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        self._bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if self._bytes <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._bytes -= size
+
+
+# ----------------------------------------------------------------------
+# Figure specs
+# ----------------------------------------------------------------------
+
+class ChartCatalog:
+    """Chart ids -> the generator that draws them, and their current specs."""
+
+    def __init__(self, graph: BuildGraph):
+        self.graph = graph
+        self.charts: Dict[str, Tuple[str, str]] = {}  # id -> (node id, png name)
+        for node_id, gen in graph.nodes.items():
+            for name in gen.outputs:
+                if name.lower().endswith(".png"):
+                    self.charts[f"{gen.slug}/{Path(name).stem}"] = (node_id, os.path.basename(name))
+        self._specs: Dict[str, Tuple[str, Dict[str, str]]] = {}  # node id -> (fingerprint, specs by png)
+
+    def ids(self) -> List[str]:
+        return sorted(self.charts)
+
+    def _capture(self, gen: Generator) -> Dict[str, str]:
+        with tempfile.TemporaryDirectory(prefix="kct-chart-") as workdir:
+            result = execute_script(gen.id, str(gen.path), workdir, gen.inputs)
+        if not result.ok:
+            raise BuildError(f"{gen.id} failed:\n{result.error}")
+        return {os.path.basename(job.path): job.spec for job in result.figures}
+
+    def figure(self, chart_id: str) -> str:
+        """Current Plotly JSON spec of ``chart_id`` (reruns its script if stale)."""
+        if chart_id not in self.charts:
+            raise ChartNotFound(f"Unknown chart {chart_id!r}")
+        node_id, name = self.charts[chart_id]
+        gen = self.graph.nodes[node_id]
+        stamp = "\0".join(hash_file(p) or "" for p in [gen.path, *gen.input_paths()])
+        cached = self._specs.get(node_id)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, self._capture(gen))
+            self._specs[node_id] = cached
+        if name not in cached[1]:
+            raise ChartNotFound(f"{chart_id} is not a Plotly figure")
+        return cached[1][name]
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+
+def _clamp(value: Optional[str], limits: Tuple[float, float], cast):
+    if value is None:
+        return None
+    number = cast(value)
+    low, high = limits
+    if not low <= number <= high:
+        raise ValueError(f"{value} outside {low}..{high}")
+    return number
+
+
+def cache_key(spec: str, fmt: str, width: Optional[int], height: Optional[int], scale: Optional[float]) -> str:
+    digest = hashlib.sha256(spec.encode("utf-8"))
+    digest.update(f"\0{fmt}\0{width}\0{height}\0{scale}".encode())
+    return digest.hexdigest()
+
+
+class ChartRenderer:
+    """Specs from a :class:`ChartCatalog`, bytes through a :class:`DiskLRU`."""
+
+    def __init__(self, catalog: ChartCatalog, cache: DiskLRU):
+        self.catalog = catalog
+        self.cache = cache
+        # Generators chdir and kaleido is not thread-safe: one miss at a time.
+        self._render_lock = threading.Lock()
+
+    def render(
+        self,
+        chart_id: str,
+        fmt: str,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        scale: Optional[float] = None,
+    ) -> Tuple[bytes, str, bool]:
+        """``(bytes, cache key, hit)`` for one chart at one size and format."""
+        if fmt not in render.FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}")
+        with self._render_lock:
+            spec = self.catalog.figure(chart_id)
+        key = cache_key(spec, fmt, width, height, scale)
+        data = self.cache.get(key, fmt)
+        if data is not None:
+            return data, key, True
+        with self._render_lock:
+            data = render.figure_bytes(spec, fmt, width, height, scale, key=chart_id)
+        self.cache.put(key, fmt, data)
+        return data, key, False
+
+
+def _handler(renderer: ChartRenderer):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "kct-chart-service"
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002 - stdlib signature
+            logger.debug("%s " + format, self.address_string(), *args)
+
+        def _send(self, status: int, body: bytes, media_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", media_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: HTTPStatus, message: str) -> None:
+            self._send(status, json.dumps({"error": message}).encode(), "application/json")
+
+        def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if parts == ["charts"]:
+                self._send(HTTPStatus.OK, json.dumps({"charts": renderer.catalog.ids()}).encode(), "application/json")
+                return
+            if len(parts) != 3 or parts[0] != "charts" or "." not in parts[2]:
+                self._error(HTTPStatus.NOT_FOUND, "expected /charts/<topic>/<chart>.<format>")
+                return
+            stem, fmt = parts[2].rsplit(".", 1)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                width = _clamp(query.get("width"), SIZE_LIMITS, int)
+                height = _clamp(query.get("height"), SIZE_LIMITS, int)
+                scale = _clamp(query.get("scale"), SCALE_LIMITS, float)
+                data, key, hit = renderer.render(f"{parts[1]}/{stem}", fmt.lower(), width, height, scale)
+            except ChartNotFound as exc:
+                self._error(HTTPStatus.NOT_FOUND, str(exc))
+                return
+            except ValueError as exc:
+                self._error(HTTPStatus.BAD_REQUEST, str(exc))
+                return
+            except Exception as exc:  # render failure: report, keep serving
+                logger.exception("Rendering %s failed", self.path)
+                self._error(HTTPStatus.INTERNAL_SERVER_ERROR, repr(exc))
+                return
+            etag = f'"{key[:32]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self._send(HTTPStatus.OK, data, render.MEDIA_TYPES[fmt.lower()], {
+                "ETag": etag,
+                "Cache-Control": "public, max-age=86400",
+                "X-Cache": "HIT" if hit else "MISS",
+            })
+
+    return Handler
+
+
+def serve(host: str, port: int, cache_dir: Path, cache_bytes: int) -> None:
+    harness.preload()
+    render.install_capture_hook()
+    render._warm_worker()
+    renderer = ChartRenderer(
+        ChartCatalog(BuildGraph(discover_generators())),
+        DiskLRU(cache_dir, cache_bytes),
+    )
+    server = ThreadingHTTPServer((host, port), _handler(renderer))
+    logger.info(
+        "Serving %d charts on http://%s:%d (cache %s, %.0f MB)",
+        len(renderer.catalog.charts), host, port, cache_dir, cache_bytes / 2**20,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="kct_build.chart_service", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-dir", type=Path, default=config.CHART_CACHE_DIR)
+    parser.add_argument(
+        "--cache-mb", type=int, default=DEFAULT_CACHE_BYTES // 2**20,
+        help=f"disk cache budget in MB (default: {DEFAULT_CACHE_BYTES // 2**20})",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(levelname)s %(message)s")
+    try:
+        serve(args.host, args.port, args.cache_dir, args.cache_mb * 2**20)
+    except (BuildError, OSError) as exc:
+        logger.error("%s", exc)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,466 @@
+"""Command-line entry point: ``python -m kct_build``."""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from . import (
+    aggregates, benchmark, bundle, camera, canonical, career, changes, colorvision, config, demand, determinism, images,
+    lighting, luts, palette, publish, snapshot, validate, weather,
+)
+from .discovery import Generator, discover_generators
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import Manifest, stale_nodes
+from .render import (
+    DEFAULT_FORMATS, DEFAULT_RENDERERS, DEFAULT_WIDTHS, FORMATS, ChartOutputs, RenderFarm, write_chart_index,
+)
+from .runner import NodeResult, run_graph
+
+logger = logging.getLogger("kct_build")
+
+
+def _csv_list(convert):
+    def parse(value: str):
+        try:
+            return tuple(convert(item.strip()) for item in value.split(",") if item.strip())
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(str(exc)) from exc
+    return parse
+
+
+def _chart_format(value: str) -> str:
+    if value.lower() not in FORMATS:
+        raise ValueError(f"unknown chart format {value!r}")
+    return value.lower()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="kct_build",
+        description="Regenerate the KCT research knowledge artifacts.",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="worker processes (default: CPU count, 1 = run in-process)",
+    )
+    parser.add_argument(
+        "--renderers", type=int, default=DEFAULT_RENDERERS,
+        help=f"warm kaleido render workers (default: {DEFAULT_RENDERERS}, 0 = render in each script)",
+    )
+    parser.add_argument(
+        "--chart-formats", type=_csv_list(_chart_format), default=DEFAULT_FORMATS, metavar="LIST",
+        help=f"comma-separated chart outputs from {', '.join(FORMATS)} (default: png); "
+             "all but png are written under build/knowledge/charts/",
+    )
+    parser.add_argument(
+        "--chart-widths", type=_csv_list(int), default=DEFAULT_WIDTHS, metavar="LIST",
+        help=f"pixel widths of the webp/avif variants (default: {','.join(map(str, DEFAULT_WIDTHS))})",
+    )
+    parser.add_argument(
+        "--no-optimize-png", action="store_true",
+        help="keep generated PNGs as rendered instead of re-encoding them losslessly",
+    )
+    parser.add_argument(
+        "--png-quantize", type=int, default=None, metavar="N",
+        help="also quantise chart PNGs to an N-colour palette (lossy; photographs are skipped)",
+    )
+    parser.add_argument(
+        "--only", action="append", metavar="TOPIC",
+        help="limit to topics whose folder name contains TOPIC (repeatable)",
+    )
+    parser.add_argument(
+        "-f", "--force", action="store_true",
+        help="ignore the manifest and rebuild every selected generator",
+    )
+    parser.add_argument(
+        "--stages-only", action="store_true",
+        help="run no generators; build the derived artifacts from the research files as they are "
+             "(used by the Docker image)",
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, metavar="DIR",
+        help="run the selected generators into DIR/<topic>/ instead of the source "
+             "tree; implies --force and skips the manifest and post-build stages",
+    )
+    parser.add_argument(
+        "--deterministic", action="store_true",
+        help="seed random / numpy.random per generator and strip volatile PNG/JSON "
+             "metadata so identical inputs give byte-identical artifacts",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=determinism.DEFAULT_SEED, metavar="N",
+        help=f"build seed for --deterministic (default: {determinism.DEFAULT_SEED})",
+    )
+    parser.add_argument(
+        "--benchmark", action="store_true",
+        help="rebuild the selected generators, record timings / peak RSS / artifact "
+             "sizes in .kct-build/benchmarks.json and fail on a per-topic regression",
+    )
+    parser.add_argument(
+        "--regression-threshold", type=float, default=benchmark.DEFAULT_THRESHOLD, metavar="RATIO",
+        help=f"allowed growth over the recent median (default: {benchmark.DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--no-validate", action="store_true",
+        help="do not check generated CSVs against their registered schemas",
+    )
+    parser.add_argument(
+        "--no-bundle", action="store_true",
+        help="do not write the typed Arrow bundle of the generated CSVs",
+    )
+    parser.add_argument(
+        "--no-aggregates", action="store_true",
+        help="do not write the precomputed rankings and group-by tables",
+    )
+    parser.add_argument(
+        "--no-calendar", action="store_true",
+        help="do not write the daily demand calendar tensor",
+    )
+    parser.add_argument(
+        "--no-career-model", action="store_true",
+        help="do not fit the career-stage Markov model",
+    )
+    parser.add_argument(
+        "--no-palette", action="store_true",
+        help="do not precompute the palette colour-difference matrices",
+    )
+    parser.add_argument(
+        "--no-lighting", action="store_true",
+        help="do not render the palette under the researched lighting types",
+    )
+    parser.add_argument(
+        "--no-colorvision", action="store_true",
+        help="do not precompute the colour-vision confusable-combination bitsets",
+    )
+    parser.add_argument(
+        "--no-camera-correction", action="store_true",
+        help="do not fit the per-phone colour-correction matrices",
+    )
+    parser.add_argument(
+        "--no-filter-luts", action="store_true",
+        help="do not build the Instagram filter 3D LUTs",
+    )
+    parser.add_argument(
+        "--no-weather-sim", action="store_true",
+        help="do not run the Monte-Carlo weather-shock simulation",
+    )
+    parser.add_argument(
+        "--weather-scenarios", type=int, default=weather.DEFAULT_SCENARIOS, metavar="N",
+        help=f"simulated weather shocks per region (default: {weather.DEFAULT_SCENARIOS:,})",
+    )
+    parser.add_argument(
+        "--weather-workers", type=int, default=1, metavar="N",
+        help="simulate regions in a pool of N processes (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--no-changes", action="store_true",
+        help="do not diff the generated records against the previous build",
+    )
+    parser.add_argument(
+        "--no-snapshot", action="store_true",
+        help="do not repack the single-file knowledge snapshot",
+    )
+    parser.add_argument(
+        "--publish", action="store_true",
+        help="atomically publish the served research CSV/JSON files into the data "
+             "directory and regenerate its index.json",
+    )
+    parser.add_argument(
+        "--publish-root", type=Path, default=config.PUBLISH_DIR, metavar="DIR",
+        help="data directory to publish into (default: dist/data)",
+    )
+    parser.add_argument(
+        "--list", action="store_true",
+        help="print the dependency graph in execution waves and exit",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    return parser
+
+
+def _print_graph(graph: BuildGraph, stale: Set[str], selected: Set[str]) -> None:
+    for index, wave in enumerate(graph.levels()):
+        wave = [node_id for node_id in wave if node_id in selected]
+        if not wave:
+            continue
+        print(f"wave {index}:")
+        for node_id in wave:
+            gen = graph.nodes[node_id]
+            deps = sorted(graph.dependencies[node_id])
+            marker = "*" if node_id in stale else " "
+            print(f" {marker}{node_id}  [{gen.kind}]")
+            for out in gen.outputs:
+                print(f"      -> {out}")
+            for dep in deps:
+                print(f"      <- {dep}")
+
+
+def _save_report(graph: BuildGraph, result: NodeResult, report_dir: Path) -> None:
+    """Keep what a generator printed, one text file per script."""
+    if not result.output:
+        return
+    gen = graph.nodes[result.node_id]
+    path = report_dir / gen.slug / f"{gen.path.stem}.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(result.output, encoding="utf-8")
+
+
+def _report(result: NodeResult) -> None:
+    if result.output:
+        logger.debug("%s printed:\n%s", result.node_id, result.output.rstrip())
+    if result.ok:
+        logger.info("%-7s %6.2fs  %s", result.status, result.duration, result.node_id)
+    else:
+        logger.error("%-7s %6.2fs  %s", result.status, result.duration, result.node_id)
+        if result.error and result.status != "skipped":
+            logger.error("%s", result.error.rstrip())
+    for rendered in result.renders:
+        if rendered.ok:
+            logger.info(
+                "  render %6.2fs %8.1f KB  %s",
+                rendered.duration, rendered.size / 1024, os.path.basename(rendered.path),
+            )
+
+
+def _report_renders(results: List[NodeResult]) -> None:
+    renders = [r for result in results for r in result.renders if r.ok]
+    if not renders:
+        return
+    total = sum(r.duration for r in renders)
+    slowest = max(renders, key=lambda r: r.duration)
+    logger.info(
+        "Rendered %d figures in %.2fs of worker time (slowest: %s, %.2fs)",
+        len(renders), total, os.path.basename(slowest.path), slowest.duration,
+    )
+
+
+def _optimize_pngs(graph: BuildGraph, results: Iterable[NodeResult], args: argparse.Namespace) -> None:
+    """Re-encode the PNGs of successful generators before the manifest records them."""
+    paths = []
+    for result in results:
+        if not result.ok:
+            continue
+        gen = graph.nodes[result.node_id]
+        directory = args.output_dir / gen.topic if args.output_dir else gen.directory
+        paths.extend(Path(os.path.normpath(directory / name)) for name in gen.outputs)
+    try:
+        images.optimize_pngs(paths, quantize=args.png_quantize)
+    except BuildError as exc:
+        logger.warning("Skipping PNG optimisation: %s", exc)
+
+
+def _select(graph: BuildGraph, only: Optional[List[str]]) -> Set[str]:
+    if not only:
+        return set(graph.nodes)
+    filters = [f.lower() for f in only]
+    return {
+        node_id for node_id, gen in graph.nodes.items()
+        if any(f in gen.topic.lower() for f in filters)
+    }
+
+
+def _manifest(args: argparse.Namespace) -> Manifest:
+    # Without png in --chart-formats the chart scripts' declared PNGs are not rendered
+    return Manifest(optional_outputs=() if "png" in args.chart_formats else (".png",))
+
+
+def _run_generators(graph: BuildGraph, stale: Set[str], args: argparse.Namespace) -> List[NodeResult]:
+    report_dir = args.output_dir / "reports" if args.output_dir else config.REPORT_DIR
+
+    def on_result(result: NodeResult) -> None:
+        _report(result)
+        _save_report(graph, result, report_dir)
+
+    outputs = ChartOutputs(
+        formats=args.chart_formats, widths=args.chart_widths,
+        directory=args.output_dir / "charts" if args.output_dir else config.CHART_DIR,
+    )
+    if not outputs.is_default and args.renderers < 1:
+        logger.warning("--chart-formats needs --renderers >= 1; charts are written as PNG only")
+    use_farm = args.renderers > 0 and (args.jobs != 1 or not outputs.is_default)
+    with RenderFarm(args.renderers, outputs) if use_farm else contextlib.nullcontext() as farm:
+        results = run_graph(
+            graph, jobs=args.jobs, selected=stale, on_result=on_result, farm=farm,
+            output_root=args.output_dir, seed=args.seed if args.deterministic else None,
+        )
+    _report_renders(list(results.values()))
+    if not args.no_optimize_png:
+        _optimize_pngs(graph, results.values(), args)
+    if use_farm and not outputs.is_default:
+        write_chart_index((r for result in results.values() for r in result.renders), outputs)
+    if args.output_dir:
+        return list(results.values())
+
+    manifest = _manifest(args)
+    for node_id, result in results.items():
+        if result.ok:
+            manifest.record(graph.nodes[node_id])
+        else:
+            manifest.forget(node_id)
+    manifest.prune(graph.nodes)
+    manifest.save()
+    return list(results.values())
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A post-build step, rerun when one of its inputs changed or its output is missing."""
+
+    name: str
+    run: Callable[[BuildGraph, argparse.Namespace], Any]
+    output: Optional[Path] = None
+    inputs: Tuple[str, ...] = ("generators",)
+    flag: Optional[str] = None  # args attribute that disables the stage
+
+
+def _write_weather(graph: BuildGraph, args: argparse.Namespace) -> Any:
+    return weather.write_simulation(
+        graph, config.SIMULATION_DIR / weather.OUTPUT_NAME, args.weather_scenarios, args.seed, args.weather_workers,
+    )
+
+
+def _write_snapshot(graph: BuildGraph, args: argparse.Namespace) -> Any:
+    return snapshot.write_snapshot(sources=snapshot.iter_sources(canonical=canonical.load_canonical()))
+
+
+# In order. Inputs: "generators" (a generator rebuilt), "palette" (the palette
+# JSON changed), "sources" (every build; the stage checks its own sources).
+STAGES: Tuple[Stage, ...] = (
+    Stage("columnar bundle", lambda graph, args: bundle.write_bundle(graph),
+          config.BUNDLE_DIR / bundle.COMBINED_NAME, flag="no_bundle"),
+    Stage("precomputed aggregates", lambda graph, args: aggregates.write_aggregates(graph),
+          config.AGGREGATE_DIR / aggregates.INDEX_NAME, flag="no_aggregates"),
+    Stage("demand calendar", lambda graph, args: demand.write_calendar(graph),
+          config.CALENDAR_DIR / demand.INDEX_NAME, flag="no_calendar"),
+    Stage("career model", lambda graph, args: career.write_career_model(graph),
+          config.CAREER_DIR / career.LOOKUP_NAME, flag="no_career_model"),
+    Stage("palette matrices", lambda graph, args: palette.write_palette(),
+          inputs=("palette",), flag="no_palette"),
+    Stage("lighting adaptation", lambda graph, args: lighting.write_lighting(graph),
+          config.LIGHTING_DIR / lighting.INDEX_NAME, ("generators", "palette"), "no_lighting"),
+    Stage("colour-vision bitsets", lambda graph, args: colorvision.write_colorvision(graph),
+          config.COLORVISION_DIR / colorvision.INDEX_NAME, ("generators", "palette"), "no_colorvision"),
+    Stage("camera colour correction", lambda graph, args: camera.write_corrections(graph),
+          config.CAMERA_DIR / camera.INDEX_NAME, ("generators", "palette"), "no_camera_correction"),
+    Stage("filter LUTs", lambda graph, args: luts.write_luts(graph),
+          config.FILTER_DIR / luts.INDEX_NAME, flag="no_filter_luts"),
+    Stage("weather simulation", _write_weather,
+          config.SIMULATION_DIR / weather.OUTPUT_NAME, flag="no_weather_sim"),
+    Stage("change feed", lambda graph, args: changes.write_changes(graph),
+          config.RECORDS_PATH, flag="no_changes"),
+    Stage("image report", lambda graph, args: images.write_image_report(graph),
+          config.IMAGE_REPORT_PATH),
+    Stage("knowledge snapshot", _write_snapshot, inputs=("sources",), flag="no_snapshot"),
+)
+
+
+def _run_stages(
+    graph: BuildGraph,
+    generators: List[Generator],
+    changed: bool,
+    args: argparse.Namespace,
+    stages: Sequence[Stage] = STAGES,
+) -> bool:
+    """Post-build stages over the whole tree. Returns ``False`` on failure."""
+    ok = True
+    canonical.write_canonical(generators)
+    if not args.no_validate:
+        try:
+            ok = validate.validate_artifacts(graph) and ok
+        except BuildError as exc:
+            logger.warning("Skipping schema validation: %s", exc)
+    if args.publish:
+        if ok:
+            try:
+                publish.publish(graph, data_dir=args.publish_root)
+            except (BuildError, OSError) as exc:
+                logger.error("Publish failed: %s", exc)
+                ok = False
+        else:
+            logger.error("Not publishing: validation failed")
+
+    dirty = {
+        "generators": changed,
+        "palette": not args.no_palette and palette.palette_stale(),
+        "sources": True,
+    }
+    for stage in stages:
+        if stage.flag and getattr(args, stage.flag):
+            continue
+        missing = stage.output is not None and not stage.output.exists()
+        if not missing and not any(dirty[name] for name in stage.inputs):
+            continue
+        try:
+            stage.run(graph, args)
+        except (BuildError, OSError, ValueError) as exc:  # one failed stage does not stop the rest
+            logger.error("Stage %s failed: %s", stage.name, exc)
+            ok = False
+    return ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(levelname)s %(message)s",
+    )
+
+    try:
+        generators = discover_generators()
+        graph = BuildGraph(canonical.drop_superseded(generators))
+    except BuildError as exc:
+        logger.error("%s", exc)
+        return 2
+
+    selected = _select(graph, args.only)
+    force = args.force or args.benchmark or args.output_dir is not None
+    if args.stages_only:
+        stale: Set[str] = set()
+    else:
+        stale = selected if force else stale_nodes(graph, _manifest(args)) & selected
+
+    if args.list:
+        _print_graph(graph, stale, selected)
+        return 0
+
+    results: List[NodeResult] = []
+    started = time.perf_counter()
+    if stale:
+        logger.info(
+            "Building %d of %d generators (%d up to date)",
+            len(stale), len(selected), len(selected) - len(stale),
+        )
+        results = _run_generators(graph, stale, args)
+    elif args.stages_only:
+        logger.info("Skipping %d generators (--stages-only)", len(selected))
+    else:
+        logger.info("All %d generators up to date", len(selected))
+
+    benchmark_ok = True
+    if args.benchmark:
+        run = benchmark.collect(
+            graph, results, time.perf_counter() - started,
+            jobs=args.jobs, renderers=args.renderers, output_root=args.output_dir,
+        )
+        benchmark_ok = benchmark.record(run, threshold=args.regression_threshold)
+
+    stages_ok = True
+    if args.output_dir is None:
+        stages_ok = _run_stages(graph, generators, changed=any(r.ok for r in results), args=args)
+
+    failed = [r for r in results if not r.ok]
+    if results:
+        logger.info("Done: %d ok, %d failed/skipped", len(results) - len(failed), len(failed))
+    return 1 if failed or not stages_ok or not benchmark_ok else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
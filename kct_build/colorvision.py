@@ -0,0 +1,217 @@
+"""
+Colour-vision deficiency simulation over the product palette.
+
+Every palette colour (:mod:`kct_build.palette`) is run through each
+``Colorblind_Type`` of ``colorblind_perception_analysis.csv`` and every
+suit x shirt x tie combination that becomes indistinguishable is marked
+in a per-type bitset::
+
+    build/knowledge/colorvision/
+        confusable.npy  uint8 [type, ceil(S * H * T / 8)], packed bits
+        index.json      types, layer colour ids, simulated hex per type
+
+* Protan, deutan and tritan types use the Machado et al. (2009)
+  full-severity matrices on linear sRGB. Anomalous types (``-anomaly``)
+  are blended towards the identity by their severity: the type's
+  confusion score on its own axis (Red_Green_Confusion for protan and
+  deutan, Blue_Yellow_Confusion for tritan) over the strongest score in
+  its family, so the matching ``-anopia`` row has severity 1.
+* Achromatopsia keeps only relative luminance; normal vision is the
+  identity.
+* A pair of garments is confused when its CIEDE2000 difference drops
+  below :data:`CONFUSION_DELTA_E` under the simulation but was at least
+  that far apart with normal vision. A combination is marked when any of
+  suit/shirt, shirt/tie or suit/tie is confused.
+
+Bit ``(s * H + h) * T + t`` (suit ``s``, shirt ``h``, tie ``t`` in
+``index.json`` order) is stored most-significant-bit first, as
+``numpy.packbits`` writes it, so accessibility filtering is a bitwise AND.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from . import config
+from .artifacts import collect_artifacts
+from .demand import slug
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .palette import (
+    PALETTE_PATH, SRGB_TO_XYZ, delta_e_2000, hex_to_rgb, linear_to_srgb, load_palette, rgb_to_hex, rgb_to_lab,
+    srgb_to_linear,
+)
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAME = "confusable.npy"
+INDEX_NAME = "index.json"
+COLORBLIND = ("colorblind_perception_analysis.csv", "colorblind_perception_analysis_1.csv")
+CONFUSION_DELTA_E = 4.0
+
+# Machado, Oliveira & Fernandes (2009), severity 1.0, linear sRGB.
+MACHADO = {
+    "protan": (
+        (0.152286, 1.052583, -0.204868),
+        (0.114503, 0.786281, 0.099216),
+        (-0.003882, -0.048116, 1.051998),
+    ),
+    "deutan": (
+        (0.367322, 0.860646, -0.227968),
+        (0.280085, 0.672501, 0.047413),
+        (-0.011820, 0.042940, 0.968881),
+    ),
+    "tritan": (
+        (1.255528, -0.076749, -0.178779),
+        (-0.078411, 0.930809, 0.147602),
+        (0.004733, 0.691367, 0.303900),
+    ),
+}
+SEVERITY_COLUMN = {"protan": "Red_Green_Confusion", "deutan": "Red_Green_Confusion", "tritan": "Blue_Yellow_Confusion"}
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"Colour-vision simulation requires numpy ({exc})") from exc
+    return np
+
+
+def deficiency_kind(label: str) -> str:
+    """``"Deuteranomaly (Green-weak)"`` -> ``"deutan"``."""
+    text = label.lower()
+    for kind, stem in (("protan", "protan"), ("deutan", "deuteran"), ("tritan", "tritan")):
+        if stem in text:
+            return kind
+    if "achromat" in text or "monochromat" in text:
+        return "achromat"
+    return "normal"
+
+
+def severities(rows: Sequence[Mapping[str, Any]]) -> List[float]:
+    """Severity in 0-1 per row (see the module docstring)."""
+    kinds = [deficiency_kind(str(row["Colorblind_Type"])) for row in rows]
+    strongest: Dict[str, float] = {}
+    for kind, row in zip(kinds, rows):
+        if kind in SEVERITY_COLUMN:
+            strongest[kind] = max(strongest.get(kind, 0.0), float(row[SEVERITY_COLUMN[kind]]))
+    out = []
+    for kind, row in zip(kinds, rows):
+        if kind in SEVERITY_COLUMN:
+            out.append(float(row[SEVERITY_COLUMN[kind]]) / strongest[kind] if strongest[kind] else 0.0)
+        else:
+            out.append(1.0 if kind == "achromat" else 0.0)
+    return out
+
+
+def simulation_matrices(kinds: Sequence[str], severity: Sequence[float]):
+    """``[K, 3, 3]`` linear-sRGB simulation matrix per type."""
+    np = _require_numpy()
+    luminance = np.array(SRGB_TO_XYZ[1])
+    full = {kind: np.array(matrix) for kind, matrix in MACHADO.items()}
+    full["achromat"] = np.tile(luminance, (3, 1))
+    full["normal"] = np.eye(3)
+    s = np.asarray(severity, dtype=float)[:, None, None]
+    return (1 - s) * np.eye(3) + s * np.stack([full[kind] for kind in kinds])
+
+
+def simulate(rgb, matrices):
+    """sRGB ``[C, 3]`` seen through each matrix: ``[K, C, 3]``."""
+    np = _require_numpy()
+    return linear_to_srgb(np.einsum("kij,cj->kci", matrices, srgb_to_linear(rgb)))
+
+
+def confusable(simulated_lab, normal_lab, layers: Sequence[Sequence[int]], threshold: float = CONFUSION_DELTA_E):
+    """``[K, S, H, T]`` bool: combinations with a newly confused garment pair."""
+    np = _require_numpy()
+    seen = delta_e_2000(simulated_lab[:, :, None, :], simulated_lab[:, None, :, :]) < threshold   # [K, C, C]
+    apart = delta_e_2000(normal_lab[:, None, :], normal_lab[None, :, :]) >= threshold           # [C, C]
+    lost = seen & apart
+    suits, shirts, ties = (np.asarray(ids) for ids in layers)
+    return (
+        lost[:, suits[:, None], shirts[None, :]][:, :, :, None]
+        | lost[:, shirts[:, None], ties[None, :]][:, None, :, :]
+        | lost[:, suits[:, None], ties[None, :]][:, :, None, :]
+    )
+
+
+def write_colorvision(
+    graph: BuildGraph,
+    out_dir: Path = config.COLORVISION_DIR,
+    palette_source: Path = PALETTE_PATH,
+) -> Optional[Dict[str, Any]]:
+    """Simulate every generated deficiency type; ``None`` if the table is missing."""
+    np = _require_numpy()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    source = next((sources[name] for name in COLORBLIND if name in sources), None)
+    if source is None:
+        logger.warning("Colour-vision simulation: %s not generated", COLORBLIND[0])
+        return None
+    with open(source.path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    colors = load_palette(palette_source)
+    try:
+        labels = [str(row["Colorblind_Type"]) for row in rows]
+        kinds = [deficiency_kind(label) for label in labels]
+        severity = severities(rows)
+    except (KeyError, ValueError) as exc:
+        logger.warning("Colour-vision simulation failed: %s", exc)
+        return None
+
+    rgb = hex_to_rgb([c.hex for c in colors])
+    simulated = simulate(rgb, simulation_matrices(kinds, severity))                              # [K, C, 3]
+    layers = [[i for i, c in enumerate(colors) if c.layer == layer] for layer in ("suits", "shirts", "ties")]
+    if not all(layers):
+        raise BuildError(f"{config.display_path(palette_source)} needs suit, shirt and tie colours")
+    mask = confusable(rgb_to_lab(simulated), rgb_to_lab(rgb), layers)                           # [K, S, H, T]
+    bits = np.packbits(mask.reshape(len(rows), -1), axis=1)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{ARRAY_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, bits)
+    os.replace(tmp, out_dir / ARRAY_NAME)
+    index = {
+        "array": ARRAY_NAME,
+        "dtype": "uint8",
+        "bit_order": "big",
+        "shape": [len(ids) for ids in layers],
+        "threshold_delta_e": CONFUSION_DELTA_E,
+        "layers": {
+            name: [colors[i].id for i in ids] for name, ids in zip(("suits", "shirts", "ties"), layers)
+        },
+        "types": [
+            {
+                "id": slug(label.split("(")[0]),
+                "label": label,
+                "kind": kind,
+                "severity": round(s, 4),
+                "population_pct": float(row.get("Population_Percentage") or 0),
+                "confusable": int(m.sum()),
+            }
+            for label, kind, s, row, m in zip(labels, kinds, severity, rows, mask)
+        ],
+        "simulated_hex": {
+            slug(label.split("(")[0]): dict(zip((c.id for c in colors), rgb_to_hex(sim)))
+            for label, sim in zip(labels, simulated)
+        },
+        "sources": {
+            config.display_path(source.path): hash_file(source.path),
+            config.display_path(palette_source): hash_file(palette_source),
+        },
+    }
+    tmp = out_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+    os.replace(tmp, out_dir / INDEX_NAME)
+    logger.info(
+        "Wrote colour-vision bitsets: %d types x %d combinations", len(rows), int(np.prod(index["shape"])),
+    )
+    return index
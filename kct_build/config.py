@@ -0,0 +1,55 @@
+"""Filesystem layout shared by every build stage."""
+
+from pathlib import Path
+
+# Repository root (the directory that contains this package).
+ROOT = Path(__file__).resolve().parent.parent
+
+# Topic trees that hold research generators, one topic per sub-folder.
+SOURCE_ROOTS = (
+    ROOT / "KCT Knowledge API Enhancement -Update-Info",
+    ROOT / "Customer Facing Chat",
+)
+
+DATA_SCRIPT_GLOB = "script*.py"
+CHART_SCRIPT_GLOB = "chart_script*.py"
+
+# Hand-curated knowledge base served by the API.
+DATA_DIR = ROOT / "src" / "data"
+# Its deployed copy (``npm run build`` copies src/data here); --publish target.
+PUBLISH_DIR = ROOT / "dist" / "data"
+
+# Local build state (manifest, caches, history). Never committed.
+STATE_DIR = ROOT / ".kct-build"
+MANIFEST_PATH = STATE_DIR / "manifest.json"
+BENCHMARK_PATH = STATE_DIR / "benchmarks.json"
+RECORDS_PATH = STATE_DIR / "records.json"
+CHART_CACHE_DIR = STATE_DIR / "chart-cache"
+
+# Derived artifacts (bundles, aggregates, precomputed tables). Never committed.
+ARTIFACT_DIR = ROOT / "build" / "knowledge"
+BUNDLE_DIR = ARTIFACT_DIR / "bundle"
+SNAPSHOT_PATH = ARTIFACT_DIR / "knowledge.snap"
+CANONICAL_PATH = ARTIFACT_DIR / "canonical.json"
+REPORT_DIR = ARTIFACT_DIR / "reports"
+AGGREGATE_DIR = ARTIFACT_DIR / "aggregates"
+RANKING_DIR = ARTIFACT_DIR / "rankings"
+CHANGES_PATH = ARTIFACT_DIR / "changes.json"
+CHART_DIR = ARTIFACT_DIR / "charts"
+IMAGE_REPORT_PATH = ARTIFACT_DIR / "images.json"
+CALENDAR_DIR = ARTIFACT_DIR / "calendar"
+SIMULATION_DIR = ARTIFACT_DIR / "simulations"
+CAREER_DIR = ARTIFACT_DIR / "career"
+PALETTE_DIR = ARTIFACT_DIR / "palette"
+LIGHTING_DIR = ARTIFACT_DIR / "lighting"
+COLORVISION_DIR = ARTIFACT_DIR / "colorvision"
+CAMERA_DIR = ARTIFACT_DIR / "camera"
+FILTER_DIR = ARTIFACT_DIR / "filters"
+
+
+def display_path(path: Path) -> str:
+    """``path`` relative to the repository root when it lives inside it."""
+    try:
+        return Path(path).resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
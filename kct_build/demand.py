@@ -0,0 +1,293 @@
+"""
+Daily demand calendar.
+
+The seasonal research tables are monthly (``monthly_seasonal_patterns.csv``,
+``graduation_season_timing.csv``) or per weather pattern
+(``unseasonable_weather_impact.csv``). This stage expands them once into a
+dense float32 tensor::
+
+    build/knowledge/calendar/
+        demand.npy     [quantity, day, category, region, scenario]
+        index.json     axis labels, source hashes
+
+* ``quantity`` is ``demand`` (relative purchase volume, 1.0 = a 10/10
+  month) or ``urgency`` (0-10, the CSV's Purchase_Urgency_Score scale).
+* ``day`` is the day of year, 0-364. Monthly values sit on each month's
+  mid-day and are interpolated linearly (wrapping December -> January),
+  so month boundaries have no steps.
+* ``category`` comes from the weather table's Affected_Categories. Each
+  category inherits the climate axis (cold / heat / wet / variable) of
+  the pattern that lists it, which decides how it follows the seasons.
+* ``region`` is one of the climate zones the API already reasons about
+  (``CLIMATE_ZONES`` in ``seasonal-rules-engine.ts``), see :data:`REGIONS`.
+* ``scenario`` 0 is ``baseline``; every other scenario is the baseline
+  with one weather shock overlaid: affected categories spike by
+  Purchase_Spike_Percentage and urgency rises towards 10 by
+  Inventory_Impact_Score, both scaled by the region's exposure (weighted
+  by Regional_Variation) and urgency also by how short the lead time is.
+
+``holiday_vs_wedding_trends.csv`` has no calendar axis and is not used.
+The array is saved with :func:`numpy.save`, so :meth:`DemandCalendar.load`
+memory-maps it and a lookup is a single index::
+
+    DemandCalendar.load().value("linen", "temperate", week=22)
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import math
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import config
+from .artifacts import collect_artifacts
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .schemas import MONTHS
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAME = "demand.npy"
+INDEX_NAME = "index.json"
+DAYS = 365
+QUANTITIES = ("demand", "urgency")
+BASELINE = "baseline"
+
+MONTHLY = "monthly_seasonal_patterns.csv"
+GRADUATION = "graduation_season_timing.csv"
+WEATHER = "unseasonable_weather_impact.csv"
+SOURCES = (MONTHLY, GRADUATION, WEATHER)
+
+# Weather pattern -> climate axis, by keyword in its name.
+AXIS_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("cold", ("cold", "chill", "frost", "snow")),
+    ("heat", ("warm", "heat", "drought")),
+    ("wet", ("rain", "storm", "wet")),
+)
+AXES = ("cold", "heat", "wet", "variable")
+# How a category on each axis follows the seasonal temperature curve.
+SEASON_AFFINITY = {"cold": -1.0, "heat": 1.0, "wet": 0.0, "variable": 0.0}
+# Largest seasonal swing of a category's demand (at Weather_Sensitivity 10).
+SEASONAL_SWING = 0.5
+# Day of year of the seasonal temperature minimum (mid-January).
+COLDEST_DAY = 19
+# Shocks with at most this lead time get their full urgency overlay.
+URGENT_LEAD_DAYS = 7
+
+# Climate zone -> (seasonal temperature amplitude, exposure per axis).
+REGIONS: Dict[str, Tuple[float, Dict[str, float]]] = {
+    "tropical": (0.1, {"cold": 0.1, "heat": 1.0, "wet": 1.0, "variable": 0.3}),
+    "temperate": (0.7, {"cold": 0.8, "heat": 0.7, "wet": 0.8, "variable": 0.9}),
+    "continental": (1.0, {"cold": 1.0, "heat": 0.9, "wet": 0.5, "variable": 1.0}),
+    "mediterranean": (0.5, {"cold": 0.3, "heat": 0.9, "wet": 0.3, "variable": 0.5}),
+}
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"The demand calendar requires numpy ({exc})") from exc
+    return np
+
+
+def slug(name: str) -> str:
+    """``"Lightweight Fabrics"`` -> ``"lightweight_fabrics"``."""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def pattern_axis(pattern: str) -> str:
+    lowered = pattern.lower()
+    for axis, keywords in AXIS_KEYWORDS:
+        if any(word in lowered for word in keywords):
+            return axis
+    return "variable"
+
+
+def day_index(
+    day_of_year: Optional[int] = None,
+    week: Optional[int] = None,
+    month: Optional[int] = None,
+) -> int:
+    """0-based calendar index for a 1-based day of year, week or month (its mid-day)."""
+    if day_of_year is not None:
+        index = day_of_year - 1
+    elif week is not None:
+        if not 1 <= week <= 53:
+            raise ValueError(f"week {week} outside the year")
+        index = min((week - 1) * 7 + 3, DAYS - 1)  # week 53 ends on 31 December
+    elif month is not None:
+        index = int(_month_mid_days()[month - 1])
+    else:
+        raise ValueError("day_of_year, week or month is required")
+    if not 0 <= index < DAYS + 1:
+        raise ValueError(f"day {index + 1} outside the year")
+    return min(index, DAYS - 1)  # 31 December of a leap year
+
+
+def _month_mid_days() -> List[float]:
+    lengths = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    starts = [sum(lengths[:i]) for i in range(12)]
+    return [start + (length - 1) / 2 for start, length in zip(starts, lengths)]
+
+
+def _monthly_curve(np, rows: Sequence[Mapping[str, Any]], column: str, default: float = 0.0):
+    """Per-day values of a Month-keyed column, linear between month mid-days."""
+    by_month = {str(row["Month"]): float(row[column]) for row in rows}
+    values = [by_month.get(month, default) for month in MONTHS]
+    return np.interp(np.arange(DAYS), _month_mid_days(), values, period=DAYS)
+
+
+def build_tensor(
+    monthly: Sequence[Mapping[str, Any]],
+    graduation: Sequence[Mapping[str, Any]],
+    weather: Sequence[Mapping[str, Any]],
+    regions: Mapping[str, Tuple[float, Mapping[str, float]]] = REGIONS,
+) -> Tuple[Any, Dict[str, List[str]]]:
+    """The calendar tensor and its axis labels from the three tables' rows."""
+    np = _require_numpy()
+    days = np.arange(DAYS)
+
+    categories: List[str] = []
+    category_axis: List[str] = []
+    for row in weather:
+        for name in str(row["Affected_Categories"]).split(","):
+            key = slug(name)
+            if key and key not in categories:
+                categories.append(key)
+                category_axis.append(pattern_axis(str(row["Weather_Pattern"])))
+    region_names = list(regions)
+
+    urgency = _monthly_curve(np, monthly, "Purchase_Urgency_Score")           # [D]
+    sensitivity = _monthly_curve(np, monthly, "Weather_Sensitivity") / 10     # [D]
+    graduation_share = _monthly_curve(np, graduation, "Graduation_Volume_Percentage") / 100
+
+    amplitude = np.array([regions[r][0] for r in region_names])               # [R]
+    warmth = -np.cos(2 * math.pi * (days - COLDEST_DAY) / DAYS)[:, None] * amplitude  # [D, R]
+    affinity = np.array([SEASON_AFFINITY[axis] for axis in category_axis])    # [C]
+    seasonal = 1 + SEASONAL_SWING * sensitivity[:, None, None] * affinity[None, :, None] * warmth[:, None, :]
+
+    base_demand = (urgency / 10 * (1 + graduation_share))[:, None, None] * seasonal   # [D, C, R]
+    base_urgency = np.clip(urgency[:, None, None] * seasonal, 0, 10)
+
+    exposure = np.array([[regions[r][1][axis] for axis in AXES] for r in region_names])  # [R, A]
+    spike = np.array([float(row["Purchase_Spike_Percentage"]) / 100 for row in weather])  # [P]
+    impact = np.array([float(row["Inventory_Impact_Score"]) / 10 for row in weather])
+    lead = np.array([max(float(row["Lead_Time_Days"]), 1.0) for row in weather])
+    variation = np.array([float(row["Regional_Variation"]) / 10 for row in weather])
+    axis_of = np.array([AXES.index(pattern_axis(str(row["Weather_Pattern"]))) for row in weather])
+    listed = [{slug(name) for name in str(row["Affected_Categories"]).split(",")} for row in weather]
+    affected = np.array([[category in names for category in categories] for names in listed], dtype=float)  # [P, C]
+    regional = (1 - variation)[:, None] + variation[:, None] * exposure[:, axis_of].T  # [P, R]
+    weight = affected[:, :, None] * regional[:, None, :]                              # [P, C, R]
+    pressure = weight * (impact * np.minimum(1, URGENT_LEAD_DAYS / lead))[:, None, None]
+
+    demand = np.concatenate([
+        base_demand[None],
+        base_demand[None] * (1 + spike[:, None, None, None] * weight[:, None]),
+    ])                                                                                 # [S, D, C, R]
+    urgent = np.concatenate([
+        base_urgency[None],
+        base_urgency[None] + (10 - base_urgency[None]) * pressure[:, None],
+    ])
+    tensor = np.stack([demand, urgent]).transpose(0, 2, 3, 4, 1).astype(np.float32)   # [Q, D, C, R, S]
+    axes = {
+        "quantity": list(QUANTITIES),
+        "category": categories,
+        "region": region_names,
+        "scenario": [BASELINE, *(slug(str(row["Weather_Pattern"])) for row in weather)],
+    }
+    return np.ascontiguousarray(tensor), axes
+
+
+def write_calendar(graph: BuildGraph, out_dir: Path = config.CALENDAR_DIR) -> Optional[Dict[str, Any]]:
+    """Build the calendar from the generated tables; ``None`` if one is missing."""
+    np = _require_numpy()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    missing = [name for name in SOURCES if name not in sources]
+    if missing:
+        logger.warning("Demand calendar: %s not generated", ", ".join(missing))
+        return None
+    rows = {}
+    for name in SOURCES:
+        with open(sources[name].path, newline="", encoding="utf-8") as fh:
+            rows[name] = list(csv.DictReader(fh))
+    try:
+        tensor, axes = build_tensor(rows[MONTHLY], rows[GRADUATION], rows[WEATHER])
+    except (KeyError, ValueError) as exc:
+        logger.warning("Demand calendar failed: %s", exc)
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{ARRAY_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, tensor)
+    os.replace(tmp, out_dir / ARRAY_NAME)
+    index = {
+        "array": ARRAY_NAME,
+        "dtype": str(tensor.dtype),
+        "shape": list(tensor.shape),
+        "layout": ["quantity", "day", "category", "region", "scenario"],
+        "days": DAYS,
+        "axes": axes,
+        "sources": {
+            config.display_path(sources[name].path): hash_file(sources[name].path) for name in SOURCES
+        },
+    }
+    tmp = out_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=2)
+    os.replace(tmp, out_dir / INDEX_NAME)
+    logger.info(
+        "Wrote demand calendar %s (%.0f KB)",
+        "x".join(map(str, tensor.shape)), tensor.nbytes / 1024,
+    )
+    return index
+
+
+class DemandCalendar:
+    """Read side: label-based lookups into the memory-mapped tensor."""
+
+    def __init__(self, array, index: Dict[str, Any]):
+        self.array = array
+        self.index = index
+        self._positions = {
+            axis: {label: i for i, label in enumerate(labels)} for axis, labels in index["axes"].items()
+        }
+
+    @classmethod
+    def load(cls, directory: Path = config.CALENDAR_DIR, mmap: bool = True) -> "DemandCalendar":
+        np = _require_numpy()
+        with open(directory / INDEX_NAME, encoding="utf-8") as fh:
+            index = json.load(fh)
+        return cls(np.load(directory / index["array"], mmap_mode="r" if mmap else None), index)
+
+    def _position(self, axis: str, label: str) -> int:
+        try:
+            return self._positions[axis][slug(label) if axis != "quantity" else label]
+        except KeyError:
+            raise KeyError(f"Unknown {axis} {label!r}") from None
+
+    def value(
+        self,
+        category: str,
+        region: str,
+        day_of_year: Optional[int] = None,
+        week: Optional[int] = None,
+        month: Optional[int] = None,
+        scenario: str = BASELINE,
+        quantity: str = "urgency",
+    ) -> float:
+        return float(self.array[
+            self._position("quantity", quantity),
+            day_index(day_of_year, week, month),
+            self._position("category", category),
+            self._position("region", region),
+            self._position("scenario", scenario),
+        ])
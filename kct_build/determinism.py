@@ -0,0 +1,153 @@
+"""
+Deterministic generation.
+
+With ``python -m kct_build --deterministic`` identical inputs produce
+byte-identical artifacts, so content hashes (manifest, publish versions,
+change feed, CDN) only move when the data does:
+
+* ``random`` and ``numpy.random`` are seeded before every generator with a
+  seed derived from the build seed and the generator's node id, so adding
+  or reordering scripts does not shift anyone else's stream. A script that
+  seeds itself (``random.seed(42)``) keeps its own seed.
+* ``SOURCE_DATE_EPOCH`` is pinned, which matplotlib honours for the dates
+  it embeds in SVG/PDF output, and ``svg.hashsalt`` fixes its SVG ids.
+* Volatile metadata is stripped from the PNG and JSON files a generator
+  wrote: ancillary PNG text/time chunks (matplotlib stamps its version,
+  some tools a timestamp or content-credential block) and timestamp keys
+  in JSON. Pixel data and every other value are left untouched.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 0
+SOURCE_DATE_EPOCH = "0"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Ancillary chunks that carry build-time metadata rather than image data.
+VOLATILE_PNG_CHUNKS = frozenset({b"tIME", b"tEXt", b"zTXt", b"iTXt", b"eXIf", b"caBX"})
+VOLATILE_JSON_KEYS = frozenset({
+    "generated", "generated_at", "generated_on", "timestamp", "created_at", "updated_at",
+    "last_updated", "build_time",
+})
+
+
+def seed_for(node_id: str, seed: int = DEFAULT_SEED) -> int:
+    """Stable 32-bit seed for one generator."""
+    digest = hashlib.sha256(f"{seed}\0{node_id}".encode()).digest()
+    return int.from_bytes(digest[:4], "big")
+
+
+def seed_generator(seed: int) -> None:
+    """Seed the global RNGs and pin embedded dates before a generator runs."""
+    random.seed(seed)
+    numpy = sys.modules.get("numpy")
+    if numpy is not None:
+        numpy.random.seed(seed)
+    os.environ["SOURCE_DATE_EPOCH"] = SOURCE_DATE_EPOCH
+    mpl = sys.modules.get("matplotlib")
+    if mpl is not None:
+        mpl.rcParams["svg.hashsalt"] = str(seed)
+
+
+# ----------------------------------------------------------------------
+# Output normalisation
+# ----------------------------------------------------------------------
+
+def _png_chunks(data: bytes) -> Iterable[Tuple[bytes, bytes]]:
+    """``(type, raw chunk bytes)`` for each chunk after the signature."""
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        end = offset + 12 + length
+        yield kind, data[offset:end]
+        offset = end
+        if kind == b"IEND":
+            return
+
+
+def strip_png(path: Path) -> bool:
+    """Drop volatile ancillary chunks from a PNG; returns ``True`` if rewritten."""
+    data = path.read_bytes()
+    if not data.startswith(PNG_SIGNATURE):
+        return False
+    kept: List[bytes] = [PNG_SIGNATURE]
+    dropped = False
+    for kind, chunk in _png_chunks(data):
+        if kind in VOLATILE_PNG_CHUNKS:
+            dropped = True
+        else:
+            kept.append(chunk)
+    if not dropped:
+        return False
+    _replace(path, b"".join(kept))
+    return True
+
+
+def _drop_volatile_keys(value: Any) -> Tuple[Any, bool]:
+    if isinstance(value, dict):
+        dropped = False
+        cleaned = {}
+        for key, item in value.items():
+            if isinstance(key, str) and key.lower() in VOLATILE_JSON_KEYS:
+                dropped = True
+                continue
+            cleaned[key], changed = _drop_volatile_keys(item)
+            dropped = dropped or changed
+        return cleaned, dropped
+    if isinstance(value, list):
+        items = [_drop_volatile_keys(item) for item in value]
+        return [item for item, _ in items], any(changed for _, changed in items)
+    return value, False
+
+
+def strip_json(path: Path) -> bool:
+    """Remove timestamp keys from a JSON file; returns ``True`` if rewritten.
+
+    Files without such keys keep their bytes exactly as the script wrote them.
+    """
+    try:
+        with open(path, encoding="utf-8") as fh:
+            document = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    cleaned, dropped = _drop_volatile_keys(document)
+    if not dropped:
+        return False
+    _replace(path, (json.dumps(cleaned, indent=2, ensure_ascii=False) + "\n").encode("utf-8"))
+    return True
+
+
+def _replace(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def normalize_outputs(paths: Iterable[Path]) -> List[Path]:
+    """Strip volatile metadata from every PNG/JSON in ``paths``; returns those rewritten."""
+    rewritten: List[Path] = []
+    for path in paths:
+        if path.is_symlink() or not path.is_file():
+            continue
+        suffix = path.suffix.lower()
+        try:
+            changed = strip_png(path) if suffix == ".png" else strip_json(path) if suffix == ".json" else False
+        except OSError as exc:
+            logger.warning("Cannot normalise %s: %s", path, exc)
+            continue
+        if changed:
+            rewritten.append(path)
+    return rewritten
+
@@ -0,0 +1,203 @@
+"""
+Generator discovery.
+
+Every topic folder holds one or more data scripts (``script.py``,
+``script_1.py``) and chart scripts (``chart_script*.py``). The files they
+read and write are recovered statically from string literals passed to the
+usual pandas / json / plotly / matplotlib calls, so discovery never has to
+import pandas or execute a script.
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Method / function names whose first positional argument is a file written.
+WRITER_CALLS = frozenset({
+    "to_csv", "to_json", "to_parquet", "to_excel",
+    "write_image", "write_html", "write_json", "savefig",
+})
+
+# Method / function names whose first positional argument is a file read.
+READER_CALLS = frozenset({
+    "read_csv", "read_json", "read_parquet", "read_excel",
+})
+
+DATA = "data"
+CHART = "chart"
+
+
+@dataclass(frozen=True)
+class Generator:
+    """A single research script and the artifacts it touches."""
+
+    path: Path
+    topic: str
+    kind: str
+    inputs: Tuple[str, ...] = field(default=())
+    outputs: Tuple[str, ...] = field(default=())
+
+    @property
+    def id(self) -> str:
+        return f"{self.topic}/{self.path.name}"
+
+    @property
+    def slug(self) -> str:
+        return topic_slug(self.topic)
+
+    @property
+    def directory(self) -> Path:
+        return self.path.parent
+
+    def _resolve(self, name: str) -> Path:
+        return Path(os.path.normpath(self.directory / name))
+
+    def output_paths(self) -> List[Path]:
+        return [self._resolve(name) for name in self.outputs]
+
+    def input_paths(self) -> List[Path]:
+        return [self._resolve(name) for name in self.inputs]
+
+
+def topic_slug(topic: str) -> str:
+    """Filesystem/URL-safe name for a topic folder.
+
+    ``"Seasonal Micro-Patterns_ Advanced Personalization"`` becomes
+    ``"seasonal-micro-patterns-advanced-personalization"``.
+    """
+    return re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+
+
+def _literal(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _call_name(call: ast.Call) -> Optional[str]:
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    return None
+
+
+def _open_mode(call: ast.Call) -> str:
+    if len(call.args) > 1:
+        mode = _literal(call.args[1])
+        if mode is not None:
+            return mode
+    for kw in call.keywords:
+        if kw.arg == "mode":
+            mode = _literal(kw.value)
+            if mode is not None:
+                return mode
+    return "r"
+
+
+def scan_io(source: str, filename: str = "<generator>") -> Tuple[List[str], List[str]]:
+    """Return ``(inputs, outputs)`` file names referenced by a script.
+
+    Only literal file names are recognised; dynamically built paths are
+    ignored, which matches how every generator in the tree is written.
+    """
+    tree = ast.parse(source, filename=filename)
+    inputs: List[str] = []
+    outputs: List[str] = []
+
+    calls = sorted(
+        (node for node in ast.walk(tree) if isinstance(node, ast.Call) and node.args),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+    for node in calls:
+        name = _call_name(node)
+        target = _literal(node.args[0])
+        if name is None or target is None:
+            continue
+
+        if name in WRITER_CALLS:
+            bucket = outputs
+        elif name in READER_CALLS:
+            bucket = inputs
+        elif name == "open":
+            mode = _open_mode(node)
+            bucket = outputs if any(flag in mode for flag in "wax") else inputs
+        else:
+            continue
+
+        if target not in bucket:
+            bucket.append(target)
+
+    return inputs, outputs
+
+
+def _script_kind(path: Path) -> str:
+    return CHART if path.name.startswith("chart_script") else DATA
+
+
+def _script_sort_key(path: Path) -> Tuple[int, str]:
+    # script.py runs before script_1.py, chart_script.py before chart_script_1.py
+    stem = path.stem
+    suffix = stem.rsplit("_", 1)[-1]
+    return (int(suffix) if suffix.isdigit() else -1, path.name)
+
+
+def iter_topic_dirs(roots: Sequence[Path] = config.SOURCE_ROOTS) -> Iterable[Path]:
+    for root in roots:
+        if not root.is_dir():
+            logger.warning("Source root not found: %s", root)
+            continue
+        for topic_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+            yield topic_dir
+
+
+def discover_generators(
+    roots: Sequence[Path] = config.SOURCE_ROOTS,
+    only: Optional[Iterable[str]] = None,
+) -> List[Generator]:
+    """Find every generator under ``roots``.
+
+    ``only`` restricts discovery to topics whose folder name contains any of
+    the given (case-insensitive) substrings.
+    """
+    filters = [f.lower() for f in only] if only else None
+    generators: List[Generator] = []
+    seen: Set[Path] = set()
+
+    for topic_dir in iter_topic_dirs(roots):
+        topic = topic_dir.name
+        if filters and not any(f in topic.lower() for f in filters):
+            continue
+
+        scripts = sorted(
+            set(topic_dir.glob(config.DATA_SCRIPT_GLOB)) | set(topic_dir.glob(config.CHART_SCRIPT_GLOB)),
+            key=lambda p: (_script_kind(p) == CHART, _script_sort_key(p)),
+        )
+        for path in scripts:
+            if path in seen:
+                continue
+            seen.add(path)
+            try:
+                inputs, outputs = scan_io(path.read_text(encoding="utf-8"), str(path))
+            except SyntaxError as exc:
+                logger.warning("Skipping %s: %s", path, exc)
+                continue
+            generators.append(Generator(
+                path=path,
+                topic=topic,
+                kind=_script_kind(path),
+                inputs=tuple(inputs),
+                outputs=tuple(outputs),
+            ))
+
+    return generators
@@ -0,0 +1,9 @@
+"""Exception types raised by the knowledge build."""
+
+
+class BuildError(Exception):
+    """Base class for knowledge build failures."""
+
+
+class GraphError(BuildError):
+    """The generator dependency graph is inconsistent (e.g. contains a cycle)."""
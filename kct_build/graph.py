@@ -0,0 +1,130 @@
+"""
+Dependency graph over discovered generators.
+
+Edges come from three sources, in order of strength:
+
+1. A generator reads a file another generator writes (``read_csv`` etc.).
+2. Two generators write the same file (``script.py`` / ``script_1.py``);
+   they are serialised in name order so the last writer is deterministic.
+3. Chart scripts in a topic depend on that topic's data scripts. The charts
+   transcribe the tables the data script prints, so a data change must
+   re-render them even though no file is read directly.
+
+Only edges of the first kind are *hard*: a failed producer blocks its
+readers. The other two only order execution (and propagate staleness).
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Set
+
+from .discovery import CHART, DATA, Generator
+from .errors import GraphError
+
+
+class BuildGraph:
+    """Directed acyclic graph of generators keyed by :attr:`Generator.id`."""
+
+    def __init__(self, generators: Iterable[Generator]):
+        self.nodes: Dict[str, Generator] = {}
+        for gen in generators:
+            if gen.id in self.nodes:
+                raise GraphError(f"Duplicate generator id: {gen.id}")
+            self.nodes[gen.id] = gen
+
+        self._deps: Dict[str, Set[str]] = {node_id: set() for node_id in self.nodes}
+        self._hard: Dict[str, Set[str]] = {node_id: set() for node_id in self.nodes}
+        self._build_edges()
+        self._order = self._toposort()
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _build_edges(self) -> None:
+        writers: Dict[str, List[str]] = defaultdict(list)
+        by_topic: Dict[str, List[Generator]] = defaultdict(list)
+
+        for gen in self.nodes.values():
+            by_topic[gen.topic].append(gen)
+            for out in gen.output_paths():
+                writers[str(out)].append(gen.id)
+
+        for gen in self.nodes.values():
+            for inp in gen.input_paths():
+                for producer in writers.get(str(inp), ()):
+                    if producer != gen.id:
+                        self._deps[gen.id].add(producer)
+                        self._hard[gen.id].add(producer)
+
+        for ids in writers.values():
+            for earlier, later in zip(ids, ids[1:]):
+                self._deps[later].add(earlier)
+
+        for gens in by_topic.values():
+            data_ids = [g.id for g in gens if g.kind == DATA]
+            for gen in gens:
+                if gen.kind == CHART:
+                    self._deps[gen.id].update(data_ids)
+
+    def _toposort(self) -> List[str]:
+        remaining = {node_id: set(deps) for node_id, deps in self._deps.items()}
+        order: List[str] = []
+        while remaining:
+            ready = sorted(node_id for node_id, deps in remaining.items() if not deps)
+            if not ready:
+                raise GraphError(f"Dependency cycle among: {', '.join(sorted(remaining))}")
+            for node_id in ready:
+                del remaining[node_id]
+                order.append(node_id)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.nodes
+
+    @property
+    def dependencies(self) -> Mapping[str, Set[str]]:
+        return self._deps
+
+    def is_hard_dependency(self, node_id: str, dep: str) -> bool:
+        """True if ``node_id`` actually reads a file produced by ``dep``."""
+        return dep in self._hard[node_id]
+
+    def dependents(self, node_id: str) -> Set[str]:
+        return {other for other, deps in self._deps.items() if node_id in deps}
+
+    def topological_order(self) -> List[str]:
+        return list(self._order)
+
+    def levels(self) -> List[List[str]]:
+        """Group nodes into waves that can run concurrently."""
+        depth: Dict[str, int] = {}
+        for node_id in self._order:
+            deps = self._deps[node_id]
+            depth[node_id] = 1 + max((depth[d] for d in deps), default=-1)
+        waves: Dict[int, List[str]] = defaultdict(list)
+        for node_id, level in depth.items():
+            waves[level].append(node_id)
+        return [sorted(waves[level]) for level in sorted(waves)]
+
+    def descendants(self, node_ids: Iterable[str]) -> Set[str]:
+        """Return ``node_ids`` plus everything downstream of them."""
+        result: Set[str] = set()
+        stack = list(node_ids)
+        while stack:
+            node_id = stack.pop()
+            if node_id in result:
+                continue
+            result.add(node_id)
+            stack.extend(self.dependents(node_id))
+        return result
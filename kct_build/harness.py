@@ -0,0 +1,177 @@
+"""
+In-process execution harness for generators.
+
+The heavy libraries every generator imports (pandas, numpy, plotly, and
+matplotlib/seaborn for the odd script) are imported once with
+:func:`preload`; with the ``fork`` start method the build workers inherit
+them already initialised. Each generator then runs as ``__main__`` in a
+fresh module namespace inside :func:`sandbox`, which
+
+* switches into the generator's working directory (its topic folder, or a
+  separate output directory with the script's inputs staged into it),
+* captures everything the script prints as its report, and
+* restores process-wide state the scripts are known to touch
+  (matplotlib ``rcParams`` via ``plt.style.use`` / ``sns.set_palette``,
+  open figures, ``sys.argv``) so one script cannot leak into the next.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib
+import io
+import logging
+import os
+import runpy
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PRELOAD = (
+    "numpy",
+    "pandas",
+    "plotly.graph_objects",
+    "plotly.express",
+    "plotly.io",
+    "plotly.subplots",
+    "matplotlib",
+    "matplotlib.pyplot",
+    "seaborn",
+)
+
+_preloaded: Dict[str, float] = {}
+
+
+def preload(modules: Sequence[str] = PRELOAD) -> Dict[str, float]:
+    """Import ``modules`` once, returning the seconds each import took.
+
+    Missing optional libraries are skipped; a script that needs one fails
+    on its own import exactly as it would when run by hand.
+    """
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    for name in modules:
+        if name in _preloaded:
+            continue
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as exc:
+            logger.debug("Not preloading %s: %s", name, exc)
+            continue
+        _preloaded[name] = time.perf_counter() - started
+    return dict(_preloaded)
+
+
+# ----------------------------------------------------------------------
+# Peak memory
+# ----------------------------------------------------------------------
+
+_STATUS = "/proc/self/status"
+_CLEAR_REFS = "/proc/self/clear_refs"
+
+
+def reset_peak_rss() -> None:
+    """Reset the process's RSS high-water mark (Linux); no-op elsewhere."""
+    with contextlib.suppress(OSError):
+        with open(_CLEAR_REFS, "w") as fh:
+            fh.write("5")
+
+
+def peak_rss() -> int:
+    """Peak resident set size in bytes since the last :func:`reset_peak_rss`.
+
+    Falls back to the lifetime peak from ``getrusage`` where ``/proc`` is
+    unavailable, which over-reports for reused workers.
+    """
+    with contextlib.suppress(OSError, ValueError):
+        with open(_STATUS) as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ----------------------------------------------------------------------
+# Process state the generators mutate
+# ----------------------------------------------------------------------
+
+@contextlib.contextmanager
+def _isolated_state() -> Iterator[None]:
+    saved_argv = list(sys.argv)
+    mpl = sys.modules.get("matplotlib")
+    saved_rc = dict(mpl.rcParams) if mpl is not None else None
+    try:
+        yield
+    finally:
+        sys.argv[:] = saved_argv
+        mpl = sys.modules.get("matplotlib")
+        if mpl is not None:
+            plt = sys.modules.get("matplotlib.pyplot")
+            if plt is not None:
+                plt.close("all")
+            if saved_rc is not None:
+                with contextlib.suppress(Exception):
+                    mpl.rcParams.update(saved_rc)
+            else:
+                mpl.rcdefaults()
+
+
+def _stage_inputs(workdir: Path, source_dir: Path, inputs: Iterable[str]) -> List[Path]:
+    """Link inputs that are not already in ``workdir`` from ``source_dir``."""
+    staged: List[Path] = []
+    for name in inputs:
+        target = Path(os.path.normpath(workdir / name))
+        source = Path(os.path.normpath(source_dir / name))
+        if target.exists() or not source.is_file():
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.symlink(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        staged.append(target)
+    return staged
+
+
+@contextlib.contextmanager
+def sandbox(
+    script: Path,
+    output_dir: Optional[Path] = None,
+    inputs: Iterable[str] = (),
+) -> Iterator[io.StringIO]:
+    """Run the body as ``script`` would run by hand; yields the report buffer.
+
+    With ``output_dir`` the script runs there instead of in its own folder,
+    and its ``inputs`` (paths relative to the script) are staged alongside
+    so relative reads still resolve. Staged inputs are removed afterwards,
+    leaving only what the script wrote.
+    """
+    workdir = Path(output_dir) if output_dir is not None else script.parent
+    workdir.mkdir(parents=True, exist_ok=True)
+    staged = _stage_inputs(workdir, script.parent, inputs) if output_dir is not None else []
+    report = io.StringIO()
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        with _isolated_state(), contextlib.redirect_stdout(report):
+            sys.argv[:] = [str(script)]
+            yield report
+    finally:
+        os.chdir(previous_cwd)
+        for path in staged:
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+
+def run_module(script: Path) -> Dict[str, object]:
+    """Execute ``script`` as ``__main__`` in a fresh module namespace."""
+    return runpy.run_path(str(script), run_name="__main__")
@@ -0,0 +1,241 @@
+"""
+PNG optimisation and perceptual near-duplicate detection.
+
+Kaleido and matplotlib write RGBA PNGs at default compression. After the
+generators run, every PNG they wrote is re-encoded losslessly:
+
+* an alpha channel that is fully opaque is dropped,
+* images with at most 256 colours become an exact palette image
+  (with per-entry transparency when needed),
+* pixels are written with maximum zlib compression (``optimize=True``).
+
+The re-encoded pixels are compared with the originals and the file is only
+replaced when it is smaller and identical. ``--png-quantize N`` adds lossy
+palette quantisation to ``N`` colours for chart-like images (few source
+colours; photographs are left alone).
+
+:func:`write_image_report` then hashes every generated PNG with a 256-bit
+DCT perceptual hash and flags pairs within :data:`NEAR_DUPLICATE_DISTANCE`
+bits (re-renders of one chart at another size or encoding) in
+``build/knowledge/images.json``.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import config
+from .artifacts import collect_artifacts
+from .errors import BuildError
+from .graph import BuildGraph
+
+logger = logging.getLogger(__name__)
+
+PALETTE_COLORS = 256
+# Images with more distinct colours than this are treated as photographs
+# and never quantised.
+QUANTIZE_MAX_SOURCE_COLORS = 8192
+# 16 x 16 low-frequency DCT bits. An 8 x 8 hash cannot tell the repo's
+# white-background charts apart (distinct charts land 6 bits apart); at 256
+# bits distinct charts are >= 60 bits apart and re-renders ~0.
+HASH_SIZE = 16
+HASH_SAMPLE = 64
+NEAR_DUPLICATE_DISTANCE = 24
+
+
+@dataclass
+class PngResult:
+    path: Path
+    before: int
+    after: int
+    mode: str = ""
+    error: Optional[str] = None
+
+    @property
+    def saved(self) -> int:
+        return self.before - self.after
+
+
+def _require_imaging():
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError as exc:
+        raise BuildError(f"PNG optimisation requires Pillow and numpy ({exc})") from exc
+    return np, Image
+
+
+def _exact_palette(np, Image, rgba):
+    """Palette image for ``rgba`` (H x W x 4) if it has <= 256 colours."""
+    keys = np.ascontiguousarray(rgba).view(np.uint32).reshape(rgba.shape[:2])
+    colors, index = np.unique(keys, return_inverse=True)
+    if len(colors) > PALETTE_COLORS:
+        return None
+    entries = colors.view(np.uint8).reshape(-1, 4)
+    image = Image.fromarray(index.reshape(keys.shape).astype(np.uint8), "P")
+    image.putpalette(entries[:, :3].tobytes(), rawmode="RGB")
+    if (entries[:, 3] != 255).any():
+        image.info["transparency"] = entries[:, 3].tobytes()
+    return image
+
+
+def _lossless_candidate(np, Image, image):
+    """Smallest-mode equivalent of ``image`` (pixels unchanged)."""
+    rgba = np.asarray(image.convert("RGBA"))
+    palette = _exact_palette(np, Image, rgba)
+    if palette is not None:
+        return palette
+    if image.mode == "RGBA" and (rgba[..., 3] == 255).all():
+        return image.convert("RGB")
+    return image
+
+
+def _encode(image) -> bytes:
+    buffer = io.BytesIO()
+    save = {"optimize": True}
+    if "transparency" in image.info:
+        save["transparency"] = image.info["transparency"]
+    image.save(buffer, format="PNG", **save)
+    return buffer.getvalue()
+
+
+def optimize_png(path: Path, quantize: Optional[int] = None) -> PngResult:
+    """Re-encode one PNG in place; see the module docstring."""
+    np, Image = _require_imaging()
+    original = path.read_bytes()
+    with Image.open(io.BytesIO(original)) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA", "P", "L", "LA"):
+            return PngResult(path, len(original), len(original), image.mode)
+        pixels = np.asarray(image.convert("RGBA"))
+        candidate = _lossless_candidate(np, Image, image)
+        lossy = False
+        if quantize and candidate.mode != "P":
+            if len(np.unique(pixels.view(np.uint32))) <= QUANTIZE_MAX_SOURCE_COLORS:
+                candidate = candidate.quantize(
+                    min(quantize, PALETTE_COLORS),
+                    method=Image.Quantize.FASTOCTREE if candidate.mode == "RGBA" else Image.Quantize.MEDIANCUT,
+                    dither=Image.Dither.NONE,
+                )
+                lossy = True
+        encoded = _encode(candidate)
+
+    if len(encoded) >= len(original):
+        return PngResult(path, len(original), len(original), image.mode)
+    if not lossy:
+        with Image.open(io.BytesIO(encoded)) as check:
+            if not np.array_equal(np.asarray(check.convert("RGBA")), pixels):
+                return PngResult(path, len(original), len(original), image.mode, error="re-encode changed pixels")
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(encoded)
+    os.replace(tmp, path)
+    return PngResult(path, len(original), len(encoded), candidate.mode)
+
+
+def optimize_pngs(
+    paths: Iterable[Path],
+    quantize: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> List[PngResult]:
+    """Optimise ``paths`` concurrently (Pillow's zlib encoder releases the GIL)."""
+    _require_imaging()
+    paths = sorted({Path(p) for p in paths if Path(p).suffix.lower() == ".png" and Path(p).is_file()})
+
+    def run(path: Path) -> PngResult:
+        try:
+            return optimize_png(path, quantize)
+        except (OSError, ValueError) as exc:
+            size = path.stat().st_size if path.exists() else 0
+            return PngResult(path, size, size, error=str(exc))
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        results = list(pool.map(run, paths))
+    for result in results:
+        if result.error:
+            logger.warning("PNG %s not optimised: %s", config.display_path(result.path), result.error)
+    before = sum(r.before for r in results)
+    after = sum(r.after for r in results)
+    if results:
+        logger.info(
+            "Optimised %d PNGs: %.0f KB -> %.0f KB (-%.0f%%)",
+            len(results), before / 1024, after / 1024, (1 - after / before) * 100 if before else 0,
+        )
+    return results
+
+
+# ----------------------------------------------------------------------
+# Perceptual hashing
+# ----------------------------------------------------------------------
+
+def _dct_matrix(np, n: int):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+def perceptual_hash(path: Path) -> int:
+    """pHash: low-frequency DCT coefficients above their median, as an int."""
+    np, Image = _require_imaging()
+    with Image.open(path) as image:
+        gray = image.convert("L").resize((HASH_SAMPLE, HASH_SAMPLE), Image.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.float64)
+    dct = _dct_matrix(np, HASH_SAMPLE)
+    low = (dct @ pixels @ dct.T)[:HASH_SIZE, :HASH_SIZE].reshape(-1)
+    bits = low[1:] > np.median(low[1:])  # the DC term only encodes brightness
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def near_duplicates(hashes: Dict[str, int], distance: int = NEAR_DUPLICATE_DISTANCE) -> List[Dict[str, Any]]:
+    pairs = []
+    for (a, ha), (b, hb) in combinations(sorted(hashes.items()), 2):
+        bits = hamming(ha, hb)
+        if bits <= distance:
+            pairs.append({"a": a, "b": b, "distance": bits})
+    return sorted(pairs, key=lambda pair: (pair["distance"], pair["a"], pair["b"]))
+
+
+def write_image_report(
+    graph: BuildGraph,
+    out_path: Path = config.IMAGE_REPORT_PATH,
+    distance: int = NEAR_DUPLICATE_DISTANCE,
+) -> Dict[str, Any]:
+    """Hash every generated PNG and record near-duplicate pairs."""
+    images: Dict[str, Dict[str, Any]] = {}
+    hashes: Dict[str, int] = {}
+    for artifact in collect_artifacts(graph, suffixes=[".png"]):
+        key = config.display_path(artifact.path)
+        try:
+            value = perceptual_hash(artifact.path)
+        except OSError as exc:
+            logger.warning("Cannot hash %s: %s", key, exc)
+            continue
+        hashes[key] = value
+        images[key] = {
+            "producer": artifact.producer,
+            "bytes": artifact.path.stat().st_size,
+            "phash": f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}",
+        }
+
+    pairs = near_duplicates(hashes, distance)
+    for pair in pairs:
+        logger.warning("near-duplicate charts (%d bits): %s ~ %s", pair["distance"], pair["a"], pair["b"])
+    report = {"distance": distance, "images": images, "near_duplicates": pairs}
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    os.replace(tmp, out_path)
+    return report
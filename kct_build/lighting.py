@@ -0,0 +1,215 @@
+"""
+Palette colours under venue lighting.
+
+``lighting_color_perception_1.csv`` lists each light source's
+Color_Temperature_K and Fabric_Color_Shift. This stage renders every
+palette colour (:mod:`kct_build.palette`) under every light in one
+batched chromatic-adaptation pass and stores the result as a lookup
+cube::
+
+    build/knowledge/lighting/
+        perceived.npy   float32 [colour, light, (L, a, b, ΔE)]
+        index.json      colours, lights, perceived hex per colour x light
+
+For each light:
+
+* the white point is the Planckian locus at the colour temperature below
+  5000K and the CIE daylight locus from 5000K up (the CIE 13.3 reference
+  illuminant rule),
+* the fabric's stimulus under that light is the D65 colour carried to the
+  light's white point with a von Kries transform in CAT16 (or Bradford)
+  cone space,
+* the viewer adapts to the light with the CAT16 degree of adaptation at
+  :data:`ADAPTING_LUMINANCE`; Fabric_Color_Shift widens the unadapted
+  remainder (``1 - D``) by ``1 + shift``, so a light that shifts fabric
+  colours leaves more of its cast visible.
+
+Both steps are diagonal in cone space, so each light is a single 3x3
+matrix and the whole cube is one ``einsum``. Lab and ΔE (CIEDE2000
+against the colour in daylight) are relative to D65, the white the
+palette hex codes are defined under.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import config
+from .artifacts import collect_artifacts
+from .demand import slug
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .palette import (
+    D65, PALETTE_PATH, delta_e_2000, hex_to_rgb, lab_to_rgb, load_palette, rgb_to_hex, rgb_to_xyz, xyz_to_lab,
+)
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAME = "perceived.npy"
+INDEX_NAME = "index.json"
+# Preferred first; the research folder carries the table under both names.
+LIGHTING = ("lighting_color_perception_1.csv", "lighting_color_perception.csv")
+
+CAT16 = (
+    (0.401288, 0.650173, -0.051461),
+    (-0.250268, 1.204414, 0.045854),
+    (-0.002079, 0.048952, 0.953127),
+)
+BRADFORD = (
+    (0.8951, 0.2664, -0.1614),
+    (-0.7502, 1.7135, 0.0367),
+    (0.0389, -0.0685, 1.0296),
+)
+METHODS = {"cat16": CAT16, "bradford": BRADFORD}
+
+# cd/m^2; a lit indoor venue. CAT16 surround factor F = 1 (average).
+ADAPTING_LUMINANCE = 64.0
+SURROUND = 1.0
+DAYLIGHT_FROM_K = 5000.0
+
+_KELVIN = re.compile(r"\(\s*\d+\s*K\s*\)", re.IGNORECASE)
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"Lighting adaptation requires numpy ({exc})") from exc
+    return np
+
+
+def light_key(label: str) -> str:
+    """``"Incandescent (2700K)"`` -> ``"incandescent"``."""
+    return slug(_KELVIN.sub("", label))
+
+
+def white_point(kelvin):
+    """``[..., 3]`` XYZ (Y = 1) of the reference illuminant at each colour temperature."""
+    np = _require_numpy()
+    t = np.clip(np.asarray(kelvin, dtype=float), 1667, 25000)
+    # CIE daylight locus.
+    day_x = np.where(
+        t <= 7000,
+        -4.6070e9 / t**3 + 2.9678e6 / t**2 + 0.09911e3 / t + 0.244063,
+        -2.0064e9 / t**3 + 1.9018e6 / t**2 + 0.24748e3 / t + 0.237040,
+    )
+    day_y = -3.0 * day_x**2 + 2.870 * day_x - 0.275
+    # Planckian locus (Kim et al. 2002 cubic spline).
+    bb_x = np.where(
+        t <= 4000,
+        -0.2661239e9 / t**3 - 0.2343589e6 / t**2 + 0.8776956e3 / t + 0.179910,
+        -3.0258469e9 / t**3 + 2.1070379e6 / t**2 + 0.2226347e3 / t + 0.240390,
+    )
+    bb_y = np.where(
+        t <= 2222,
+        -1.1063814 * bb_x**3 - 1.34811020 * bb_x**2 + 2.18555832 * bb_x - 0.20219683,
+        np.where(
+            t <= 4000,
+            -0.9549476 * bb_x**3 - 1.37418593 * bb_x**2 + 2.09137015 * bb_x - 0.16748867,
+            3.0817580 * bb_x**3 - 5.87338670 * bb_x**2 + 3.75112997 * bb_x - 0.37001483,
+        ),
+    )
+    x = np.where(t >= DAYLIGHT_FROM_K, day_x, bb_x)
+    y = np.where(t >= DAYLIGHT_FROM_K, day_y, bb_y)
+    return np.stack([x / y, np.ones_like(x), (1 - x - y) / y], axis=-1)
+
+
+def adaptation_degree(shift=0.0, luminance: float = ADAPTING_LUMINANCE, surround: float = SURROUND):
+    """CAT16 degree of adaptation with the unadapted part widened by ``1 + shift``."""
+    np = _require_numpy()
+    full = surround * (1 - np.exp((-luminance - 42) / 92) / 3.6)
+    return np.clip(1 - (1 - full) * (1 + np.asarray(shift, dtype=float)), 0.0, 1.0)
+
+
+def adaptation_matrices(whites, degree, method: str = "cat16", reference=D65):
+    """``[L, 3, 3]`` XYZ maps from a D65 colour to how it is seen under each white.
+
+    Per light, in cone space: the stimulus is scaled by ``w / w_ref`` and the
+    viewer's adaptation divides a fraction ``degree`` of that back out, so
+    the net gain is ``degree + (1 - degree) * w / w_ref``.
+    """
+    np = _require_numpy()
+    try:
+        cone = np.array(METHODS[method])
+    except KeyError:
+        raise BuildError(f"Unknown chromatic adaptation {method!r} (expected one of {', '.join(METHODS)})") from None
+    ratio = (np.asarray(whites) @ cone.T) / (cone @ np.asarray(reference))                  # [L, 3]
+    degree = np.asarray(degree, dtype=float)[..., None]
+    gain = degree + (1 - degree) * ratio
+    return np.linalg.inv(cone) @ (gain[..., :, None] * cone)
+
+
+def perceive(rgb, kelvin, shift, method: str = "cat16"):
+    """Lab ``[C, L, 3]`` and ΔE ``[C, L]`` of sRGB colours under each light."""
+    np = _require_numpy()
+    xyz = rgb_to_xyz(rgb)                                                                     # [C, 3]
+    maps = adaptation_matrices(white_point(kelvin), adaptation_degree(shift), method)        # [L, 3, 3]
+    seen = np.einsum("lij,cj->cli", maps, xyz)
+    lab = xyz_to_lab(seen)
+    return lab, delta_e_2000(lab, xyz_to_lab(xyz)[:, None, :])
+
+
+def write_lighting(
+    graph: BuildGraph,
+    out_dir: Path = config.LIGHTING_DIR,
+    palette_source: Path = PALETTE_PATH,
+    method: str = "cat16",
+) -> Optional[Dict[str, Any]]:
+    """Render the palette under every generated light; ``None`` if the table is missing."""
+    np = _require_numpy()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    source = next((sources[name] for name in LIGHTING if name in sources), None)
+    if source is None:
+        logger.warning("Lighting adaptation: %s not generated", LIGHTING[0])
+        return None
+    with open(source.path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    colors = load_palette(palette_source)
+    try:
+        kelvin = np.array([float(row["Color_Temperature_K"]) for row in rows])
+        shift = np.array([float(row["Fabric_Color_Shift"]) for row in rows])
+        labels = [str(row["Lighting_Type"]) for row in rows]
+    except (KeyError, ValueError) as exc:
+        logger.warning("Lighting adaptation failed: %s", exc)
+        return None
+
+    lab, delta_e = perceive(hex_to_rgb([c.hex for c in colors]), kelvin, shift, method)
+    cube = np.concatenate([lab, delta_e[..., None]], axis=-1).astype(np.float32)
+    hexes = np.array(rgb_to_hex(lab_to_rgb(lab))).reshape(len(colors), len(rows))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{ARRAY_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, cube)
+    os.replace(tmp, out_dir / ARRAY_NAME)
+    degree = adaptation_degree(shift)
+    index = {
+        "array": ARRAY_NAME,
+        "dtype": "float32",
+        "channels": ["L", "a", "b", "delta_e"],
+        "method": method,
+        "colors": [c.id for c in colors],
+        "lights": [
+            {"id": light_key(label), "label": label, "kelvin": float(k), "fabric_shift": float(s),
+             "adaptation": round(float(d), 4)}
+            for label, k, s, d in zip(labels, kelvin, shift, degree)
+        ],
+        "hex": hexes.tolist(),
+        "sources": {
+            config.display_path(source.path): hash_file(source.path),
+            config.display_path(palette_source): hash_file(palette_source),
+        },
+    }
+    tmp = out_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+    os.replace(tmp, out_dir / INDEX_NAME)
+    logger.info("Wrote %d palette colours x %d lights", len(colors), len(rows))
+    return index
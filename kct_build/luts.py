@@ -0,0 +1,339 @@
+"""
+3D LUTs for Instagram filters.
+
+``instagram_filter_color_impact.csv`` scores how far each filter pushes
+navy, gray and brown suits and white shirts. This stage synthesises a
+forward and an inverse :data:`LUT_SIZE`\\ :sup:`3` LUT per filter, so
+customer photos can be normalised in bulk before they are matched to
+catalogue colours::
+
+    build/knowledge/filters/
+        luts.npy     float16 [filter, (forward, inverse), r, g, b, rgb]
+        index.json   filters, round-trip error
+
+    python -m kct_build.luts --filter valencia photo.jpg ... -o normalised/
+    python -m kct_build.luts --filter valencia --cube valencia.cube
+
+The table gives magnitudes, not looks, so each filter's character
+(:data:`LOOKS`: colour cast, faded blacks, saturation and contrast) is a
+fixed approximation of the published filter, applied with a strength
+that depends on the pixel: Navy_Suit_Distortion in the shadows,
+Gray_Suit_Distortion in the midtones and White_Shirt_Impact in the
+highlights (blended by luma), plus Brown_Suit_Distortion on warm pixels.
+
+The inverse LUT solves ``forward(x) = y`` at every grid point by
+fixed-point iteration over the trilinear forward LUT. A filter that
+throws colour away (Inkwell, Moon) has no exact inverse; its
+``roundtrip_error`` in ``index.json`` says how far a normalised photo
+stays from the original.
+
+:func:`apply_lut` interpolates trilinearly over ``uint8`` or float
+``[..., H, W, 3]`` batches with array indexing only, a fixed-size chunk
+of pixels at a time; LUTs are indexed
+``[r, g, b]`` on sRGB values, the ``.cube`` convention.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+from . import config
+from .artifacts import collect_artifacts
+from .demand import slug
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+from .palette import SRGB_TO_XYZ
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAME = "luts.npy"
+INDEX_NAME = "index.json"
+FILTERS = "instagram_filter_color_impact.csv"
+LUT_SIZE = 33
+INVERSE_ITERATIONS = 25
+INVERSE_STEP = 1.0
+# Pixels per apply_lut step.
+CHUNK_PIXELS = 1 << 14
+# Scale of each look component at distortion 1.
+TINT = 0.25
+FADE = 0.35
+
+
+class Look(NamedTuple):
+    """Direction of a filter's edit: warm (+) / cool (-) cast, lifted blacks, saturation, contrast."""
+
+    tint: float = 0.0
+    fade: float = 0.0
+    saturation: float = 0.0
+    contrast: float = 0.0
+
+
+LOOKS: Dict[str, Look] = {
+    "no_filter": Look(),
+    "valencia": Look(tint=0.6, fade=0.5, saturation=-0.2, contrast=-0.1),
+    "x_pro_ii": Look(tint=0.5, saturation=0.4, contrast=0.6),
+    "lo_fi": Look(tint=0.2, saturation=0.6, contrast=0.7),
+    "earlybird": Look(tint=0.7, fade=0.5, saturation=-0.3),
+    "sutro": Look(tint=-0.2, fade=0.2, saturation=-0.5, contrast=0.3),
+    "toaster": Look(tint=0.8, fade=0.3, contrast=0.4),
+    "brannan": Look(tint=0.2, saturation=-0.4, contrast=0.6),
+    "inkwell": Look(saturation=-2.0, contrast=0.2),
+    "walden": Look(tint=0.6, fade=0.6, saturation=-0.3, contrast=-0.3),
+    "hefe": Look(tint=0.4, saturation=0.4, contrast=0.4),
+    "1977": Look(tint=0.5, fade=0.6, saturation=-0.1, contrast=-0.2),
+    "nashville": Look(tint=0.6, fade=0.5, contrast=-0.1),
+    "kelvin": Look(tint=1.0, saturation=0.3, contrast=0.2),
+    "hudson": Look(tint=-0.6, saturation=-0.1, contrast=0.3),
+    "clarendon": Look(tint=-0.4, saturation=0.4, contrast=0.4),
+    "gingham": Look(fade=0.7, saturation=-0.4, contrast=-0.3),
+    "moon": Look(saturation=-2.0, contrast=0.5, fade=0.2),
+    "lark": Look(tint=-0.3, saturation=-0.3, contrast=-0.1),
+    "reyes": Look(tint=0.3, fade=0.7, saturation=-0.4, contrast=-0.4),
+}
+ZONES = ("Navy_Suit_Distortion", "Gray_Suit_Distortion", "White_Shirt_Impact")
+WARM = "Brown_Suit_Distortion"
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"Filter LUTs require numpy ({exc})") from exc
+    return np
+
+
+def identity_lut(size: int = LUT_SIZE):
+    """``[size, size, size, 3]`` grid of its own ``(r, g, b)`` coordinates."""
+    np = _require_numpy()
+    axis = np.linspace(0.0, 1.0, size)
+    return np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1)
+
+
+def filter_colors(rgb, look: Look, zones: Sequence[float], warm: float):
+    """The modelled filter applied to sRGB values ``[..., 3]`` in 0-1.
+
+    ``zones`` are the shadow, midtone and highlight distortions and
+    ``warm`` the extra distortion of warm pixels, all in 0-1.
+    """
+    np = _require_numpy()
+    rgb = np.asarray(rgb, dtype=float)
+    luma = rgb @ np.array(SRGB_TO_XYZ[1])
+    weights = np.stack([(1 - luma) ** 2, 2 * luma * (1 - luma), luma**2], axis=-1)
+    strength = weights @ np.asarray(zones, dtype=float)
+    strength = strength + warm * np.clip(rgb[..., 0] - rgb[..., 2], 0, 1)
+    d = strength[..., None]
+
+    out = 0.5 + (rgb - 0.5) * (1 + look.contrast * d)
+    lift = FADE * look.fade * d
+    out = lift + out * (1 - lift)
+    out = out + TINT * look.tint * d * np.array([1.0, 0.25, -1.0])
+    grey = (out @ np.array(SRGB_TO_XYZ[1]))[..., None]
+    out = grey + (out - grey) * np.maximum(1 + look.saturation * d, 0)
+    return np.clip(out, 0, 1)
+
+
+def _interpolate(np, position, flat, size: int, out) -> None:
+    """Trilinear lookup of ``[N, 3]`` grid positions into ``out`` (``[N, 3]`` float32)."""
+    low = np.minimum(position.astype(np.intp), size - 2)
+    frac = position - low
+    base = (low[:, 0] * size + low[:, 1]) * size + low[:, 2]
+    fr, fg, fb = frac[:, 0:1], frac[:, 1:2], frac[:, 2:3]
+    out[...] = 0
+    for dr in (0, 1):
+        wr = fr if dr else 1 - fr
+        for dg in (0, 1):
+            wrg = wr * (fg if dg else 1 - fg)
+            for db in (0, 1):
+                corner = np.take(flat, base + ((dr * size + dg) * size + db), axis=0)
+                corner *= wrg * (fb if db else 1 - fb)
+                out += corner
+
+
+def apply_lut(images, lut, chunk: int = CHUNK_PIXELS):
+    """Trilinear lookup of ``[..., 3]`` sRGB values (``uint8`` or float 0-1) in ``lut``.
+
+    ``uint8`` input gives ``uint8`` output; float input gives float32.
+    Pixels are processed ``chunk`` at a time, so the interpolation
+    temporaries stay a few MB however large the batch is.
+    """
+    np = _require_numpy()
+    images = np.asarray(images)
+    if images.shape[-1] != 3:
+        raise ValueError(f"expected RGB values [..., 3], got shape {images.shape}")
+    lut = np.asarray(lut, dtype=np.float32)
+    size = lut.shape[0]
+    flat = lut.reshape(-1, 3)
+    pixels = images.reshape(-1, 3)
+    as_bytes = images.dtype == np.uint8
+    positions = np.arange(256, dtype=np.float32) * np.float32((size - 1) / 255) if as_bytes else None
+    out = np.empty(pixels.shape, dtype=np.uint8 if as_bytes else np.float32)
+    values = np.empty((min(chunk, len(pixels)), 3), dtype=np.float32)
+    for start in range(0, len(pixels), chunk):
+        part = pixels[start:start + chunk]
+        if as_bytes:
+            position = positions[part]
+        else:
+            position = np.clip(part.astype(np.float32) * np.float32(size - 1), 0, size - 1)
+        result = values[:len(part)]
+        _interpolate(np, position, flat, size, result)
+        if as_bytes:
+            np.rint(result * 255, out=result)
+            np.clip(result, 0, 255, out=result)
+        out[start:start + chunk] = result
+    return out.reshape(images.shape)
+
+
+def invert_lut(forward, iterations: int = INVERSE_ITERATIONS, step: float = INVERSE_STEP):
+    """Grid ``y`` -> ``x`` with ``forward(x)`` as close to ``y`` as the LUT allows."""
+    np = _require_numpy()
+    target = identity_lut(forward.shape[0])
+    x = target.copy()
+    for _ in range(iterations):
+        x = np.clip(x + step * (target - apply_lut(x, forward)), 0, 1)
+    return x
+
+
+def build_luts(rows: Sequence[Mapping[str, Any]], size: int = LUT_SIZE) -> Dict[str, Any]:
+    """Forward and inverse LUTs ``[F, 2, size, size, size, 3]`` for the table's rows."""
+    np = _require_numpy()
+    grid = identity_lut(size)
+    ids, luts, errors = [], [], []
+    for row in rows:
+        key = slug(str(row["Filter_Name"]))
+        look = LOOKS.get(key)
+        if look is None:
+            logger.warning("Filter %s has no look; treating it as neutral", row["Filter_Name"])
+            look = Look()
+        forward = filter_colors(grid, look, [float(row[column]) / 100 for column in ZONES], float(row[WARM]) / 100)
+        inverse = invert_lut(forward)
+        roundtrip = apply_lut(apply_lut(grid, forward), inverse)
+        ids.append(key)
+        luts.append(np.stack([forward, inverse]))
+        errors.append(float(np.abs(roundtrip - grid).mean() * 255))
+    return {"ids": ids, "luts": np.stack(luts).astype(np.float16), "roundtrip_error": errors}
+
+
+def write_luts(graph: BuildGraph, out_dir: Path = config.FILTER_DIR) -> Optional[Dict[str, Any]]:
+    """Build every generated filter's LUTs; ``None`` if the table is missing."""
+    np = _require_numpy()
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    source = sources.get(FILTERS)
+    if source is None:
+        logger.warning("Filter LUTs: %s not generated", FILTERS)
+        return None
+    with open(source.path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    try:
+        built = build_luts(rows)
+    except (KeyError, ValueError) as exc:
+        logger.warning("Filter LUTs failed: %s", exc)
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{ARRAY_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, built["luts"])
+    os.replace(tmp, out_dir / ARRAY_NAME)
+    index = {
+        "array": ARRAY_NAME,
+        "dtype": "float16",
+        "size": LUT_SIZE,
+        "directions": ["forward", "inverse"],
+        "filters": [
+            {"id": key, "label": str(row["Filter_Name"]), "roundtrip_error": round(error, 3)}
+            for key, row, error in zip(built["ids"], rows, built["roundtrip_error"])
+        ],
+        "source": config.display_path(source.path),
+        "source_sha256": hash_file(source.path),
+    }
+    tmp = out_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+    os.replace(tmp, out_dir / INDEX_NAME)
+    logger.info("Wrote %d filter LUT pairs (%d^3)", len(rows), LUT_SIZE)
+    return index
+
+
+def load_lut(name: str, inverse: bool = True, directory: Path = config.FILTER_DIR):
+    """One cached LUT by filter id or Filter_Name."""
+    np = _require_numpy()
+    try:
+        with open(directory / INDEX_NAME, encoding="utf-8") as fh:
+            index = json.load(fh)
+    except OSError:
+        raise BuildError("Filter LUTs have not been built; run python -m kct_build first") from None
+    ids = [f["id"] for f in index["filters"]]
+    if slug(name) not in ids:
+        raise BuildError(f"Unknown filter {name!r} (known: {', '.join(ids)})")
+    return np.load(directory / index["array"], mmap_mode="r")[ids.index(slug(name)), int(inverse)]
+
+
+def write_cube(path: Path, lut, title: str = "") -> None:
+    """Write ``lut`` as an Adobe/Resolve ``.cube`` file (red varies fastest)."""
+    np = _require_numpy()
+    lut = np.asarray(lut, dtype=float)
+    rows = lut.transpose(2, 1, 0, 3).reshape(-1, 3)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="ascii") as fh:
+        if title:
+            fh.write(f'TITLE "{title}"\n')
+        fh.write(f"LUT_3D_SIZE {lut.shape[0]}\n")
+        np.savetxt(fh, rows, fmt="%.6f")
+    os.replace(tmp, path)
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="kct_build.luts", description="Undo (or apply) Instagram filters.")
+    parser.add_argument("images", nargs="*", type=Path, help="photos to process")
+    parser.add_argument("--filter", required=True, help="Filter_Name (e.g. Valencia or x_pro_ii)")
+    parser.add_argument("--forward", action="store_true", help="apply the filter instead of undoing it")
+    parser.add_argument("-o", "--output", type=Path, help="directory for the processed photos")
+    parser.add_argument("--cube", type=Path, help="also export the LUT as a .cube file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if args.images and not args.output:
+        parser.error("--output is required with images")
+
+    try:
+        np = _require_numpy()
+        lut = np.asarray(load_lut(args.filter, inverse=not args.forward))
+        if args.cube:
+            write_cube(args.cube, lut, f"{args.filter} {'forward' if args.forward else 'inverse'}")
+        if not args.images:
+            return 0
+        from PIL import Image
+
+        photos = [np.asarray(Image.open(path).convert("RGB")) for path in args.images]
+    except ImportError as exc:
+        logger.error("Photo processing requires Pillow (%s)", exc)
+        return 2
+    except (BuildError, OSError) as exc:
+        logger.error("%s", exc)
+        return 2
+
+    # Same-sized photos go through the LUT as one batch.
+    groups: Dict[Any, List[int]] = {}
+    for i, photo in enumerate(photos):
+        groups.setdefault(photo.shape, []).append(i)
+    args.output.mkdir(parents=True, exist_ok=True)
+    for members in groups.values():
+        batch = apply_lut(np.stack([photos[i] for i in members]), lut)
+        for i, processed in zip(members, batch):
+            Image.fromarray(processed).save(args.output / args.images[i].name)
+    logger.info("Processed %d photos with %s", len(photos), args.filter)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""
+Content-hash build manifest.
+
+For every generator the manifest records the SHA-256 of its source, of the
+files it reads and of the files it wrote on the last successful run. A node
+is stale when any of those hashes changed (or an output went missing), and
+staleness propagates to everything downstream in the graph.
+
+A chart script's declared PNG is only rendered when ``png`` is among the
+chart formats; with ``optional_outputs=(".png",)`` a missing one does not
+make the node stale.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Set
+
+from . import config
+from .discovery import CHART, Generator
+from .graph import BuildGraph
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+_CHUNK = 1 << 16
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """SHA-256 of ``path``, or ``None`` if it does not exist."""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def fingerprint(gen: Generator) -> Dict[str, object]:
+    """Current hashes of a generator's source, inputs and outputs."""
+    return {
+        "source": hash_file(gen.path),
+        "inputs": {name: hash_file(p) for name, p in zip(gen.inputs, gen.input_paths())},
+        "outputs": {name: hash_file(p) for name, p in zip(gen.outputs, gen.output_paths())},
+    }
+
+
+class Manifest:
+    """On-disk record of the last successful build of each node."""
+
+    def __init__(self, path: Path = config.MANIFEST_PATH, optional_outputs: Sequence[str] = ()):
+        self.path = path
+        self.optional_outputs = tuple(optional_outputs)  # chart output suffixes that may be missing
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable manifest %s: %s", self.path, exc)
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info("Manifest version changed; rebuilding everything")
+            return
+        self.entries = data.get("nodes", {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": MANIFEST_VERSION, "nodes": self.entries}, fh, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def record(self, gen: Generator) -> None:
+        self.entries[gen.id] = fingerprint(gen)
+
+    def forget(self, node_id: str) -> None:
+        self.entries.pop(node_id, None)
+
+    def is_fresh(self, gen: Generator) -> bool:
+        entry = self.entries.get(gen.id)
+        if entry is None:
+            return False
+        current = fingerprint(gen)
+        if any(h is None and not self._optional(gen, name) for name, h in current["outputs"].items()):
+            return False
+        return current == entry
+
+    def _optional(self, gen: Generator, name: str) -> bool:
+        return gen.kind == CHART and name.lower().endswith(self.optional_outputs)
+
+    def prune(self, live_ids: Iterable[str]) -> None:
+        """Drop entries for generators that no longer exist."""
+        live = set(live_ids)
+        for node_id in list(self.entries):
+            if node_id not in live:
+                del self.entries[node_id]
+
+
+def stale_nodes(graph: BuildGraph, manifest: Manifest) -> Set[str]:
+    """Nodes whose own fingerprint changed, plus everything downstream."""
+    dirty = [node_id for node_id, gen in graph.nodes.items() if not manifest.is_fresh(gen)]
+    return graph.descendants(dirty)
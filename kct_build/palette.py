@@ -0,0 +1,330 @@
+"""
+Palette colour science.
+
+Every suit, shirt and tie colour in ``src/data/visual/color-hex-mapping.json``
+is converted to CIELAB (sRGB, D65) once, and all pairwise scores the
+colour rules need are precomputed::
+
+    build/knowledge/palette/
+        palette.npy     float16 [measure, colour, colour]
+        index.json      measures, colours (id, layer, hex, Lab), aliases
+
+Measures, in order:
+
+``delta_e``
+    CIEDE2000 colour difference.
+``contrast``
+    WCAG 2 contrast ratio of the two relative luminances (1-21).
+``harmony``
+    0-1. Hue relation in LCh scored against analogous (0-30 degrees),
+    triadic (120) and complementary (180) templates; a near-neutral
+    colour (low chroma) harmonises with anything. Pairs that are close
+    but not equal (ΔE around :data:`NEAR_MISS`) read as a failed match
+    and are marked down.
+
+Colours are indexed across all three layers, so suit x shirt x tie checks
+are array lookups. The conversions here are shared by the lighting,
+colour-vision and photo-correction stages.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import config
+from .errors import BuildError
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+PALETTE_PATH = config.DATA_DIR / "visual" / "color-hex-mapping.json"
+ARRAY_NAME = "palette.npy"
+INDEX_NAME = "index.json"
+LAYERS = ("suits", "shirts", "ties")
+MEASURES = ("delta_e", "contrast", "harmony")
+
+# sRGB (D65) -> CIE XYZ, IEC 61966-2-1.
+SRGB_TO_XYZ = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+D65 = (0.95047, 1.0, 1.08883)
+
+# Harmony templates: (hue difference in degrees, width).
+HUE_TEMPLATES = ((0.0, 30.0), (120.0, 20.0), (180.0, 25.0))
+NEUTRAL_CHROMA = 10.0
+NEUTRAL_HARMONY = 0.9
+NEAR_MISS = 6.0
+NEAR_MISS_WIDTH = 4.0
+NEAR_MISS_PENALTY = 0.5
+
+_HEX = re.compile(r"^#?([0-9a-fA-F]{6})$")
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"Palette colour science requires numpy ({exc})") from exc
+    return np
+
+
+@dataclass(frozen=True)
+class PaletteColor:
+    """One catalogue colour: ``suits/navy/standard``."""
+
+    layer: str
+    family: str
+    variant: str
+    name: str
+    hex: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.layer}/{self.family}/{self.variant}"
+
+
+def load_palette(path: Path = PALETTE_PATH) -> List[PaletteColor]:
+    """Every entry with a ``hex`` under the suit, shirt and tie layers."""
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    colors = []
+    for layer in LAYERS:
+        for family, variants in data.get(layer, {}).items():
+            for variant, entry in variants.items():
+                if not isinstance(entry, dict) or not _HEX.match(str(entry.get("hex", ""))):
+                    continue
+                hex_code = "#" + _HEX.match(entry["hex"]).group(1).upper()
+                colors.append(PaletteColor(layer, family, variant, entry.get("marketing_name", ""), hex_code))
+    if not colors:
+        raise BuildError(f"No palette colours in {path}")
+    return colors
+
+
+# ----------------------------------------------------------------------
+# Conversions (all vectorised over a trailing axis of 3)
+# ----------------------------------------------------------------------
+
+def hex_to_rgb(hexes: Sequence[str]):
+    """``[N, 3]`` sRGB in 0-1."""
+    np = _require_numpy()
+    values = [int(_HEX.match(h).group(1), 16) for h in hexes]
+    return np.array([[(v >> 16) & 255, (v >> 8) & 255, v & 255] for v in values], dtype=float) / 255
+
+
+def rgb_to_hex(rgb) -> List[str]:
+    np = _require_numpy()
+    values = np.clip(np.rint(np.asarray(rgb).reshape(-1, 3) * 255), 0, 255).astype(int)
+    return [f"#{r:02X}{g:02X}{b:02X}" for r, g, b in values]
+
+
+def srgb_to_linear(rgb):
+    np = _require_numpy()
+    rgb = np.asarray(rgb, dtype=float)
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear):
+    np = _require_numpy()
+    linear = np.clip(np.asarray(linear, dtype=float), 0, 1)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def rgb_to_xyz(rgb):
+    np = _require_numpy()
+    return srgb_to_linear(rgb) @ np.array(SRGB_TO_XYZ).T
+
+
+def xyz_to_rgb(xyz):
+    np = _require_numpy()
+    return linear_to_srgb(np.asarray(xyz) @ np.linalg.inv(np.array(SRGB_TO_XYZ)).T)
+
+
+def xyz_to_lab(xyz, white=D65):
+    np = _require_numpy()
+    t = np.asarray(xyz, dtype=float) / np.asarray(white)
+    delta = 6 / 29
+    f = np.where(t > delta**3, np.cbrt(t), t / (3 * delta**2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def lab_to_xyz(lab, white=D65):
+    np = _require_numpy()
+    lab = np.asarray(lab, dtype=float)
+    fy = (lab[..., 0] + 16) / 116
+    f = np.stack([fy + lab[..., 1] / 500, fy, fy - lab[..., 2] / 200], axis=-1)
+    delta = 6 / 29
+    return np.where(f > delta, f**3, 3 * delta**2 * (f - 4 / 29)) * np.asarray(white)
+
+
+def rgb_to_lab(rgb):
+    return xyz_to_lab(rgb_to_xyz(rgb))
+
+
+def lab_to_rgb(lab):
+    return xyz_to_rgb(lab_to_xyz(lab))
+
+
+def delta_e_2000(lab1, lab2):
+    """CIEDE2000 (Sharma et al. 2005) between broadcastable ``[..., 3]`` Lab arrays."""
+    np = _require_numpy()
+    lab1, lab2 = np.asarray(lab1, dtype=float), np.asarray(lab2, dtype=float)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_bar**7 / (c_bar**7 + 25.0**7)))
+    a1p, a2p = (1 + g) * a1, (1 + g) * a2
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dLp = L2 - L1
+    dCp = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0, dh)
+    dHp = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh) / 2)
+
+    L_bar = (L1 + L2) / 2
+    c_bar_p = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    h_bar = np.where(
+        c1p * c2p == 0, h_sum,
+        np.where(np.abs(h1p - h2p) <= 180, h_sum / 2, np.where(h_sum < 360, (h_sum + 360) / 2, (h_sum - 360) / 2)),
+    )
+    t = (1 - 0.17 * np.cos(np.radians(h_bar - 30)) + 0.24 * np.cos(np.radians(2 * h_bar))
+         + 0.32 * np.cos(np.radians(3 * h_bar + 6)) - 0.20 * np.cos(np.radians(4 * h_bar - 63)))
+    d_theta = 30 * np.exp(-(((h_bar - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(c_bar_p**7 / (c_bar_p**7 + 25.0**7))
+    s_l = 1 + 0.015 * (L_bar - 50) ** 2 / np.sqrt(20 + (L_bar - 50) ** 2)
+    s_c = 1 + 0.045 * c_bar_p
+    s_h = 1 + 0.015 * c_bar_p * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+    return np.sqrt(
+        (dLp / s_l) ** 2 + (dCp / s_c) ** 2 + (dHp / s_h) ** 2 + r_t * (dCp / s_c) * (dHp / s_h)
+    )
+
+
+def contrast_ratio(rgb1, rgb2):
+    """WCAG 2 contrast ratio between broadcastable sRGB arrays."""
+    np = _require_numpy()
+    y1 = srgb_to_linear(rgb1) @ np.array(SRGB_TO_XYZ[1])
+    y2 = srgb_to_linear(rgb2) @ np.array(SRGB_TO_XYZ[1])
+    return (np.maximum(y1, y2) + 0.05) / (np.minimum(y1, y2) + 0.05)
+
+
+def harmony(lab1, lab2, delta_e=None):
+    """Harmony score in 0-1 (see the module docstring)."""
+    np = _require_numpy()
+    lab1, lab2 = np.asarray(lab1, dtype=float), np.asarray(lab2, dtype=float)
+    chroma1, chroma2 = np.hypot(lab1[..., 1], lab1[..., 2]), np.hypot(lab2[..., 1], lab2[..., 2])
+    hue1 = np.degrees(np.arctan2(lab1[..., 2], lab1[..., 1]))
+    hue2 = np.degrees(np.arctan2(lab2[..., 2], lab2[..., 1]))
+    dh = np.abs((hue1 - hue2 + 180) % 360 - 180)
+    hue_fit = np.max([np.exp(-(((dh - centre) / width) ** 2)) for centre, width in HUE_TEMPLATES], axis=0)
+    neutral = np.exp(-((np.minimum(chroma1, chroma2) / NEUTRAL_CHROMA) ** 2))
+    score = neutral * NEUTRAL_HARMONY + (1 - neutral) * hue_fit
+    if delta_e is None:
+        delta_e = delta_e_2000(lab1, lab2)
+    near_miss = np.exp(-(((delta_e - NEAR_MISS) / NEAR_MISS_WIDTH) ** 2))
+    return score * (1 - NEAR_MISS_PENALTY * near_miss)
+
+
+# ----------------------------------------------------------------------
+# Build stage
+# ----------------------------------------------------------------------
+
+def pair_matrices(colors: Sequence[PaletteColor]):
+    """``[3, N, N]`` float64 delta_e / contrast / harmony and ``[N, 3]`` Lab."""
+    np = _require_numpy()
+    rgb = hex_to_rgb([c.hex for c in colors])
+    lab = rgb_to_lab(rgb)
+    delta_e = delta_e_2000(lab[:, None], lab[None, :])
+    return np.stack([
+        delta_e,
+        contrast_ratio(rgb[:, None], rgb[None, :]),
+        harmony(lab[:, None], lab[None, :], delta_e),
+    ]), lab
+
+
+def write_palette(source: Path = PALETTE_PATH, out_dir: Path = config.PALETTE_DIR) -> Dict[str, Any]:
+    np = _require_numpy()
+    colors = load_palette(source)
+    matrices, lab = pair_matrices(colors)
+    aliases: Dict[str, Dict[str, int]] = {}
+    for i, color in enumerate(colors):
+        family = aliases.setdefault(color.layer, {})
+        if color.family not in family or color.variant == "standard":
+            family[color.family] = i
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out_dir / f".{ARRAY_NAME}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, matrices.astype(np.float16))
+    os.replace(tmp, out_dir / ARRAY_NAME)
+    index = {
+        "array": ARRAY_NAME,
+        "dtype": "float16",
+        "measures": list(MEASURES),
+        "colors": [
+            {"id": c.id, "layer": c.layer, "family": c.family, "variant": c.variant, "name": c.name,
+             "hex": c.hex, "lab": [round(float(v), 3) for v in lab[i]]}
+            for i, c in enumerate(colors)
+        ],
+        "aliases": aliases,
+        "source": config.display_path(source),
+        "source_sha256": hash_file(source),
+    }
+    tmp = out_dir / f".{INDEX_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=1)
+    os.replace(tmp, out_dir / INDEX_NAME)
+    logger.info("Wrote palette matrices for %d colours", len(colors))
+    return index
+
+
+def palette_stale(source: Path = PALETTE_PATH, out_dir: Path = config.PALETTE_DIR) -> bool:
+    """``True`` when the palette matrices are missing or older than ``source``."""
+    try:
+        with open(out_dir / INDEX_NAME, encoding="utf-8") as fh:
+            return json.load(fh).get("source_sha256") != hash_file(source)
+    except (OSError, ValueError):
+        return True
+
+
+class PaletteScores:
+    """Read side: ``scores("suits/navy/standard", "shirts/white/crisp_white")``."""
+
+    def __init__(self, array, index: Dict[str, Any]):
+        self.array = array
+        self.index = index
+        self._positions = {c["id"]: i for i, c in enumerate(index["colors"])}
+
+    @classmethod
+    def load(cls, directory: Path = config.PALETTE_DIR) -> "PaletteScores":
+        np = _require_numpy()
+        with open(directory / INDEX_NAME, encoding="utf-8") as fh:
+            index = json.load(fh)
+        return cls(np.load(directory / index["array"], mmap_mode="r"), index)
+
+    def position(self, color: str, layer: Optional[str] = None) -> int:
+        """Index of a colour id, or of a family's standard shade within ``layer``."""
+        if color in self._positions:
+            return self._positions[color]
+        try:
+            return self.index["aliases"][layer][color]
+        except KeyError:
+            raise KeyError(f"Unknown palette colour {color!r}") from None
+
+    def scores(self, a: int | str, b: int | str) -> Dict[str, float]:
+        i = a if isinstance(a, int) else self.position(a)
+        j = b if isinstance(b, int) else self.position(b)
+        return {measure: float(self.array[m, i, j]) for m, measure in enumerate(self.index["measures"])}
@@ -0,0 +1,287 @@
+"""
+Atomic publish of generated research data into the API's data directory.
+
+A handful of generator outputs are served straight from the data directory
+(the career / seasonal / fabric CSVs and two intelligence JSON files).
+Copying them in place file by file lets a running API read a half-written
+file or a mix of old and new versions, so publishing goes through a
+versioned store instead::
+
+    dist/data/
+        .published/
+            <version>/research/career/promotion_signals.csv
+            <version>/intelligence/venue_microdata_analysis.json
+            current -> <version>
+        research/career/promotion_signals.csv
+        intelligence/venue_microdata_analysis.json
+        index.json
+
+A new version directory is written and fsynced completely before
+``current`` is flipped with a single ``rename``. Each served path is then
+a regular file swapped in with ``os.replace``, so every open sees a whole
+file. They are copies rather than symlinks into the store because
+``npm run build`` copies ``src/data`` over ``dist/data`` and would write
+through a symlink into the published version. A later publish checks
+the store and the served files against the generated ones and repairs
+whatever such a copy overwrote. ``index.json`` keeps its curated
+``files`` lists and gains the SHA-256 and size of every listed and
+published file plus the published version.
+
+The default target is the deployed copy in ``dist/data``, so a local
+publish never turns tracked files under ``src/data`` into symlinks.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import config
+from .artifacts import collect_artifacts
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+STORE_NAME = ".published"
+CURRENT = "current"
+INDEX_NAME = "index.json"
+KEEP_VERSIONS = 3
+
+# Served location (relative to the data directory) -> generated file names.
+TARGETS: Mapping[str, Tuple[str, ...]] = {
+    "research/career": (
+        "age_career_progression.csv",
+        "career_stage_wardrobe.csv",
+        "promotion_signals.csv",
+        "wardrobe_upgrade_timing.csv",
+    ),
+    "research/seasonal": (
+        "graduation_season_timing.csv",
+        "monthly_seasonal_patterns.csv",
+    ),
+    "research/fabric": (
+        "fabric_performance_real_world.csv",
+        "fabric_photography_performance.csv",
+        "suit_construction_lifespan.csv",
+    ),
+    "intelligence": (
+        "venue_microdata_analysis.json",
+        "cultural_regional_nuances.json",
+    ),
+}
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # not supported on this platform
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _copy_synced(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+        dst.flush()
+        os.fsync(dst.fileno())
+
+
+def _replace_with_copy(target: Path, source: Path) -> None:
+    """Atomically replace ``target`` (a file or an old symlink) with a copy of ``source``."""
+    tmp = target.with_name(f".{target.name}.tmp")
+    _copy_synced(source, tmp)
+    os.replace(tmp, target)
+
+
+def _replace_with_symlink(link: Path, target: str) -> None:
+    """Atomically point ``link`` at ``target`` (relative), replacing a file."""
+    tmp = link.with_name(f".{link.name}.tmp")
+    if tmp.is_symlink() or tmp.exists():
+        tmp.unlink()
+    os.symlink(target, tmp)
+    os.replace(tmp, link)
+
+
+def resolve_sources(graph: BuildGraph, targets: Mapping[str, Sequence[str]] = TARGETS) -> Dict[str, Path]:
+    """Map each served path (``research/career/x.csv``) to its generated file."""
+    by_name = {a.path.name: a.path for a in collect_artifacts(graph)}
+    sources: Dict[str, Path] = {}
+    missing: List[str] = []
+    for folder, names in targets.items():
+        for name in names:
+            if name in by_name:
+                sources[f"{folder}/{name}"] = by_name[name]
+            else:
+                missing.append(name)
+    if missing:
+        raise BuildError(f"Cannot publish, not generated: {', '.join(sorted(missing))}")
+    return sources
+
+
+def content_version(sources: Mapping[str, Path]) -> str:
+    digest = hashlib.sha256()
+    for rel, path in sorted(sources.items()):
+        digest.update(f"{rel}\0{hash_file(path)}\0".encode())
+    return digest.hexdigest()[:16]
+
+
+def current_version(data_dir: Path) -> Optional[str]:
+    link = data_dir / STORE_NAME / CURRENT
+    return os.readlink(link) if link.is_symlink() else None
+
+
+def _matches(folder: Path, sources: Mapping[str, Path]) -> bool:
+    """Whether every published file under ``folder`` still has its source's content."""
+    return all(
+        (folder / rel).is_file() and hash_file(folder / rel) == hash_file(source)
+        for rel, source in sources.items()
+    )
+
+
+def _indexed_version(data_dir: Path) -> Optional[str]:
+    try:
+        with open(data_dir / INDEX_NAME, encoding="utf-8") as fh:
+            return json.load(fh)["published"]["version"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_version(store: Path, version: str, sources: Mapping[str, Path]) -> Path:
+    final = store / version
+    if final.is_dir():
+        if _matches(final, sources):
+            return final  # identical content already published (e.g. a rollback)
+        logger.warning("Published data %s was modified in place; rewriting it", version)
+        shutil.rmtree(final)
+    staging = store / f".{version}.partial"
+    if staging.exists():
+        shutil.rmtree(staging)
+    for rel, source in sorted(sources.items()):
+        _copy_synced(source, staging / rel)
+    for folder in sorted({p.parent for p in staging.rglob("*") if p.is_file()}, reverse=True):
+        _fsync_dir(folder)
+    _fsync_dir(staging)
+    os.replace(staging, final)
+    _fsync_dir(store)
+    return final
+
+
+def _install_served_paths(data_dir: Path, sources: Mapping[str, Path]) -> int:
+    """Copy the current version to the served paths; returns how many were replaced."""
+    current = data_dir / STORE_NAME / CURRENT
+    replaced = 0
+    for rel in sorted(sources):
+        served = data_dir / rel
+        published = current / rel
+        if not served.is_symlink() and served.is_file() and hash_file(served) == hash_file(published):
+            continue
+        served.parent.mkdir(parents=True, exist_ok=True)
+        _replace_with_copy(served, published)
+        _fsync_dir(served.parent)
+        replaced += 1
+    return replaced
+
+
+def _prune(store: Path, keep: int, current: str) -> None:
+    versions = sorted(
+        (p for p in store.iterdir() if p.is_dir() and not p.is_symlink() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in versions[keep:]:
+        if old.name != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def build_index(
+    data_dir: Path,
+    previous: Optional[Dict[str, Any]] = None,
+    version: Optional[str] = None,
+    published: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """``index.json`` contents for ``data_dir``.
+
+    The header and curated ``files`` lists are kept as they are; only
+    ``checksums`` (listed and ``published`` files) and ``published`` are added.
+    """
+    previous = previous or {}
+    files: Dict[str, List[str]] = previous.get("files", {})
+    listed = [f"{category}/{name}" for category, names in files.items() for name in names]
+    checksums: Dict[str, Dict[str, Any]] = {}
+    for rel in sorted(set(listed) | set(published)):
+        path = data_dir / rel
+        if path.is_file():
+            checksums[rel] = {"sha256": hash_file(path), "size": path.stat().st_size}
+    index = dict(previous)
+    index.update({
+        "version": previous.get("version", "1.0.0"),
+        "created": previous.get("created"),
+        "updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "description": previous.get("description", "KCT Menswear Knowledge Bank Data"),
+        "files": files,
+        "checksums": checksums,
+    })
+    if version is not None:
+        index["published"] = {"version": version, "files": sorted(published)}
+    return index
+
+
+def write_index(data_dir: Path, version: Optional[str] = None, published: Sequence[str] = ()) -> Dict[str, Any]:
+    path = data_dir / INDEX_NAME
+    try:
+        with open(path, encoding="utf-8") as fh:
+            previous = json.load(fh)
+    except (OSError, ValueError):
+        previous = None
+    index = build_index(data_dir, previous, version, published)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(index, fh, indent=2)
+        fh.write("\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(data_dir)
+    return index
+
+
+def publish(
+    graph: BuildGraph,
+    data_dir: Path = config.PUBLISH_DIR,
+    targets: Mapping[str, Sequence[str]] = TARGETS,
+    keep: int = KEEP_VERSIONS,
+) -> str:
+    """Publish the generated files into ``data_dir``; returns the version."""
+    sources = resolve_sources(graph, targets)
+    version = content_version(sources)
+    store = data_dir / STORE_NAME
+    store.mkdir(parents=True, exist_ok=True)
+
+    if current_version(data_dir) == version and _matches(store / version, sources):
+        if _install_served_paths(data_dir, sources) or _indexed_version(data_dir) != version:
+            logger.warning("Restored served files and index of data %s", version)
+            write_index(data_dir, version, sorted(sources))
+        logger.info("Published data %s is current", version)
+        return version
+
+    _write_version(store, version, sources)
+    _replace_with_symlink(store / CURRENT, version)
+    _fsync_dir(store)
+    _install_served_paths(data_dir, sources)
+    write_index(data_dir, version, sorted(sources))
+    _prune(store, keep, version)
+    logger.info("Published %d files as data version %s into %s", len(sources), version, data_dir)
+    return version
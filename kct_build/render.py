@@ -0,0 +1,368 @@
+"""
+Chart rendering farm.
+
+Every ``chart_script*.py`` ends in ``fig.write_image(...)``, and each call
+would otherwise boot its own kaleido/Chromium process. Inside build workers
+``write_image`` is replaced by a hook that serialises the figure to Plotly
+JSON and hands it back to the orchestrator, which renders it on a small
+pool of long-lived workers that keep kaleido warm between figures.
+
+Each figure can be written in several :class:`ChartOutputs` formats. The
+PNG goes where the script asked for it; the others go under
+``build/knowledge/charts/<topic-slug>/``::
+
+    <stem>.svg                 vector
+    <stem>-<width>w.webp       responsive rasters (also .avif)
+    <stem>.plotly.json         raw figure spec for client-side rendering
+
+JSON is written straight from the captured spec, so a JSON-only build
+never starts Chromium. ``charts/index.json`` lists every chart's outputs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from . import config
+from .discovery import topic_slug
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RENDERERS = 2
+
+FORMATS = ("png", "svg", "webp", "avif", "json")
+RASTER_VARIANTS = ("webp", "avif")
+DEFAULT_FORMATS = ("png",)
+DEFAULT_WIDTHS = (480, 960, 1440)
+PLOTLY_DEFAULT_WIDTH = 700
+RASTER_QUALITY = 80
+CHART_INDEX = "index.json"
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "json": "application/json",
+}
+
+
+@dataclass
+class FigureJob:
+    """A figure captured from a chart script, waiting to be rasterised."""
+
+    node_id: str
+    path: str
+    spec: str
+    options: Dict[str, Any]
+
+
+@dataclass
+class RenderResult:
+    node_id: str
+    path: str
+    duration: float
+    size: int = 0
+    error: Optional[str] = None
+    outputs: Dict[str, int] = field(default_factory=dict)  # written path -> bytes
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class ChartOutputs:
+    """Which files to write for every captured figure."""
+
+    formats: Tuple[str, ...] = DEFAULT_FORMATS
+    widths: Tuple[int, ...] = DEFAULT_WIDTHS
+    directory: Path = config.CHART_DIR
+
+    def __post_init__(self) -> None:
+        unknown = sorted(set(self.formats) - set(FORMATS))
+        if unknown:
+            raise ValueError(f"Unknown chart format(s): {', '.join(unknown)}")
+
+    @property
+    def needs_kaleido(self) -> bool:
+        return any(fmt != "json" for fmt in self.formats)
+
+    @property
+    def is_default(self) -> bool:
+        return tuple(self.formats) == DEFAULT_FORMATS
+
+    def variant_dir(self, node_id: str) -> Path:
+        return self.directory / topic_slug(node_id.rsplit("/", 1)[0])
+
+
+# ----------------------------------------------------------------------
+# Capture side (runs inside generator workers)
+# ----------------------------------------------------------------------
+
+_captured: List[FigureJob] = []
+_current_node: Optional[str] = None
+
+
+def _capture_write_image(fig, file, *args, **kwargs) -> None:
+    positional = ("format", "scale", "width", "height", "validate")
+    options = dict(zip(positional, args))
+    options.update(kwargs)
+    options.pop("engine", None)
+    _captured.append(FigureJob(
+        node_id=_current_node or "",
+        path=os.path.abspath(os.fspath(file)),
+        spec=fig.to_json(),
+        options=options,
+    ))
+
+
+def install_capture_hook() -> bool:
+    """Route ``BaseFigure.write_image`` into the capture list.
+
+    Returns ``False`` when plotly is not installed, in which case scripts
+    fail on their own import exactly as they would when run by hand.
+    """
+    try:
+        from plotly.basedatatypes import BaseFigure
+    except ImportError:
+        return False
+    BaseFigure.write_image = _capture_write_image
+    return True
+
+
+def begin_capture(node_id: str) -> None:
+    global _current_node
+    _current_node = node_id
+    _captured.clear()
+
+
+def end_capture() -> List[FigureJob]:
+    global _current_node
+    jobs = list(_captured)
+    _captured.clear()
+    _current_node = None
+    return jobs
+
+
+# ----------------------------------------------------------------------
+# Render side (runs inside farm workers)
+# ----------------------------------------------------------------------
+
+def _warm_worker(outputs: Optional[ChartOutputs] = None) -> None:
+    """Boot kaleido once so the first real figure does not pay for it."""
+    if outputs is not None and not outputs.needs_kaleido:
+        return
+    try:
+        import plotly.graph_objects as go
+        import plotly.io as pio
+    except ImportError:
+        return
+    try:
+        import kaleido
+        start = getattr(kaleido, "start_sync_server", None)
+        if start is not None:  # kaleido >= 1 keeps a persistent browser this way
+            start(silence_warnings=True)
+    except Exception:
+        pass
+    try:
+        pio.to_image(go.Figure(), format="png", width=10, height=10)
+    except Exception as exc:  # surfaced per figure instead
+        logger.debug("kaleido warm-up failed: %s", exc)
+
+
+def _write_bytes(path: Path, data: bytes) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+_SVG_UID = re.compile(rb'id="clip([0-9a-f]{6})')
+_SVG_NAMESPACES = {"": "http://www.w3.org/2000/svg", "xlink": "http://www.w3.org/1999/xlink"}
+
+
+def _canonical_svg(svg: bytes, key: str) -> bytes:
+    """Make kaleido's SVG reproducible.
+
+    plotly.js ids every render with a random uid (``clip<uid>xy``,
+    ``defs-<uid>``), replaced here by one derived from ``key`` so charts
+    inlined on one page keep distinct ids; attribute order, which varies
+    between a figure's first and later renders, is sorted.
+    """
+    match = _SVG_UID.search(svg)
+    if match is not None:
+        uid = hashlib.sha256(key.encode()).hexdigest()[:6].encode()
+        svg = re.sub(rb"(clip|legend|defs-)" + match.group(1), rb"\g<1>" + uid, svg)
+    for prefix, uri in _SVG_NAMESPACES.items():
+        ElementTree.register_namespace(prefix, uri)
+    root = ElementTree.fromstring(svg)
+    for element in root.iter():
+        attributes = sorted(element.attrib.items())
+        element.attrib.clear()
+        element.attrib.update(attributes)
+    return ElementTree.tostring(root)
+
+
+def _raster_variants(fig, job: FigureJob, outputs: ChartOutputs, target: Path) -> Dict[str, int]:
+    """One kaleido raster, downscaled by Pillow to every responsive width."""
+    import plotly.io as pio
+    from PIL import Image
+
+    base_width = job.options.get("width") or fig.layout.width or PLOTLY_DEFAULT_WIDTH
+    scale = max(1.0, max(outputs.widths) / base_width)
+    png = pio.to_image(fig, format="png", width=job.options.get("width"),
+                       height=job.options.get("height"), scale=scale)
+    written: Dict[str, int] = {}
+    with Image.open(io.BytesIO(png)) as source:
+        source = source.convert("RGBA")
+        for width in sorted(outputs.widths):
+            height = max(1, round(source.height * width / source.width))
+            image = source.resize((width, height), Image.LANCZOS)
+            for fmt in RASTER_VARIANTS:
+                if fmt not in outputs.formats:
+                    continue
+                buffer = io.BytesIO()
+                options = {"method": 6} if fmt == "webp" else {}
+                image.save(buffer, format=fmt.upper(), quality=RASTER_QUALITY, **options)
+                path = target.with_name(f"{target.name}-{width}w.{fmt}")
+                written[str(path)] = _write_bytes(path, buffer.getvalue())
+    return written
+
+
+def figure_bytes(
+    spec: str,
+    fmt: str,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    scale: Optional[float] = None,
+    key: str = "",
+) -> bytes:
+    """One figure (Plotly JSON ``spec``) encoded as ``fmt``."""
+    if fmt == "json":
+        return spec.encode("utf-8")
+    import plotly.io as pio
+
+    fig = pio.from_json(spec, skip_invalid=True)
+    if fmt in ("png", "svg"):
+        data = pio.to_image(fig, format=fmt, width=width, height=height, scale=scale)
+        return _canonical_svg(data, key) if fmt == "svg" else data
+    from PIL import Image
+
+    png = pio.to_image(fig, format="png", width=width, height=height, scale=scale)
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(png)) as image:
+        options = {"method": 6} if fmt == "webp" else {}
+        image.save(buffer, format=fmt.upper(), quality=RASTER_QUALITY, **options)
+    return buffer.getvalue()
+
+
+def render_figure(job: FigureJob, outputs: Optional[ChartOutputs] = None) -> RenderResult:
+    outputs = outputs or ChartOutputs()
+    started = time.perf_counter()
+    written: Dict[str, int] = {}
+    try:
+        target = outputs.variant_dir(job.node_id) / Path(job.path).stem
+        if "json" in outputs.formats:
+            path = target.with_name(f"{target.name}.plotly.json")
+            written[str(path)] = _write_bytes(path, job.spec.encode("utf-8"))
+        if outputs.needs_kaleido:
+            import plotly.io as pio
+
+            fig = pio.from_json(job.spec, skip_invalid=True)
+            if "png" in outputs.formats:
+                Path(job.path).parent.mkdir(parents=True, exist_ok=True)
+                pio.write_image(fig, job.path, **job.options)
+                written[job.path] = os.path.getsize(job.path)
+            if "svg" in outputs.formats:
+                options = {k: v for k, v in job.options.items() if k in ("width", "height")}
+                path = target.with_name(f"{target.name}.svg")
+                svg = _canonical_svg(pio.to_image(fig, format="svg", **options), f"{job.node_id}:{target.name}")
+                written[str(path)] = _write_bytes(path, svg)
+            if any(fmt in outputs.formats for fmt in RASTER_VARIANTS):
+                written.update(_raster_variants(fig, job, outputs, target))
+    except Exception as exc:
+        return RenderResult(job.node_id, job.path, time.perf_counter() - started, error=repr(exc))
+    return RenderResult(
+        job.node_id, job.path, time.perf_counter() - started,
+        size=sum(written.values()), outputs=written,
+    )
+
+
+_VARIANT_WIDTH = re.compile(r"-(\d+)w$")
+
+
+def write_chart_index(renders: Iterable[RenderResult], outputs: ChartOutputs) -> Dict[str, Any]:
+    """Update ``charts/index.json``: ``<topic-slug>/<stem>`` -> format -> files.
+
+    Charts not rendered in this build keep their entries as long as the
+    formats and widths are unchanged.
+    """
+    path = outputs.directory / CHART_INDEX
+    try:
+        with open(path, encoding="utf-8") as fh:
+            previous = json.load(fh)
+    except (OSError, ValueError):
+        previous = {}
+    same_layout = previous.get("formats") == list(outputs.formats) and previous.get("widths") == list(outputs.widths)
+    index: Dict[str, Dict[str, Any]] = dict(previous.get("charts", {})) if same_layout else {}
+
+    for rendered in renders:
+        if not rendered.ok:
+            continue
+        entry: Dict[str, Any] = {}
+        for written, size in sorted(rendered.outputs.items()):
+            file = Path(written)
+            ref: Dict[str, Any] = {"path": config.display_path(file), "bytes": size}
+            if file.name.endswith(".plotly.json"):
+                entry["json"] = ref
+            elif file.suffix.lstrip(".") in RASTER_VARIANTS:
+                ref["width"] = int(_VARIANT_WIDTH.search(file.stem).group(1))
+                entry.setdefault(file.suffix.lstrip("."), []).append(ref)
+            else:
+                entry[file.suffix.lstrip(".")] = ref
+        for fmt in RASTER_VARIANTS:
+            entry.get(fmt, []).sort(key=lambda ref: ref["width"])
+        index[f"{topic_slug(rendered.node_id.rsplit('/', 1)[0])}/{Path(rendered.path).stem}"] = entry
+
+    payload = {"formats": list(outputs.formats), "widths": list(outputs.widths), "charts": dict(sorted(index.items()))}
+    _write_bytes(path, json.dumps(payload, indent=2).encode("utf-8"))
+    return payload
+
+
+class RenderFarm:
+    """Pool of warm kaleido workers fed with captured figures."""
+
+    def __init__(self, workers: int = DEFAULT_RENDERERS, outputs: Optional[ChartOutputs] = None):
+        self.workers = max(1, workers)
+        self.outputs = outputs or ChartOutputs()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(self.outputs,),
+        )
+
+    def submit(self, job: FigureJob) -> "Future[RenderResult]":
+        return self._pool.submit(render_figure, job, self.outputs)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "RenderFarm":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,245 @@
+"""
+Graph execution.
+
+Generators run inside a process pool whose workers are reused across
+scripts. pandas / numpy / plotly are preloaded in the orchestrator before
+the pool forks (see :mod:`kct_build.harness`), so no script pays for those
+imports, and each script runs in a sandbox that captures its printed
+report. A node is submitted as soon as all of its dependencies have
+finished; if a node fails, everything that reads its outputs is skipped.
+
+When a :class:`~kct_build.render.RenderFarm` is supplied, chart scripts do
+not rasterise their own figures; a node only completes once the farm has
+written every figure it captured. With a build ``seed`` every script runs
+seeded and its outputs are normalised (see :mod:`kct_build.determinism`).
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from . import determinism, harness, render
+from .graph import BuildGraph
+from .render import FigureJob, RenderFarm, RenderResult
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class NodeResult:
+    node_id: str
+    status: str
+    duration: float = 0.0
+    error: Optional[str] = None
+    output: str = ""
+    peak_rss: int = 0
+    figures: List[FigureJob] = field(default_factory=list)
+    renders: List[RenderResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+
+def execute_script(
+    node_id: str,
+    script: str,
+    output_dir: Optional[str] = None,
+    inputs: Sequence[str] = (),
+    seed: Optional[int] = None,
+) -> NodeResult:
+    """Run one generator as ``__main__`` inside :func:`harness.sandbox`.
+
+    The script runs in its topic folder unless ``output_dir`` is given;
+    with ``seed`` the global RNGs are seeded first.
+    """
+    path = Path(script)
+    started = time.perf_counter()
+    render.begin_capture(node_id)
+    harness.reset_peak_rss()
+    report = None
+    try:
+        with harness.sandbox(path, Path(output_dir) if output_dir else None, inputs) as report:
+            if seed is not None:
+                determinism.seed_generator(seed)
+            harness.run_module(path)
+    except BaseException:  # SystemExit from a script is a failure too
+        render.end_capture()
+        return NodeResult(
+            node_id=node_id,
+            status=FAILED,
+            duration=time.perf_counter() - started,
+            error=traceback.format_exc(),
+            output=report.getvalue() if report is not None else "",
+            peak_rss=harness.peak_rss(),
+        )
+    return NodeResult(
+        node_id=node_id,
+        status=OK,
+        duration=time.perf_counter() - started,
+        output=report.getvalue(),
+        peak_rss=harness.peak_rss(),
+        figures=render.end_capture(),
+    )
+
+
+def _fail_on_render_errors(result: NodeResult) -> None:
+    failures = [r for r in result.renders if not r.ok]
+    if failures:
+        result.status = FAILED
+        result.error = "\n".join(f"render {r.path}: {r.error}" for r in failures)
+
+
+def _worker_init(capture_figures: bool = False) -> None:
+    # Already done before a fork; spawned workers import here, once.
+    harness.preload()
+    if capture_figures:
+        render.install_capture_hook()
+
+
+def run_graph(
+    graph: BuildGraph,
+    jobs: Optional[int] = None,
+    selected: Optional[Iterable[str]] = None,
+    on_result: Optional[Callable[[NodeResult], None]] = None,
+    farm: Optional[RenderFarm] = None,
+    output_root: Optional[Path] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, NodeResult]:
+    """Execute ``selected`` nodes (default: all) respecting dependencies.
+
+    Dependencies outside ``selected`` are treated as already built.
+    ``jobs=1`` runs everything in the current, warm process, which is also
+    handy for debugging a single generator; figures are then rendered
+    in-script unless a ``farm`` is given, which renders them one by one.
+    With ``output_root`` each topic writes into ``output_root/<topic>/``
+    instead of its source folder. With ``seed`` the build is deterministic:
+    each script gets its own derived seed and volatile metadata is stripped
+    from what it wrote.
+    """
+    pending: Set[str] = set(selected) if selected is not None else set(graph.nodes)
+    results: Dict[str, NodeResult] = {}
+
+    def output_dir(node_id: str) -> Path:
+        gen = graph.nodes[node_id]
+        return output_root / gen.topic if output_root is not None else gen.directory
+
+    def record(result: NodeResult) -> None:
+        if seed is not None and result.ok:
+            directory = output_dir(result.node_id)
+            determinism.normalize_outputs(
+                Path(os.path.normpath(directory / name)) for name in graph.nodes[result.node_id].outputs
+            )
+        results[result.node_id] = result
+        if on_result is not None:
+            on_result(result)
+
+    def blocked_by_failure(node_id: str) -> bool:
+        return any(
+            dep in results and not results[dep].ok and graph.is_hard_dependency(node_id, dep)
+            for dep in graph.dependencies[node_id]
+        )
+
+    def is_ready(node_id: str) -> bool:
+        return all(dep not in pending or dep in results for dep in graph.dependencies[node_id])
+
+    order = [node_id for node_id in graph.topological_order() if node_id in pending]
+
+    def task(node_id: str) -> Tuple[str, str, Optional[str], Tuple[str, ...], Optional[int]]:
+        gen = graph.nodes[node_id]
+        workdir = str(output_dir(node_id)) if output_root is not None else None
+        node_seed = determinism.seed_for(node_id, seed) if seed is not None else None
+        return node_id, str(gen.path), workdir, gen.inputs, node_seed
+
+    harness.preload()
+
+    if jobs == 1:
+        _worker_init(farm is not None)
+        for node_id in order:
+            if blocked_by_failure(node_id):
+                record(NodeResult(node_id=node_id, status=SKIPPED, error="upstream failure"))
+                continue
+            result = execute_script(*task(node_id))
+            if result.ok and farm is not None:
+                result.renders = [farm.submit(job).result() for job in result.figures]
+                _fail_on_render_errors(result)
+            record(result)
+        return results
+
+    ctx = multiprocessing.get_context("fork" if os.name == "posix" else "spawn")
+    workers = jobs or os.cpu_count() or 1
+    in_flight: Dict[Future, str] = {}
+    rendering: Dict[Future, str] = {}
+    awaiting_renders: Dict[str, NodeResult] = {}
+
+    def finish_node(result: NodeResult) -> None:
+        if not result.ok or not result.figures or farm is None:
+            record(result)
+            return
+        awaiting_renders[result.node_id] = result
+        for job in result.figures:
+            rendering[farm.submit(job)] = result.node_id
+
+    def finish_render(node_id: str, outcome: RenderResult) -> None:
+        result = awaiting_renders[node_id]
+        result.renders.append(outcome)
+        if len(result.renders) < len(result.figures):
+            return
+        del awaiting_renders[node_id]
+        _fail_on_render_errors(result)
+        record(result)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_worker_init,
+        initargs=(farm is not None,),
+    ) as pool:
+        waiting = list(order)
+        while waiting or in_flight or rendering:
+            still_waiting = []
+            for node_id in waiting:
+                if blocked_by_failure(node_id):
+                    record(NodeResult(node_id=node_id, status=SKIPPED, error="upstream failure"))
+                elif is_ready(node_id):
+                    future = pool.submit(execute_script, *task(node_id))
+                    in_flight[future] = node_id
+                else:
+                    still_waiting.append(node_id)
+            waiting = still_waiting
+
+            if not in_flight and not rendering:
+                # Everything left is waiting on a node that was skipped.
+                for node_id in waiting:
+                    record(NodeResult(node_id=node_id, status=SKIPPED, error="upstream failure"))
+                break
+
+            done, _ = wait(list(in_flight) + list(rendering), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in rendering:
+                    node_id = rendering.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as exc:  # render worker crashed
+                        outcome = RenderResult(node_id, "", 0.0, error=repr(exc))
+                    finish_render(node_id, outcome)
+                    continue
+                node_id = in_flight.pop(future)
+                try:
+                    finish_node(future.result())
+                except Exception as exc:  # worker crashed (e.g. killed by OOM)
+                    record(NodeResult(node_id=node_id, status=FAILED, error=repr(exc)))
+
+    return results
@@ -0,0 +1,495 @@
+"""
+Declarative schemas for every CSV the generators write.
+
+The tables are typed by hand as dict literals inside each ``script.py``; the
+registry below pins down what each output is supposed to look like so a
+typo (a string in a numeric column, a 1–10 score of 85, an unknown
+category) fails the build instead of reaching the API loaders.
+
+Schemas are keyed by output file name, which is unique across the tree.
+``key`` names the column that identifies a row; it must be present and
+unique.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+INT = "int"
+NUMBER = "number"
+TEXT = "text"
+
+
+@dataclass(frozen=True)
+class Column:
+    dtype: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+    enum: Optional[FrozenSet[str]] = None
+    nullable: bool = False
+    unique: bool = False
+
+
+@dataclass(frozen=True)
+class TableSchema:
+    key: Optional[str]
+    columns: Dict[str, Column] = field(default_factory=dict)
+    min_rows: int = 1
+
+
+def table(key: Optional[str], columns: Dict[str, Column], min_rows: int = 1) -> TableSchema:
+    return TableSchema(key=key, columns=dict(columns), min_rows=min_rows)
+
+
+def text(nullable: bool = False, unique: bool = False) -> Column:
+    return Column(TEXT, nullable=nullable, unique=unique)
+
+
+def choice(*values: str) -> Column:
+    return Column(TEXT, enum=frozenset(values))
+
+
+def integer(lo: Optional[float] = None, hi: Optional[float] = None) -> Column:
+    return Column(INT, min=lo, max=hi)
+
+
+def number(lo: Optional[float] = None, hi: Optional[float] = None) -> Column:
+    return Column(NUMBER, min=lo, max=hi)
+
+
+def rating(lo: float = 1, hi: float = 10) -> Column:
+    """A score on the research's 1–10 scale (0–10 where 0 means "none")."""
+    return number(lo, hi)
+
+
+def percent() -> Column:
+    return number(0, 100)
+
+
+def money() -> Column:
+    return number(0)
+
+
+MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+LEVELS = ("Very Low", "Low", "Low-Moderate", "Moderate", "High", "Very High")
+
+
+SCHEMAS: Dict[str, TableSchema] = {
+    # -- AI Training Gaps ----------------------------------------------
+    "conversation_dead_ends.csv": table("Customer_Question", {
+        "Question_Category": choice(
+            "Fit & Sizing", "Style Guidance", "Product Comparison",
+            "Complex Requests", "Returns & Exchanges",
+        ),
+        "Customer_Question": text(),
+        "Why_AI_Fails": text(),
+        "Abandonment_Rate": percent(),
+        "Escalation_Rate": percent(),
+    }),
+    "slang_colloquialisms_gaps.csv": table("Slang_Term", {
+        "Slang_Term": text(),
+        "Meaning": text(),
+        "Context_Usage": text(),
+        "AI_Recognition_Rate": percent(),
+        "Training_Priority": rating(),
+    }),
+    "style_terminology_confusion.csv": table("Customer_Usage", {
+        "Term_Category": choice(
+            "Fit Descriptors", "Construction Terms", "Fabric Descriptions",
+            "Style Classifications", "Occasion Terms",
+        ),
+        "Technical_Term": text(),
+        "Customer_Usage": text(),
+        "AI_Confusion_Level": rating(),
+        "Training_Gap_Severity": rating(),
+    }),
+
+    # -- Advanced Personalization --------------------------------------
+    "hobby_style_influence.csv": table("Hobby_Category", {
+        "Hobby_Category": text(),
+        "Style_Influence_Score": percent(),
+        "Color_Preference_Impact": percent(),
+        "Fabric_Choice_Impact": percent(),
+        "Fit_Preference_Impact": percent(),
+        "Accessory_Integration": percent(),
+        "Brand_Alignment": percent(),
+    }),
+    "lifestyle_menswear_impact.csv": table("Lifestyle_Factor", {
+        "Lifestyle_Factor": text(),
+        "Impact_on_Fabric_Choice": percent(),
+        "Impact_on_Fit_Preference": percent(),
+        "Impact_on_Style_Direction": percent(),
+        "Personalization_Opportunity": percent(),
+    }),
+
+    # -- Career Trajectory ---------------------------------------------
+    "age_career_progression.csv": table("Age_Range", {
+        "Age_Range": text(),
+        "Typical_Role_Level": text(),
+        "Wardrobe_Budget_Percentage": percent(),
+        "Style_Confidence_Score": percent(),
+        "Brand_Loyalty": percent(),
+        "Custom_Tailoring_Usage": percent(),
+    }),
+    "career_stage_wardrobe.csv": table("Career_Stage", {
+        "Career_Stage": choice(
+            "Entry Level (0-2 years)", "Mid-Level (3-7 years)", "Senior Manager (8-15 years)",
+            "Director (10-20 years)", "VP/Executive (15+ years)", "C-Suite (20+ years)",
+        ),
+        "Average_Wardrobe_Investment": money(),
+        "Suit_Quality_Level": integer(1, 7),
+        "Tailoring_Frequency": integer(0, 12),
+        "Brand_Prestige_Focus": percent(),
+        "Style_Formality_Score": percent(),
+        "Accessory_Investment": money(),
+    }),
+    "promotion_signals.csv": table("Signal_Category", {
+        "Signal_Category": text(),
+        "Timing_Before_Promotion_Months": integer(0, 24),
+        "Reliability_Score": percent(),
+        "Investment_Required": money(),
+        "ROI_Multiplier": number(0),
+    }),
+    "wardrobe_upgrade_timing.csv": table("Upgrade_Trigger", {
+        "Upgrade_Trigger": text(),
+        "Urgency_Level": rating(),
+        "Typical_Spend": money(),
+        "Success_Impact": percent(),
+        "Planning_Window_Days": integer(0, 365),
+    }),
+
+    # -- Color Science -------------------------------------------------
+    "colorblind_perception_analysis.csv": table("Colorblind_Type", {
+        "Colorblind_Type": text(),
+        "Population_Percentage": percent(),
+        "Red_Green_Confusion": rating(0),
+        "Blue_Yellow_Confusion": rating(0),
+        "Navy_Black_Confusion": rating(0),
+        "Brown_Green_Confusion": rating(0),
+        "Safe_Color_Combinations": text(),
+        "Formal_Wear_Challenge_Score": rating(0),
+    }),
+    "lighting_color_perception.csv": table("Lighting_Type", {
+        "Lighting_Type": text(),
+        "Color_Temperature_K": integer(1000, 12000),
+        "Red_Accuracy_Score": rating(),
+        "Blue_Accuracy_Score": rating(),
+        "Green_Accuracy_Score": rating(),
+        "Skin_Tone_Flattering": rating(),
+        "Fabric_Color_Shift": number(0, 10),
+        "Overall_Accuracy": rating(),
+    }),
+    "video_call_undertones.csv": table("Undertone_Type", {
+        "Undertone_Type": text(),
+        "Video_Performance_Score": rating(),
+        "LED_Compatibility": rating(),
+        "Webcam_Accuracy": rating(),
+        "Professional_Rating": rating(),
+        "Fabric_Recommendation": text(),
+    }),
+
+    # -- Competitor Blind Spots ----------------------------------------
+    "customer_questions_blind_spots.csv": table("Customer_Question", {
+        "Question_Category": choice(
+            "Fit & Sizing", "Style Combinations", "Body Type Specific",
+            "Occasion Specific", "Quality & Value",
+        ),
+        "Customer_Question": text(),
+        "Competitor_Gap": text(),
+        "Opportunity_Rating": rating(),
+    }),
+    "sizing_chart_failures.csv": table("Size_Chart_Issue", {
+        "Size_Chart_Issue": text(),
+        "Industry_Standard_Problem": text(),
+        "Customer_Frustration_Level": rating(),
+        "Alteration_Cost_Impact": rating(),
+        "Return_Rate_Impact": rating(),
+    }),
+    "style_combinations_blind_spots.csv": table("Style_Combination", {
+        "Style_Combination": text(),
+        "What_Retailers_Miss": text(),
+        "Customer_Demand_Level": rating(),
+        "Competitor_Coverage": rating(),
+        "Market_Opportunity": rating(),
+    }),
+
+    # -- Customer Psychology -------------------------------------------
+    "menswear_decision_fatigue_summary.csv": table("Metric", {
+        "Metric": text(),
+        "Value": text(),
+        "Key Insight": text(),
+    }),
+
+    # -- Emotional Triggers --------------------------------------------
+    "buying_journey_emotions.csv": table("Journey_Stage", {
+        "Journey_Stage": text(),
+        "Primary_Emotions": text(),
+        "Emotional_Intensity_Score": rating(),
+        "Key_Triggers": text(),
+        "Barrier_Intensity": rating(),
+    }),
+    "emotional_triggers_menswear.csv": table("Word/Phrase", {
+        "Word/Phrase": text(),
+        "Emotional_Category": text(),
+        "Purchase_Likelihood_Increase": percent(),
+        "Psychological_Trigger": text(),
+        "Emotional_Intensity": rating(),
+    }),
+    "psychological_barriers_formalwear.csv": table("Barrier_Type", {
+        "Barrier_Type": text(),
+        "Barrier_Strength": rating(),
+        "Frequency_Occurrence": percent(),
+        "Impact_on_Purchase": text(),
+        "Mitigation_Strategy": text(),
+    }),
+
+    # -- Loyalty Triggers ----------------------------------------------
+    "emotional_attachment_triggers.csv": table("Attachment_Trigger", {
+        "Attachment_Trigger": text(),
+        "Emotional_Impact_Score": rating(),
+        "Loyalty_Conversion_Rate": percent(),
+        "Retention_Strength": rating(),
+        "Brand_Advocacy_Score": rating(),
+        "Trigger_Type": choice(
+            "Appreciation", "Emotional", "Exclusivity", "Experiential", "Identity",
+            "Narrative", "Product", "Service", "Social", "Status",
+        ),
+    }),
+    "prom_to_lifetime_conversion.csv": table("Conversion_Factor", {
+        "Conversion_Factor": text(),
+        "Conversion_Probability": percent(),
+        "Time_to_Next_Purchase": integer(0),
+        "Lifetime_Value_Multiplier": number(0),
+        "Advocacy_Likelihood": percent(),
+        "Customer_Segment": text(),
+    }),
+    "referral_recommendation_triggers.csv": table("Referral_Trigger", {
+        "Referral_Trigger": text(),
+        "Referral_Likelihood": percent(),
+        "Referral_Quality_Score": rating(),
+        "Word_of_Mouth_Reach": rating(),
+        "Conversion_Rate_Referred": percent(),
+        "Emotional_Intensity": rating(),
+        "Trigger_Context": text(),
+    }),
+
+    # -- Price Sensitivity ---------------------------------------------
+    "bundle_strategy_effectiveness.csv": table("Bundle_Type", {
+        "Bundle_Type": text(),
+        "Revenue_Impact": choice("High Positive", "Moderate Positive", "Low Positive", "Mixed", "Negative"),
+        "Cannibalization_Risk": choice(*LEVELS),
+        "Best_Price_Range": text(),
+        "Strategy_Notes": text(),
+    }),
+    "menswear_price_sensitivity_analysis.csv": table("Price_Range", {
+        "Price_Range": text(),
+        "Customer_Behavior": text(),
+        "Comparison_Shopping_Intensity": choice("Minimal", *LEVELS),
+        "Bundle_Effectiveness": choice(*LEVELS),
+        "Key_Motivators": text(),
+    }),
+
+    # -- Relationship Status -------------------------------------------
+    "post_engagement_style_changes.csv": table("Specific_Change", {
+        "Style_Change_Category": choice(
+            "Formality Level", "Color Preferences", "Fit Preferences",
+            "Brand Preferences", "Shopping Behavior",
+        ),
+        "Specific_Change": text(),
+        "Percentage_Experiencing": percent(),
+        "Timeline_Post_Engagement": text(),
+        "Permanence_Rating": rating(),
+        "Investment_Level": rating(),
+    }),
+    "proposal_purchase_indicators.csv": table("Purchase_Behavior", {
+        "Purchase_Behavior": text(),
+        "Timeline_Before_Proposal": text(),
+        "Frequency_Increase": number(0),
+        "Reliability_Score": rating(),
+        "Detection_Difficulty": rating(),
+        "Cost_Range": text(),
+    }),
+    "wedding_planning_indicators.csv": table("Planning_Indicator", {
+        "Planning_Indicator": text(),
+        "Timeline_Before_Wedding": text(),
+        "Detection_Reliability": rating(),
+        "Spending_Increase": number(0),
+        "Behavioral_Intensity": rating(),
+        "Partner_Involvement": rating(),
+        "Urgency_Level": rating(),
+    }),
+
+    # -- Return Psychology ---------------------------------------------
+    "customer_fit_language.csv": table("Customer Language Examples", {
+        "Fit Issue Category": text(),
+        "Customer Language Examples": text(),
+        "Frequency (%)": percent(),
+    }),
+
+    # -- Seasonal Micro-Patterns ---------------------------------------
+    "graduation_season_timing.csv": table("Month", {
+        "Month": choice(*MONTHS),
+        "Graduation_Volume_Percentage": percent(),
+        "Peak_Purchase_Window_Days": integer(0, 120),
+        "Average_Spend_Per_Customer": money(),
+        "Inventory_Turnover_Rate": number(0),
+        "Size_Range_Demand": text(),
+        "Color_Preference_Trend": text(),
+    }),
+    "holiday_vs_wedding_trends.csv": table("Trend_Category", {
+        "Trend_Category": text(),
+        "Holiday_Party_Trend": text(),
+        "Wedding_Trend": text(),
+        "Difference_Score": rating(),
+        "Seasonality_Impact": rating(),
+        "Purchase_Urgency": rating(),
+    }),
+    "monthly_seasonal_patterns.csv": table("Month", {
+        "Month": choice(*MONTHS),
+        "Primary_Events": text(),
+        "Weather_Sensitivity": rating(),
+        "Inventory_Priority": text(),
+        "Purchase_Urgency_Score": rating(),
+    }),
+    "unseasonable_weather_impact.csv": table("Weather_Pattern", {
+        "Weather_Pattern": text(),
+        "Purchase_Spike_Percentage": number(0),
+        "Affected_Categories": text(),
+        "Lead_Time_Days": integer(0, 90),
+        "Inventory_Impact_Score": rating(),
+        "Regional_Variation": rating(),
+    }),
+
+    # -- Social Proof --------------------------------------------------
+    "social_media_purchase_patterns.csv": table("Behavior_Pattern", {
+        "Behavior_Pattern": text(),
+        "Purchase_Intent_Score": rating(),
+        "Conversion_Rate": percent(),
+        "Time_to_Purchase_Days": number(0),
+        "Influence_Strength": rating(),
+    }),
+    "social_proof_dynamics.csv": table("Social_Proof_Type", {
+        "Social_Proof_Type": text(),
+        "Impact_on_Purchase_Decision": percent(),
+        "Trust_Level_Score": rating(),
+        "Conversion_Influence": percent(),
+        "Gen_Z_Effectiveness": percent(),
+        "Millennial_Effectiveness": percent(),
+    }),
+    "wedding_party_group_dynamics.csv": table("Group_Dynamic", {
+        "Group_Dynamic": text(),
+        "Decision_Weight": rating(),
+        "Group_Purchase_Likelihood": percent(),
+        "Satisfaction_Score": rating(),
+        "Repeat_Behavior_Rate": percent(),
+    }),
+
+    # -- Technical Style / Fabric --------------------------------------
+    "fabric_performance_real_world.csv": table("Fabric_Type", {
+        "Fabric_Type": text(),
+        "Durability_Rating": rating(),
+        "Wrinkle_Resistance": rating(),
+        "Breathability": rating(),
+        "Shape_Retention": rating(),
+        "Moisture_Management": rating(),
+        "Professional_Lifespan_Years": integer(0, 50),
+        "Care_Difficulty": rating(),
+        "Cost_Per_Yard_Range": text(),
+    }),
+    "fabric_photography_performance.csv": table("Fabric_Type", {
+        "Fabric_Type": text(),
+        "Fair_Skin_Rating": rating(),
+        "Medium_Skin_Rating": rating(),
+        "Dark_Skin_Rating": rating(),
+        "Olive_Skin_Rating": rating(),
+        "Camera_Flash_Performance": rating(),
+        "Natural_Light_Performance": rating(),
+        "Studio_Light_Performance": rating(),
+        "Color_Accuracy_Retention": rating(),
+    }),
+    "suit_construction_lifespan.csv": table("Construction_Type", {
+        "Construction_Type": choice(
+            "Full Canvas", "Half Canvas", "Fused (High Quality)", "Fused (Budget)", "Unstructured",
+        ),
+        "Expected_Lifespan_Years": integer(0, 50),
+        "Shape_Retention_Over_Time": rating(),
+        "Breathability_Rating": rating(),
+        "Alteration_Capability": rating(),
+        "Cost_Premium_Factor": number(0),
+        "Dry_Cleaning_Durability": rating(),
+        "Professional_Wear_Suitability": rating(),
+    }),
+
+    # -- Visual Recognition --------------------------------------------
+    "instagram_filter_color_impact.csv": table("Filter_Name", {
+        "Filter_Name": text(),
+        "Color_Accuracy_Impact": percent(),
+        "Navy_Suit_Distortion": percent(),
+        "Gray_Suit_Distortion": percent(),
+        "Brown_Suit_Distortion": percent(),
+        "White_Shirt_Impact": percent(),
+        "Overall_Menswear_Accuracy": percent(),
+    }),
+    "phone_camera_color_distortion.csv": table("Phone_Model", {
+        "Phone_Model": text(),
+        "Navy_Color_Accuracy": percent(),
+        "Gray_Color_Accuracy": percent(),
+        "Brown_Color_Accuracy": percent(),
+        "Black_Color_Accuracy": percent(),
+        "White_Balance_Performance": percent(),
+        "Skin_Tone_Accuracy": percent(),
+        "Overall_Suit_Color_Accuracy": percent(),
+        "HDR_Color_Distortion": percent(),
+    }),
+    "visual_quality_cues_recognition.csv": table("Specific_Visual_Cue", {
+        "Visual_Cue_Category": choice(
+            "Construction Details", "Fabric Quality", "Finishing Details",
+            "Fit Indicators", "Hardware Quality",
+        ),
+        "Specific_Visual_Cue": text(),
+        "Customer_Recognition_Rate": percent(),
+        "Quality_Impact_Score": rating(),
+        "Photography_Visibility": percent(),
+        "AI_Recognition_Difficulty": rating(),
+    }),
+
+    # -- Customer Facing Chat ------------------------------------------
+    "formal_menswear_search_themes.csv": table("Question_Theme", {
+        "Question_Theme": text(),
+        "Search_Volume_2023": integer(0),
+        "Search_Volume_2024": integer(0),
+        "Growth_Rate": number(),
+        "Peak_Season": text(),
+        "Customer_Segment": text(),
+    }),
+    "top_specific_questions_2024.csv": table("Specific_Question", {
+        "Specific_Question": text(),
+        "Monthly_Searches_2024": integer(0),
+        "Intent_Type": text(),
+        "Conversion_Potential": rating(),
+        "Content_Gap_Score": rating(),
+    }),
+    "trending_search_patterns.csv": table("Search_Pattern", {
+        "Search_Pattern": text(),
+        "Emergence_Year": integer(2000, 2100),
+        "Growth_Rate_2024": number(),
+        "Search_Volume_2024": integer(0),
+        "Business_Opportunity": rating(),
+    }),
+    "style_personality_framework.csv": table(None, {
+        "Core Philosophy": text(nullable=True),
+        "Style Principles": text(nullable=True),
+        "Dapper Dan Influence": text(nullable=True),
+        "Luxury Accessibility Techniques": text(nullable=True),
+        "Personality Archetypes Integration": text(),
+    }),
+}
+
+
+def schema_for(filename: str) -> Optional[TableSchema]:
+    return SCHEMAS.get(filename)
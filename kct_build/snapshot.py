@@ -0,0 +1,280 @@
+"""
+Single-file knowledge snapshot with an offset index.
+
+Every CSV and JSON file under ``src/data`` and the research topic trees is
+packed into one file so the API can open it once, read the index, and seek
+straight to a record instead of reading and parsing ~60 files::
+
+    b"KCTSNAP\\x01"            8-byte magic
+    <u64 little-endian>        header length
+    <header JSON>              version + per-dataset index
+    <body>                     compact UTF-8 JSON, one document per dataset
+
+Each dataset's body span is a valid JSON document on its own, and records
+inside it are addressable without parsing the rest:
+
+* CSV files become an array of row objects with numbers already typed;
+  rows are indexed by their first column (``"iPhone 15 Pro"``).
+* JSON files keep their structure; object members up to
+  :data:`INDEX_DEPTH` levels deep are indexed by ``/``-joined path
+  (``"detroit_regional_styles/Downtown_Detroit"``).
+
+The header maps ``dataset -> {"span": [offset, length], "records": {key:
+[offset, length]}}`` with offsets relative to the start of the body. The
+snapshot version is a hash of the packed sources, so an unchanged tree is
+not rewritten.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import logging
+import mmap
+import math
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from . import config
+from .discovery import iter_topic_dirs, topic_slug
+from .errors import BuildError
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KCTSNAP\x01"
+FORMAT_VERSION = 1
+INDEX_DEPTH = 2
+_LENGTH = struct.Struct("<Q")
+# Plain decimals only: no "1_000", no leading zeros ("007" is an id), no nan/inf.
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?")
+
+Span = Tuple[int, int]
+
+
+# ----------------------------------------------------------------------
+# Sources
+# ----------------------------------------------------------------------
+
+def iter_sources(
+    data_dir: Path = config.DATA_DIR,
+    roots: Sequence[Path] = config.SOURCE_ROOTS,
+    canonical: Optional[Dict[str, Any]] = None,
+) -> Iterator[Tuple[str, Path]]:
+    """Yield ``(dataset, path)`` for every packable file, in stable order.
+
+    Datasets are named ``data/<subdir>/<stem>`` for the curated knowledge
+    base and ``<topic-slug>/<stem>`` for research topics. With a
+    ``canonical`` manifest (see :mod:`kct_build.canonical`) research files
+    are taken from it, so duplicate copies are packed once.
+    """
+    if data_dir.is_dir():
+        for path in sorted(data_dir.rglob("*")):
+            if path.suffix.lower() in (".json", ".csv") and path.is_file():
+                rel = path.relative_to(data_dir).with_suffix("")
+                yield f"data/{rel.as_posix()}", path
+    if canonical is not None:
+        for key, entry in sorted(canonical["artifacts"].items()):
+            path = config.ROOT / entry["path"]
+            if path.suffix.lower() in (".json", ".csv") and path.is_file():
+                yield key, path
+        return
+    for topic_dir in iter_topic_dirs(roots):
+        slug = topic_slug(topic_dir.name)
+        for path in sorted(topic_dir.iterdir()):
+            if path.suffix.lower() in (".json", ".csv") and path.is_file():
+                yield f"{slug}/{path.stem}", path
+
+
+def _typed(value: str) -> Any:
+    if value == "":
+        return None
+    match = _NUMBER.fullmatch(value)
+    if match is None:
+        return value
+    if match.group(1) is None and match.group(2) is None:
+        return int(value)
+    number = float(value)
+    return number if math.isfinite(number) else value
+
+
+def read_csv_rows(path: Path) -> List[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return [{k: _typed(v) for k, v in row.items()} for row in csv.DictReader(fh)]
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+def _dump(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _emit(value: Any, buf: bytearray, path: Tuple[str, ...], records: Dict[str, Span]) -> None:
+    start = len(buf)
+    if isinstance(value, dict) and len(path) < INDEX_DEPTH:
+        buf += b"{"
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                buf += b","
+            buf += _dump(str(key)) + b":"
+            _emit(item, buf, path + (str(key),), records)
+        buf += b"}"
+    else:
+        buf += _dump(value)
+    if path:
+        records["/".join(path)] = (start, len(buf) - start)
+
+
+def _emit_rows(rows: List[Dict[str, Any]], buf: bytearray, records: Dict[str, Span]) -> None:
+    buf += b"["
+    for i, row in enumerate(rows):
+        if i:
+            buf += b","
+        start = len(buf)
+        buf += _dump(row)
+        first = next(iter(row.values()), None)
+        key = str(first) if first is not None else str(i)
+        if key in records:
+            key = f"{key}#{i}"
+        records[key] = (start, len(buf) - start)
+    buf += b"]"
+
+
+def pack(sources: Iterable[Tuple[str, Path]]) -> Tuple[Dict[str, Any], bytes]:
+    """Encode ``sources`` into ``(header, body)``."""
+    body = bytearray()
+    datasets: Dict[str, Any] = {}
+    digest = hashlib.sha256()
+
+    for name, path in sources:
+        if name in datasets:
+            logger.warning("Duplicate snapshot dataset %s (%s); keeping first", name, path.name)
+            continue
+        sha = hash_file(path)
+        digest.update(f"{name}\0{sha}\0".encode())
+        records: Dict[str, Span] = {}
+        start = len(body)
+        local = bytearray()
+        try:
+            if path.suffix.lower() == ".csv":
+                _emit_rows(read_csv_rows(path), local, records)
+            else:
+                with open(path, encoding="utf-8") as fh:
+                    _emit(json.load(fh), local, (), records)
+        except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+            logger.warning("Skipping %s in snapshot: %s", config.display_path(path), exc)
+            continue
+        body += local
+        datasets[name] = {
+            "source": config.display_path(path),
+            "sha256": sha,
+            "format": path.suffix.lower().lstrip("."),
+            "span": [start, len(local)],
+            "records": {key: [start + off, length] for key, (off, length) in records.items()},
+        }
+
+    header = {
+        "format": FORMAT_VERSION,
+        "version": digest.hexdigest()[:16],
+        "datasets": datasets,
+    }
+    return header, bytes(body)
+
+
+def read_version(path: Path) -> Optional[str]:
+    """Version of an existing snapshot, or ``None`` if absent/unreadable."""
+    try:
+        with open(path, "rb") as fh:
+            return _read_header(fh)[0].get("version")
+    except (OSError, ValueError, BuildError):
+        return None
+
+
+def write_snapshot(
+    out_path: Path = config.SNAPSHOT_PATH,
+    sources: Optional[Iterable[Tuple[str, Path]]] = None,
+) -> Dict[str, Any]:
+    """Pack every source into ``out_path`` unless it is already current."""
+    header, body = pack(iter_sources() if sources is None else sources)
+    if read_version(out_path) == header["version"]:
+        logger.info("Snapshot %s is current", header["version"])
+        return header
+
+    encoded = _dump(header)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(_LENGTH.pack(len(encoded)))
+        fh.write(encoded)
+        fh.write(body)
+    os.replace(tmp, out_path)
+    logger.info(
+        "Packed %d datasets (%d bytes) into snapshot %s",
+        len(header["datasets"]), len(body), header["version"],
+    )
+    return header
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+def _read_header(fh) -> Tuple[Dict[str, Any], int]:
+    prefix = fh.read(len(MAGIC) + _LENGTH.size)
+    if len(prefix) != len(MAGIC) + _LENGTH.size or not prefix.startswith(MAGIC):
+        raise BuildError("Not a KCT knowledge snapshot")
+    (length,) = _LENGTH.unpack(prefix[len(MAGIC):])
+    header = json.loads(fh.read(length))
+    return header, len(prefix) + length
+
+
+class Snapshot:
+    """Memory-mapped reader for a packed snapshot."""
+
+    def __init__(self, path: Path = config.SNAPSHOT_PATH):
+        self._fh = open(path, "rb")
+        try:
+            self.header, self._body = _read_header(self._fh)
+        except BaseException:
+            self._fh.close()
+            raise
+        self._map = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def version(self) -> str:
+        return self.header["version"]
+
+    def datasets(self) -> List[str]:
+        return list(self.header["datasets"])
+
+    def keys(self, dataset: str) -> List[str]:
+        return list(self.header["datasets"][dataset]["records"])
+
+    def _slice(self, span: Sequence[int]) -> bytes:
+        offset, length = span
+        return self._map[self._body + offset:self._body + offset + length]
+
+    def raw(self, dataset: str, key: Optional[str] = None) -> bytes:
+        entry = self.header["datasets"][dataset]
+        return self._slice(entry["span"] if key is None else entry["records"][key])
+
+    def get(self, dataset: str, key: Optional[str] = None) -> Any:
+        """Decode one record, or the whole dataset when ``key`` is omitted."""
+        return json.loads(self.raw(dataset, key))
+
+    def close(self) -> None:
+        self._map.close()
+        self._fh.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
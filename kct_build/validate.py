@@ -0,0 +1,142 @@
+"""
+Vectorised validation of generated CSVs against :mod:`kct_build.schemas`.
+
+Each check is a single boolean mask over a column, so validating a table
+costs a handful of pandas operations regardless of its length. Violations
+name the generator that wrote the file so a bad value in a dict literal can
+be traced back to the script that holds it.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from .artifacts import Artifact, collect_artifacts
+from .errors import BuildError
+from .graph import BuildGraph
+from .schemas import INT, NUMBER, SCHEMAS, TableSchema
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ROWS = 5
+
+
+@dataclass
+class Violation:
+    column: Optional[str]
+    message: str
+    rows: List[int] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        where = f"{self.column}: " if self.column else ""
+        rows = ""
+        if self.rows:
+            shown = ", ".join(str(r) for r in self.rows[:MAX_REPORTED_ROWS])
+            more = "…" if len(self.rows) > MAX_REPORTED_ROWS else ""
+            rows = f" (rows {shown}{more})"
+        return f"{where}{self.message}{rows}"
+
+
+def _rows(mask) -> List[int]:
+    return [int(i) for i in mask[mask].index]
+
+
+def validate_frame(df, schema: TableSchema) -> List[Violation]:
+    """Check ``df`` against ``schema`` and return every violation found."""
+    import pandas as pd
+
+    violations: List[Violation] = []
+    missing = [col for col in schema.columns if col not in df.columns]
+    extra = [col for col in df.columns if col not in schema.columns]
+    if missing:
+        violations.append(Violation(None, f"missing columns {missing}"))
+    if extra:
+        violations.append(Violation(None, f"unexpected columns {extra}"))
+    if len(df) < schema.min_rows:
+        violations.append(Violation(None, f"{len(df)} rows, expected at least {schema.min_rows}"))
+
+    for name, column in schema.columns.items():
+        if name not in df.columns:
+            continue
+        series = df[name]
+        null = series.isna()
+        if not column.nullable and null.any():
+            violations.append(Violation(name, f"{int(null.sum())} empty values", _rows(null)))
+
+        if column.dtype in (INT, NUMBER):
+            values = pd.to_numeric(series, errors="coerce")
+            bad = values.isna() & ~null
+            if bad.any():
+                violations.append(Violation(name, f"{int(bad.sum())} non-numeric values", _rows(bad)))
+            if column.dtype == INT:
+                fractional = values.notna() & (values % 1 != 0)
+                if fractional.any():
+                    violations.append(Violation(name, f"{int(fractional.sum())} non-integer values", _rows(fractional)))
+            if column.min is not None:
+                low = values < column.min
+                if low.any():
+                    violations.append(Violation(
+                        name, f"{int(low.sum())} values below {column.min:g} (min {values.min():g})", _rows(low),
+                    ))
+            if column.max is not None:
+                high = values > column.max
+                if high.any():
+                    violations.append(Violation(
+                        name, f"{int(high.sum())} values above {column.max:g} (max {values.max():g})", _rows(high),
+                    ))
+
+        if column.enum is not None:
+            unknown = ~series.isin(column.enum) & ~null
+            if unknown.any():
+                values = sorted(set(series[unknown].astype(str)))
+                violations.append(Violation(name, f"unknown values {values}", _rows(unknown)))
+
+        if column.unique or name == schema.key:
+            dup = series.duplicated(keep=False) & ~null
+            if dup.any():
+                violations.append(Violation(name, f"{int(dup.sum())} duplicated key values", _rows(dup)))
+
+    if schema.key is not None and schema.key not in schema.columns:
+        violations.append(Violation(schema.key, "key column is not declared in the schema"))
+    return violations
+
+
+def validate_artifact(artifact: Artifact, schemas=SCHEMAS) -> Optional[List[Violation]]:
+    """Validate one CSV; ``None`` when no schema is registered for it."""
+    try:
+        import pandas as pd
+    except ImportError as exc:
+        raise BuildError(f"Schema validation requires pandas ({exc})") from exc
+
+    schema = schemas.get(artifact.path.name)
+    if schema is None:
+        return None
+    try:
+        df = pd.read_csv(artifact.path)
+    except Exception as exc:
+        return [Violation(None, f"unreadable: {exc}")]
+    return validate_frame(df, schema)
+
+
+def validate_artifacts(graph: BuildGraph, artifacts: Optional[Sequence[Artifact]] = None) -> bool:
+    """Validate every generated CSV. Returns ``False`` if any table fails."""
+    if artifacts is None:
+        artifacts = collect_artifacts(graph, suffixes=[".csv"])
+    failed = checked = 0
+    for artifact in artifacts:
+        violations = validate_artifact(artifact)
+        if violations is None:
+            logger.warning("No schema registered for %s (written by %s)", artifact.path.name, artifact.producer)
+            continue
+        checked += 1
+        if violations:
+            failed += 1
+            for violation in violations:
+                logger.error("schema  %s -> %s: %s", artifact.producer, artifact.path.name, violation)
+    if failed:
+        logger.error("Schema validation failed for %d of %d tables", failed, checked)
+    else:
+        logger.info("Validated %d tables against their schemas", checked)
+    return not failed
@@ -0,0 +1,206 @@
+"""
+Monte-Carlo weather-shock simulator.
+
+``unseasonable_weather_impact.csv`` gives one point estimate per weather
+pattern (Purchase_Spike_Percentage, Lead_Time_Days). Planners need the
+spread, so this stage draws ``scenarios`` shocks per climate zone (the
+regions of :mod:`kct_build.demand`) in one vectorised pass and reduces
+them to quantile tables::
+
+    build/knowledge/simulations/weather_shocks.json
+
+Each scenario is one shock:
+
+* the pattern is drawn with probability proportional to the region's
+  exposure to its climate axis,
+* the spike is lognormal around Purchase_Spike_Percentage scaled by the
+  regional weight of :func:`kct_build.demand.build_tensor`, with a spread
+  that grows with Regional_Variation (mean-preserving),
+* the lead time is gamma-distributed with mean Lead_Time_Days,
+* the stock-out share of the spike is Inventory_Impact_Score / 10,
+  tightened when the shock lands inside :data:`URGENT_LEAD_DAYS`.
+
+For every region, category and lead-time bucket the table holds the
+probability that a shock hits the category and the quantiles of its
+spike and stock-out (percent of normal demand) given that it does.
+Draws come from ``numpy.random.SeedSequence(seed)`` spawned per region,
+so the serial and the process-pool (``workers > 1``) runs are identical.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import config
+from .artifacts import collect_artifacts
+from .demand import AXES, REGIONS, URGENT_LEAD_DAYS, WEATHER, pattern_axis, slug
+from .errors import BuildError
+from .graph import BuildGraph
+from .manifest import hash_file
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_NAME = "weather_shocks.json"
+DEFAULT_SCENARIOS = 1_000_000
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+# Upper bounds (days, inclusive) of the lead-time buckets; the last is open.
+LEAD_BUCKETS = (2, 5, 9)
+# Lognormal sigma of the spike at Regional_Variation 10.
+SPIKE_DISPERSION = 0.6
+# Gamma shape of the lead time (higher is tighter around Lead_Time_Days).
+LEAD_SHAPE = 4.0
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise BuildError(f"The weather simulator requires numpy ({exc})") from exc
+    return np
+
+
+def bucket_labels(bounds: Sequence[int] = LEAD_BUCKETS) -> List[str]:
+    labels, low = [], 0
+    for high in bounds:
+        labels.append(f"{low}-{high}d")
+        low = high + 1
+    return [*labels, f"{low}d+"]
+
+
+def _patterns(np, weather: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Per-pattern parameter vectors and the pattern x category hit matrix."""
+    categories: List[str] = []
+    listed = []
+    for row in weather:
+        names = [slug(name) for name in str(row["Affected_Categories"]).split(",") if slug(name)]
+        listed.append(set(names))
+        categories.extend(name for name in names if name not in categories)
+    return {
+        "categories": categories,
+        "affected": np.array([[c in names for c in categories] for names in listed]),           # [P, C]
+        "spike": np.array([float(row["Purchase_Spike_Percentage"]) for row in weather]),
+        "lead": np.array([max(float(row["Lead_Time_Days"]), 1.0) for row in weather]),
+        "impact": np.array([float(row["Inventory_Impact_Score"]) / 10 for row in weather]),
+        "variation": np.array([float(row["Regional_Variation"]) / 10 for row in weather]),
+        "axis": np.array([AXES.index(pattern_axis(str(row["Weather_Pattern"]))) for row in weather]),
+    }
+
+
+def simulate_region(
+    weather: Sequence[Mapping[str, Any]],
+    exposure: Mapping[str, float],
+    scenarios: int,
+    seed: Any,
+) -> Dict[str, Any]:
+    """Draw ``scenarios`` shocks for one region and reduce them to quantile tables."""
+    np = _require_numpy()
+    params = _patterns(np, weather)
+    rng = np.random.default_rng(seed)
+
+    axis_exposure = np.array([exposure[axis] for axis in AXES])[params["axis"]]              # [P]
+    regional = (1 - params["variation"]) + params["variation"] * axis_exposure
+    pattern = rng.choice(len(weather), size=scenarios, p=axis_exposure / axis_exposure.sum())
+    sigma = SPIKE_DISPERSION * params["variation"][pattern]
+    spike = params["spike"][pattern] * regional[pattern] * np.exp(sigma * rng.standard_normal(scenarios) - sigma**2 / 2)
+    lead = np.maximum(1, np.rint(rng.gamma(LEAD_SHAPE, params["lead"][pattern] / LEAD_SHAPE)))
+    rush = np.minimum(1, URGENT_LEAD_DAYS / lead)
+    stockout = spike * params["impact"][pattern] * rush
+    bucket = np.searchsorted(np.array(LEAD_BUCKETS), lead, side="left")
+
+    labels = bucket_labels()
+    quantiles = np.array(QUANTILES)
+    table: Dict[str, Any] = {}
+    for c, category in enumerate(params["categories"]):
+        hit = params["affected"][pattern, c]
+        entry: Dict[str, Any] = {"probability": round(float(hit.mean()), 6), "lead_times": {}}
+        for b, label in enumerate(["all", *labels]):
+            mask = hit if label == "all" else hit & (bucket == b - 1)
+            count = int(mask.sum())
+            if not count:
+                continue
+            entry["lead_times"][label] = {
+                "share": round(count / max(int(hit.sum()), 1), 6),
+                "spike_pct": _quantile_row(np, spike[mask], quantiles),
+                "stockout_pct": _quantile_row(np, stockout[mask], quantiles),
+            }
+        table[category] = entry
+    return table
+
+
+def _quantile_row(np, values, quantiles) -> Dict[str, float]:
+    row = {f"p{round(q * 100)}": round(float(v), 2) for q, v in zip(quantiles, np.quantile(values, quantiles))}
+    row["mean"] = round(float(values.mean()), 2)
+    return row
+
+
+def _simulate(task: Tuple[Sequence[Mapping[str, Any]], Mapping[str, float], int, Any]) -> Dict[str, Any]:
+    return simulate_region(*task)
+
+
+def simulate(
+    weather: Sequence[Mapping[str, Any]],
+    scenarios: int = DEFAULT_SCENARIOS,
+    seed: int = 0,
+    workers: int = 1,
+    regions: Mapping[str, Tuple[float, Mapping[str, float]]] = REGIONS,
+) -> Dict[str, Dict[str, Any]]:
+    """Quantile tables per region; ``workers > 1`` runs regions in a process pool."""
+    np = _require_numpy()
+    names = list(regions)
+    seeds = np.random.SeedSequence(seed).spawn(len(names))
+    tasks = [(list(weather), dict(regions[name][1]), scenarios, s) for name, s in zip(names, seeds)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            tables = list(pool.map(_simulate, tasks))
+    else:
+        tables = [_simulate(task) for task in tasks]
+    return dict(zip(names, tables))
+
+
+def write_simulation(
+    graph: BuildGraph,
+    out_path: Path = config.SIMULATION_DIR / OUTPUT_NAME,
+    scenarios: int = DEFAULT_SCENARIOS,
+    seed: int = 0,
+    workers: int = 1,
+) -> Optional[Dict[str, Any]]:
+    """Simulate from the generated weather table; ``None`` if it is missing."""
+    sources = {a.path.name: a for a in collect_artifacts(graph, suffixes=[".csv"])}
+    source = sources.get(WEATHER)
+    if source is None:
+        logger.warning("Weather simulation: %s not generated", WEATHER)
+        return None
+    with open(source.path, newline="", encoding="utf-8") as fh:
+        weather = list(csv.DictReader(fh))
+    started = time.perf_counter()
+    try:
+        regions = simulate(weather, scenarios, seed, workers)
+    except (KeyError, ValueError) as exc:
+        logger.warning("Weather simulation failed: %s", exc)
+        return None
+    report = {
+        "scenarios_per_region": scenarios,
+        "seed": seed,
+        "quantiles": [f"p{round(q * 100)}" for q in QUANTILES],
+        "lead_buckets": bucket_labels(),
+        "source": config.display_path(source.path),
+        "source_sha256": hash_file(source.path),
+        "regions": regions,
+    }
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f".{out_path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    os.replace(tmp, out_path)
+    logger.info(
+        "Simulated %d weather shocks x %d regions in %.1fs",
+        scenarios, len(regions), time.perf_counter() - started,
+    )
+    return report
@@ -191,10 +191,24 @@ build_application() {
     log "Compiling TypeScript..."
     npm run build
     
+    # Regenerate research knowledge artifacts (opt-in; needs Python + pandas/plotly)
+    if [ "${KNOWLEDGE_REFRESH:-false}" = "true" ]; then
+        log "Refreshing knowledge artifacts (benchmarked)..."
+        python3 -m kct_build --benchmark --deterministic \
+            --regression-threshold "${KNOWLEDGE_REGRESSION_THRESHOLD:-0.25}"
+    fi
+    
     # Copy static assets
     log "Copying static assets..."
     cp -r src/data dist/
     
+    # Swap refreshed research data into the served tree atomically
+    if [ "${KNOWLEDGE_REFRESH:-false}" = "true" ]; then
+        log "Publishing research data into dist/data..."
+        python3 -m kct_build --publish --publish-root dist/data \
+            --no-bundle --no-aggregates --no-snapshot
+    fi
+    
     # Generate version file
     echo "$DEPLOYMENT_ID" > dist/version.txt
     echo "$DEPLOYMENT_ID" > .version
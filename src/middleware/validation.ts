@@ -74,6 +74,7 @@ export const validateCombinationSchema = z.object({
   tie_color: z.string().optional(),
   occasion: z.string().default('business'),
   customer_profile: z.string().optional(),
+  colorblind_type: z.string().optional(),
 });
 
 export const analyzeOutfitSchema = z.object({
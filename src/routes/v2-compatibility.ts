@@ -12,6 +12,7 @@ import { conversionService } from '../services/conversion-service';
 import { smartBundleService } from '../services/smart-bundle-service';
 import { productCatalogService } from '../services/product-catalog-service';
 import { recommendationContextBuilder } from '../services/recommendation-context-builder';
+import { colorRulesEngine } from '../services/color-rules-engine';
 import { logger } from '../utils/logger';
 import {
   validateBody,
@@ -366,7 +367,7 @@ router.post('/combinations/validate', validateBody(validateCombinationSchema), a
   try {
     await ensureServicesInitialized();
     
-    const { suit_color, shirt_color, tie_color, occasion } = req.body;
+    const { suit_color, shirt_color, tie_color, occasion, colorblind_type } = req.body;
     
     const validation = await knowledgeBankService.validateAndOptimizeOutfit({
       suit_color: suit_color || 'navy',
@@ -375,14 +376,36 @@ router.post('/combinations/validate', validateBody(validateCombinationSchema), a
       occasion: occasion || 'business'
     });
 
+    // Color vision check for customers who give their colorblind type
+    const accessibility = colorblind_type
+      ? await colorRulesEngine.validateColorVisionAccessibility(
+          {
+            suit_color: suit_color || 'navy',
+            shirt_color: shirt_color || 'white',
+            tie_color: tie_color || 'burgundy'
+          },
+          { colorblind_type }
+        )
+      : null;
+
+    const conflicts = (validation as any).conflicts || validation.validation?.issues || [];
+
     res.json({
       success: true,
       data: {
-        valid: (validation as any).is_valid || validation.validation?.valid || true,
+        valid: ((validation as any).is_valid || validation.validation?.valid || true) && accessibility?.passed !== false,
         score: (validation as any).overall_score || 0.85,
         recommendations: (validation as any).recommendations || validation.optimization?.optimization_suggestions || [],
-        conflicts: (validation as any).conflicts || validation.validation?.issues || [],
-        improvements: (validation as any).improvements || validation.validation?.improvements || []
+        conflicts: accessibility && !accessibility.passed ? [...conflicts, accessibility.message] : conflicts,
+        improvements: (validation as any).improvements || validation.validation?.improvements || [],
+        ...(accessibility && {
+          accessibility: {
+            colorblind_type,
+            distinguishable: accessibility.passed,
+            message: accessibility.message,
+            alternative_ties: accessibility.alternatives
+          }
+        })
       }
     });
   } catch (error) {
@@ -670,6 +670,43 @@ app.post("/api/v1/conversion/predict",
     }
   });
 
+// Research charts, rendered on demand at the client's size (python -m kct_build.chart_service).
+// Nothing deploys the service with the API, so the route exists only when CHART_RENDER_URL points at one.
+const chartRenderUrl = process.env.CHART_RENDER_URL;
+
+if (chartRenderUrl) {
+  app.get("/api/v1/charts/:topic/:chart", async (req, res) => {
+    const { topic, chart } = req.params;
+    const query = new URLSearchParams();
+    for (const name of ['width', 'height', 'scale']) {
+      if (typeof req.query[name] === 'string') query.set(name, req.query[name] as string);
+    }
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 30000);
+    try {
+      const headers: Record<string, string> = {};
+      if (typeof req.headers['if-none-match'] === 'string') headers['If-None-Match'] = req.headers['if-none-match'];
+      const response = await fetch(
+        `${chartRenderUrl}/charts/${encodeURIComponent(topic)}/${encodeURIComponent(chart)}?${query}`,
+        { headers, signal: controller.signal }
+      );
+      for (const name of ['content-type', 'etag', 'cache-control', 'x-cache']) {
+        const value = response.headers.get(name);
+        if (value) res.setHeader(name, value);
+      }
+      res.status(response.status).send(Buffer.from(await response.arrayBuffer()));
+    } catch (error) {
+      res.status(502).json(createApiResponse(
+        false,
+        undefined,
+        error instanceof Error ? error.message : 'Chart service unavailable'
+      ));
+    } finally {
+      clearTimeout(timeoutId);
+    }
+  });
+}
+
 // Fashion Intelligence Endpoints
 app.get("/api/v1/intelligence", async (_req, res) => {
   try {
@@ -4,8 +4,12 @@
  * Handles versioning, cache warming, and strategic invalidation patterns
  */
 
+import * as fs from 'fs';
+import * as path from 'path';
 import { cacheService } from './cache-service';
 import { dataLoader } from '../utils/data-loader';
+import { enhancedDataLoader } from '../utils/enhanced-data-loader';
+import { knowledgePath } from '../utils/knowledge-artifacts';
 
 export interface InvalidationRule {
   trigger: string; // What triggers the invalidation
@@ -21,6 +25,29 @@ export interface CacheVersion {
   description: string;
 }
 
+/**
+ * Entry of the research build's record-level change feed
+ * (`build/knowledge/changes.json`, written by `python -m kct_build`)
+ */
+export interface DatasetChange {
+  path: string; // Repo-relative generated file
+  status: 'added' | 'removed' | 'changed';
+  key?: string; // Primary key column when rows were diffed
+  added?: string[];
+  removed?: string[];
+  changed?: Record<string, string[]>; // Row key -> changed columns
+  rows?: false; // Compared as a whole file
+  served: string[]; // Published copies, relative to the data directory
+  derived: string[]; // Precomputed rankings/aggregates built from it
+}
+
+export interface ChangeFeed {
+  sequence: number;
+  previous: number;
+  generated: string;
+  datasets: Record<string, DatasetChange>;
+}
+
 export class CacheInvalidationService {
   private readonly invalidationRules: InvalidationRule[] = [
     // Color data changes
@@ -74,9 +101,22 @@ export class CacheInvalidationService {
     },
   ];
 
+  // Dataset keys / served paths from the change feed -> cache tags built from them
+  private readonly changeFeedTags: Array<[string, string[]]> = [
+    ['career-trajectory-patterns', ['career']],
+    ['research/career/', ['career']],
+    ['customer-psychology-behavior', ['psychology']],
+    ['seasonal-micro-patterns', ['seasonal']],
+    ['research/seasonal/', ['seasonal']],
+    ['intelligence/venue_', ['venue']],
+    ['intelligence/cultural_', ['cultural']],
+  ];
+
   private currentVersion: string = '1.0.0';
   private versionHistory: CacheVersion[] = [];
   private readonly MAX_VERSION_HISTORY = 50;
+  private readonly changeFeedPath = knowledgePath('changes.json');
+  private lastChangeSequence = 0;
 
   /**
    * Invalidate cache based on trigger event
@@ -155,6 +195,68 @@ export class CacheInvalidationService {
     }, { ttl: 24 * 60 * 60 }); // 24 hours
   }
 
+  /**
+   * Targeted invalidation from the research build's change feed: evicts only
+   * the files, rankings and tagged entries built from changed datasets.
+   * Feeds already applied (by sequence) are ignored.
+   */
+  async applyChangeFeed(feedPath: string = this.changeFeedPath): Promise<{
+    sequence: number;
+    datasets: string[];
+    loaderEntriesEvicted: number;
+    totalKeysDeleted: number;
+  } | null> {
+    const feed = this.readChangeFeed(feedPath);
+    if (!feed || !feed.datasets || feed.sequence <= this.lastChangeSequence) {
+      return null;
+    }
+
+    const datasets = Object.keys(feed.datasets);
+    const changes = Object.values(feed.datasets);
+    console.log(`📰 Applying research change feed #${feed.sequence}: ${datasets.length} datasets changed`);
+
+    const loaderEntriesEvicted = enhancedDataLoader.evictChangedFiles(
+      changes.map(change => change.path),
+      changes.flatMap(change => change.derived || [])
+    );
+
+    const tags = new Set<string>();
+    for (const name of [...datasets, ...changes.flatMap(change => change.served || [])]) {
+      for (const [prefix, prefixTags] of this.changeFeedTags) {
+        if (name.startsWith(prefix)) prefixTags.forEach(tag => tags.add(tag));
+      }
+    }
+    const result = await this.performInvalidation([], Array.from(tags), `change_feed_${feed.sequence}`);
+
+    this.lastChangeSequence = feed.sequence;
+    return {
+      sequence: feed.sequence,
+      datasets,
+      loaderEntriesEvicted,
+      totalKeysDeleted: result.totalKeysDeleted,
+    };
+  }
+
+  /**
+   * Mark the feed already on disk as applied: caches built since startup
+   * already reflect it, so only later builds should invalidate.
+   */
+  primeChangeFeed(feedPath: string = this.changeFeedPath): number {
+    const feed = this.readChangeFeed(feedPath);
+    if (feed && feed.sequence > this.lastChangeSequence) {
+      this.lastChangeSequence = feed.sequence;
+    }
+    return this.lastChangeSequence;
+  }
+
+  private readChangeFeed(feedPath: string): ChangeFeed | null {
+    try {
+      return JSON.parse(fs.readFileSync(feedPath, 'utf-8'));
+    } catch {
+      return null; // No feed yet
+    }
+  }
+
   /**
    * Smart cache warming after invalidation
    */
@@ -226,6 +328,16 @@ export class CacheInvalidationService {
       }
     }, 7 * 24 * 60 * 60 * 1000); // 7 days
 
+    // Pick up research rebuilds every minute
+    this.primeChangeFeed();
+    setInterval(async () => {
+      try {
+        await this.applyChangeFeed();
+      } catch (error) {
+        console.error('Change feed invalidation failed:', error);
+      }
+    }, 60 * 1000); // 1 minute
+
     console.log('📅 Periodic cache refresh scheduled');
   }
 
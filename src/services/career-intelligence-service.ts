@@ -23,6 +23,7 @@ import {
 import * as fs from 'fs';
 import * as path from 'path';
 import csv from 'csv-parser';
+import { loadKnowledgeJson } from '../utils/knowledge-artifacts';
 import { logger } from '../utils/logger';
 
 export class CareerIntelligenceService {
@@ -35,6 +36,8 @@ export class CareerIntelligenceService {
   private ageCareerProgression: any[] = [];
   private promotionSignals: any[] = [];
   private wardrobeUpgradeTiming: any[] = [];
+  // Career-stage Markov model precomputed by the research build (kct_build/career.py)
+  private spendProjections: { horizon: number; age_bands: string[]; lookup: Record<string, any[]> } | null = null;
 
   /**
    * Initialize the service with career trajectory data
@@ -434,6 +437,23 @@ export class CareerIntelligenceService {
       };
     }
 
+    // Spend the career-stage model expects over the next few years
+    const age = this.parseAgeRange(request.age_range);
+    const stage = this.inferCareerStage(request);
+    if (age !== null && stage) {
+      const projected = [1, 3, 5]
+        .map(years => ({ years, projection: this.getProjectedSpend(age, stage, years) }))
+        .filter(({ projection }) => projection !== null)
+        .map(({ years, projection }) => ({
+          years,
+          expected_spend: projection!.expected_spend,
+          cumulative_spend: projection!.cumulative_spend
+        }));
+      if (projected.length > 0) {
+        strategy.projected_spend = projected;
+      }
+    }
+
     return strategy;
   }
 
@@ -551,6 +571,39 @@ export class CareerIntelligenceService {
     };
   }
 
+  /**
+   * Projected wardrobe spend `years` ahead (1-10) for a customer's age and
+   * career stage, read from the precomputed Markov model
+   * (`build/knowledge/career/spend.json`). Returns null when the build has
+   * not produced it or the age/stage is not covered.
+   */
+  getProjectedSpend(age: number, careerStage: string, years: number): {
+    expected_spend: number;
+    cumulative_spend: number;
+    stages: Record<string, number>;
+  } | null {
+    if (!this.spendProjections) {
+      this.spendProjections = loadKnowledgeJson('career', 'spend.json');
+      if (!this.spendProjections) return null;
+    }
+    const projections = this.spendProjections!;
+
+    const band = projections.age_bands.find(range => {
+      const [min, max] = range.split('-').map((n: string) => parseInt(n.replace('+', '')));
+      return range.includes('+') ? age >= min : age >= min && age <= max;
+    }) ?? (age < parseInt(projections.age_bands[0]) ? projections.age_bands[0] : undefined);
+    const stage = careerStage.toLowerCase().replace(/\(.*?\)/g, '').replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '');
+    const rows = band ? projections.lookup[`${band}|${stage}`] : undefined;
+    if (!rows) return null;
+
+    const row = rows[Math.min(Math.max(Math.round(years), 1), projections.horizon) - 1];
+    return {
+      expected_spend: row.expected_spend,
+      cumulative_spend: row.cumulative_spend,
+      stages: row.stages
+    };
+  }
+
   /**
    * Get promotion signal reliability data
    */
@@ -851,6 +904,34 @@ export class CareerIntelligenceService {
     return (min + max) / 2;
   }
 
+  private parseAgeRange(range: string): number | null {
+    // Midpoint of an age range like "30-35" or "58+"
+    const matches = range.match(/(\d+)(?:\s*-\s*(\d+))?/);
+    if (!matches) return null;
+
+    const min = parseInt(matches[1]);
+    const max = matches[2] ? parseInt(matches[2]) : min;
+    return Math.round((min + max) / 2);
+  }
+
+  private inferCareerStage(request: CareerTrajectoryRequest): string | null {
+    // Map a role title (or, failing that, experience) onto career_stage_wardrobe.csv's stages
+    const role = request.current_role.toLowerCase();
+    if (/\b(c-suite|chief|ceo|cfo|coo|cto)\b/.test(role)) return 'C-Suite';
+    if (role.includes('vp') || role.includes('vice president') || role.includes('executive')) return 'VP/Executive';
+    if (role.includes('director')) return 'Director';
+    if (role.includes('manager')) return 'Senior Manager';
+    if (role.includes('senior')) return 'Mid-Level';
+    if (role.includes('analyst') || role.includes('associate') || role.includes('junior')) return 'Entry Level';
+
+    const years = request.years_experience;
+    if (years === undefined) return null;
+    if (years < 3) return 'Entry Level';
+    if (years < 8) return 'Mid-Level';
+    if (years < 15) return 'Senior Manager';
+    return 'Director';
+  }
+
   private determineNextMilestone(currentRole: string): string {
     const role = currentRole.toLowerCase();
     if (role.includes('analyst') || role.includes('associate')) return 'Senior role promotion';
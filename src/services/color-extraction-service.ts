@@ -1,4 +1,6 @@
 import { logger } from "../utils/logger";
+import { loadKnowledgeArray } from "../utils/knowledge-artifacts";
+import { NpyArray } from "../utils/npy";
 import { fashionClipService } from "./fashion-clip-service";
 import { colorService } from "./color-service";
 import { cacheService } from "./cache-service";
@@ -36,6 +38,7 @@ export interface ColorExtractionRequest {
   context?: {
     item_type?: 'suit' | 'shirt' | 'tie' | 'shoes' | 'accessory' | 'full_outfit';
     target_occasion?: string;
+    device_model?: string;
     customer_demographics?: {
       age_range?: string;
       style_preference?: string;
@@ -227,6 +230,7 @@ export interface ColorMatchingResult {
 
 class ColorExtractionService {
   private initialized: boolean = false;
+  private cameraCorrections: { array: NpyArray; phones: string[] } | null = null;
 
   constructor() {}
 
@@ -242,6 +246,13 @@ class ColorExtractionService {
       // Initialize Fashion-CLIP service for image analysis
       await fashionClipService.initialize();
       
+      // Per-phone colour-correction matrices fitted by the research build (kct_build/camera.py)
+      const corrections = loadKnowledgeArray<{ array: string; phones: Array<{ id: string }> }>('camera');
+      this.cameraCorrections = corrections && {
+        array: corrections.array,
+        phones: corrections.index.phones.map(phone => phone.id)
+      };
+
       this.initialized = true;
       logger.info('✅ Color Extraction Service initialized successfully');
     } catch (error) {
@@ -258,7 +269,7 @@ class ColorExtractionService {
       await this.initialize();
     }
 
-    const cacheKey = `color-extraction:${this.generateCacheKey(request)}`;
+    const cacheKey = `color-extraction:${this.generateCacheKey(request)}:${request.context?.device_model ?? ''}`;
     
     try {
       // Check cache first
@@ -425,24 +436,27 @@ class ColorExtractionService {
     const processedColors: ColorExtractionResult['extracted_colors'] = [];
 
     for (const color of rawColors) {
-      const rgb = this.hexToRgb(color.hex);
+      const hex = request.context?.device_model
+        ? this.correctForDevice(color.hex, request.context.device_model)
+        : color.hex;
+      const rgb = this.hexToRgb(hex);
       const hsl = this.rgbToHsl(rgb.r, rgb.g, rgb.b);
       
       processedColors.push({
         color: color.color,
-        hex: color.hex,
+        hex,
         rgb,
         hsl,
         percentage: color.percentage || 0,
-        confidence: stableScore(color.hex + '_confidence', 0.7, 1.0), // Would be calculated based on extraction quality
-        color_family: color.color_family || this.determineColorFamily(color.hex),
+        confidence: stableScore(hex + '_confidence', 0.7, 1.0), // Would be calculated based on extraction quality
+        color_family: color.color_family || this.determineColorFamily(hex),
         color_temperature: this.determineColorTemperature(hsl.h),
         brightness_level: this.determineBrightnessLevel(hsl.l) as any,
         saturation_level: this.determineSaturationLevel(hsl.s) as any,
         accessibility: {
-          wcag_aa_compliant: this.checkWCAGCompliance(color.hex),
-          contrast_ratio: this.calculateContrastRatio(color.hex, '#FFFFFF'),
-          readability_score: this.calculateReadabilityScore(color.hex)
+          wcag_aa_compliant: this.checkWCAGCompliance(hex),
+          contrast_ratio: this.calculateContrastRatio(hex, '#FFFFFF'),
+          readability_score: this.calculateReadabilityScore(hex)
         }
       });
     }
@@ -601,6 +615,30 @@ class ColorExtractionService {
     };
   }
 
+  /**
+   * Undo a phone camera's colour distortion on an extracted hex colour with
+   * the 3x3 linear-sRGB matrix fitted for that Phone_Model. Returns the
+   * colour unchanged when the build has no matrix for the device.
+   */
+  correctForDevice(hex: string, deviceModel: string): string {
+    if (!this.cameraCorrections) return hex;
+    const key = deviceModel.toLowerCase().replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '');
+    const phone = this.cameraCorrections.phones.indexOf(key);
+    if (phone < 0) return hex;
+
+    const m = this.cameraCorrections.array.data.subarray(phone * 9, phone * 9 + 9);
+    const { r, g, b } = this.hexToRgb(hex);
+    const linear = [r, g, b].map(v => {
+      const c = v / 255;
+      return c <= 0.04045 ? c / 12.92 : Math.pow((c + 0.055) / 1.055, 2.4);
+    });
+    return '#' + [0, 1, 2].map(row => {
+      const c = Math.min(Math.max(m[row * 3] * linear[0] + m[row * 3 + 1] * linear[1] + m[row * 3 + 2] * linear[2], 0), 1);
+      const v = c <= 0.0031308 ? c * 12.92 : 1.055 * Math.pow(c, 1 / 2.4) - 0.055;
+      return Math.round(v * 255).toString(16).padStart(2, '0').toUpperCase();
+    }).join('');
+  }
+
   // Helper methods (many would be more sophisticated in production)
   private hexToRgb(hex: string): { r: number; g: number; b: number } {
     const result = /^#?([a-f\d]{2})([a-f\d]{2})([a-f\d]{2})$/i.exec(hex);
@@ -14,6 +14,8 @@
 
 import { ColorRelationships } from '../types/knowledge-bank';
 import { loadDataFile } from '../utils/data-loader';
+import { loadKnowledgeArray } from '../utils/knowledge-artifacts';
+import { NpyArray, flatIndex } from '../utils/npy';
 import { OutfitCombination, ValidationContext, ValidationResult } from './validation-engine';
 
 export interface ColorAnalysis {
@@ -48,6 +50,8 @@ class ColorRulesEngine {
   private colorData: ColorRelationships | null = null;
   private neverCombineRules: any = null;
   private colorHexMapping: any = null;
+  private paletteScores: { array: NpyArray; index: any } | null = null;
+  private colorVision: { array: NpyArray; index: any } | null = null;
 
   // Color theory constants
   private readonly WARM_COLORS = [
@@ -92,6 +96,87 @@ class ColorRulesEngine {
       console.error('Failed to initialize color rules engine:', error);
       throw new Error('Color rules engine initialization failed');
     }
+
+    // Pairwise palette scores precomputed by the research build (kct_build/palette.py)
+    this.paletteScores = loadKnowledgeArray('palette');
+
+    // Colour-vision confusable-combination bitsets (kct_build/colorvision.py)
+    this.colorVision = loadKnowledgeArray('colorvision');
+  }
+
+  /**
+   * Packed bitset of the suit x shirt x tie combinations that become
+   * indistinguishable for a colour-vision type (`deuteranomaly`,
+   * `Protanopia (Red-blind)`, ...). Bit `(suit * shirts + shirt) * ties + tie`,
+   * most significant bit first, in the layer order of the build index;
+   * AND its complement with a candidate set to filter recommendations.
+   * Returns null when the build has not produced the bitsets or the type is unknown.
+   */
+  getConfusableMask(colorblindType: string): Uint8Array | null {
+    if (!this.colorVision) return null;
+    const { array, index } = this.colorVision;
+    const key = colorblindType.toLowerCase().split('(')[0].trim().replace(/[^a-z0-9]+/g, '_');
+    const row = index.types.findIndex((type: any) => type.id === key || type.kind === key);
+    if (row < 0) return null;
+    const width = array.shape[1];
+    return (array.data as Uint8Array).subarray(row * width, (row + 1) * width);
+  }
+
+  /**
+   * Whether a suit/shirt/tie combination stays distinguishable for a
+   * colour-vision type. Returns null when the bitsets or a colour are unavailable.
+   */
+  isDistinguishableFor(combination: OutfitCombination, colorblindType: string): boolean | null {
+    const mask = this.getConfusableMask(colorblindType);
+    if (!mask || !combination.suit_color || !combination.shirt_color || !combination.tie_color) return null;
+    const { layers } = this.colorVision!.index;
+    const find = (ids: string[], color: string) => {
+      const family = color.toLowerCase().trim().replace(/[^a-z0-9]+/g, '_');
+      const exact = ids.indexOf(color);
+      return exact >= 0 ? exact : ids.findIndex(id => id.split('/')[1] === family);
+    };
+    const s = find(layers.suits, combination.suit_color);
+    const h = find(layers.shirts, combination.shirt_color);
+    const t = find(layers.ties, combination.tie_color);
+    if (s < 0 || h < 0 || t < 0) return null;
+    const bit = (s * layers.shirts.length + h) * layers.ties.length + t;
+    return (mask[bit >> 3] & (0x80 >> (bit & 7))) === 0;
+  }
+
+  /**
+   * Precomputed CIEDE2000 difference, WCAG contrast ratio and harmony (0-1)
+   * of two palette colours. Colours are palette ids (`suits/navy/standard`)
+   * or family names, resolved within `layer1`/`layer2` when given.
+   * Returns null when the build has not produced the matrices or a colour is unknown.
+   */
+  getPairScores(
+    color1: string,
+    color2: string,
+    layer1?: 'suits' | 'shirts' | 'ties',
+    layer2?: 'suits' | 'shirts' | 'ties'
+  ): { delta_e: number; contrast: number; harmony: number } | null {
+    if (!this.paletteScores) return null;
+    const i = this.palettePosition(color1, layer1);
+    const j = this.palettePosition(color2, layer2);
+    if (i < 0 || j < 0) return null;
+    const { array, index } = this.paletteScores;
+    const scores: any = {};
+    index.measures.forEach((measure: string, m: number) => {
+      scores[measure] = array.data[flatIndex(array.shape, [m, i, j])];
+    });
+    return scores;
+  }
+
+  private palettePosition(color: string, layer?: string): number {
+    const { index } = this.paletteScores!;
+    const byId = index.colors.findIndex((entry: any) => entry.id === color);
+    if (byId >= 0) return byId;
+    const family = color.toLowerCase().trim().replace(/[^a-z0-9]+/g, '_');
+    for (const name of layer ? [layer] : ['suits', 'shirts', 'ties']) {
+      const position = index.aliases[name]?.[family];
+      if (position !== undefined) return position;
+    }
+    return -1;
   }
 
   /**
@@ -203,7 +288,7 @@ class ColorRulesEngine {
 
     // Analyze suit-shirt contrast
     if (combination.suit_color && combination.shirt_color) {
-      const contrast = this.calculateContrast(combination.suit_color, combination.shirt_color);
+      const contrast = this.calculateContrast(combination.suit_color, combination.shirt_color, 'suits', 'shirts');
       contrasts.push({
         combination: `${combination.suit_color} suit with ${combination.shirt_color} shirt`,
         contrast_ratio: contrast.ratio,
@@ -215,7 +300,7 @@ class ColorRulesEngine {
 
     // Analyze shirt-tie contrast
     if (combination.shirt_color && combination.tie_color) {
-      const contrast = this.calculateContrast(combination.shirt_color, combination.tie_color);
+      const contrast = this.calculateContrast(combination.shirt_color, combination.tie_color, 'shirts', 'ties');
       contrasts.push({
         combination: `${combination.shirt_color} shirt with ${combination.tie_color} tie`,
         contrast_ratio: contrast.ratio,
@@ -385,6 +470,44 @@ class ColorRulesEngine {
     };
   }
 
+  /**
+   * Color vision accessibility for the customer's colorblind type
+   * (`context.colorblind_type`), read from the precomputed confusable bitsets
+   */
+  async validateColorVisionAccessibility(combination: OutfitCombination, context: ValidationContext): Promise<ValidationResult> {
+    if (!this.colorData) await this.initialize();
+
+    const colorblindType = context.colorblind_type;
+    const distinguishable = colorblindType ? this.isDistinguishableFor(combination, colorblindType) : null;
+    const checked = distinguishable !== null;
+    const passed = distinguishable !== false;
+
+    return {
+      rule_id: 'CVA001',
+      rule_name: 'Color Vision Accessibility',
+      category: 'color_harmony',
+      passed,
+      confidence: checked ? 0.90 : 0.50,
+      severity: !checked ? 'info' : passed ? 'success' : 'medium',
+      priority: 4,
+      weight: 0.5,
+      message: !checked
+        ? 'Color vision accessibility not checked'
+        : passed
+          ? `Suit, shirt and tie stay distinguishable with ${colorblindType}`
+          : `Some pieces blend together with ${colorblindType}`,
+      reasoning: !colorblindType
+        ? 'No color vision deficiency given'
+        : checked
+          ? `Combination simulated under ${colorblindType} across the product palette`
+          : `No simulation available for ${colorblindType} and these colors`,
+      recommendation: passed ? 'Combination reads clearly for this customer' : 'Swap the tie for one that stays distinct',
+      alternatives: passed ? [] : this.generateDistinguishableTies(combination, colorblindType!),
+      score_impact: passed ? 0 : -8,
+      context_applied: colorblindType ? [colorblindType] : []
+    };
+  }
+
   // Helper methods for color analysis
 
   private extractColors(combination: OutfitCombination): string[] {
@@ -519,6 +642,14 @@ class ColorRulesEngine {
     return false; // Placeholder
   }
 
+  private generateDistinguishableTies(combination: OutfitCombination, colorblindType: string): string[] {
+    const ties: string[] = this.colorVision?.index.layers.ties ?? [];
+    const families = ties
+      .filter(tie => this.isDistinguishableFor({ ...combination, tie_color: tie }, colorblindType))
+      .map(tie => tie.split('/')[1]);
+    return [...new Set(families)].slice(0, 3);
+  }
+
   private generateNeverCombineRecommendation(combination: OutfitCombination, rule: any): string {
     return `Avoid ${rule.combination.suit || 'this suit'} with ${rule.combination.shirt || 'this shirt'}. ${rule.reason}`;
   }
@@ -531,8 +662,26 @@ class ColorRulesEngine {
     return `For ${rule.event || 'this occasion'}, consider alternative colors. ${rule.reason}`;
   }
 
-  private calculateContrast(color1: string, color2: string): any {
-    // Implementation would calculate actual contrast ratios using hex values
+  private calculateContrast(
+    color1: string,
+    color2: string,
+    layer1?: 'suits' | 'shirts' | 'ties',
+    layer2?: 'suits' | 'shirts' | 'ties'
+  ): any {
+    const scores = this.getPairScores(color1, color2, layer1, layer2);
+    if (scores) {
+      const ratio = Math.round(scores.contrast * 100) / 100;
+      const accessibility = ratio >= 7 ? 'AAA' : ratio >= 4.5 ? 'AA' : ratio >= 3 ? 'A' : 'Failed';
+      const impact = scores.delta_e < 10 ? 'subtle' : scores.delta_e < 25 ? 'moderate' : scores.delta_e < 45 ? 'strong' : 'dramatic';
+      return {
+        ratio,
+        accessibility,
+        impact,
+        recommendation: accessibility === 'Failed'
+          ? `Low contrast (${ratio}:1); add a lighter or darker layer to separate ${color1} and ${color2}`
+          : `${ratio}:1 contrast with ${impact} colour difference (ΔE ${scores.delta_e.toFixed(1)})`
+      };
+    }
     return {
       ratio: 4.5,
       accessibility: 'AA' as const,
@@ -22,6 +22,17 @@ export class CustomerPsychologyService {
   private psychologyData: any[] | null = null;
   private bodyLanguageData: any | null = null;
 
+  // Emotional_Category values of emotional_triggers_menswear.csv behind each trigger type
+  private readonly TRIGGER_CATEGORIES: Record<EmotionalTrigger['trigger_type'], string[]> = {
+    confidence: ['Self-Assurance', 'Personal Power', 'Dominance'],
+    status: ['Prestige', 'Exclusivity', 'Intelligence/Culture'],
+    comfort: ['Comfort'],
+    tradition: ['Heritage', 'Tradition'],
+    innovation: ['Uniqueness', 'Innovation'],
+    value: ['Value', 'Quality'],
+    quality: ['Quality', 'Exclusivity']
+  };
+
   /**
    * Initialize the service with psychology data
    */
@@ -292,7 +303,7 @@ export class CustomerPsychologyService {
   private async getEmotionalTriggers(customerId: string): Promise<EmotionalTrigger[]> {
     // For demonstration, return common triggers based on psychology data
     // In production, this would be personalized based on customer behavior
-    return [
+    const triggers: EmotionalTrigger[] = [
       {
         trigger_type: 'confidence',
         intensity: 8,
@@ -306,6 +317,23 @@ export class CustomerPsychologyService {
         messaging_approach: 'Highlight craftsmanship, materials, and long-term value'
       }
     ];
+
+    // Words ranked by purchase-likelihood lift at build time (already in rank order)
+    const ranking = enhancedDataLoader.loadPrecomputedRanking('emotional_triggers_top10');
+    if (ranking) {
+      triggers.forEach(trigger => {
+        const categories = this.TRIGGER_CATEGORIES[trigger.trigger_type];
+        const words = ranking.rows
+          .filter(row => categories.includes(row.Emotional_Category))
+          .slice(0, 3)
+          .map(row => row['Word/Phrase']);
+        if (words.length > 0) {
+          trigger.power_words = words;
+        }
+      });
+    }
+
+    return triggers;
   }
 
   /**
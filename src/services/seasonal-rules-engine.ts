@@ -13,6 +13,8 @@
 
 import { FormalityIndex } from '../types/knowledge-bank';
 import { loadDataFile } from '../utils/data-loader';
+import { loadKnowledgeArray } from '../utils/knowledge-artifacts';
+import { NpyArray, flatIndex } from '../utils/npy';
 import { OutfitCombination, ValidationContext, ValidationResult } from './validation-engine';
 import * as fs from 'fs';
 import * as path from 'path';
@@ -77,6 +79,7 @@ class SeasonalRulesEngine {
   private monthlyPatterns: any[] = [];
   private eventCalendar: any = null; // Section 2.4: KCT event calendar
   private monthlyCalendar: any = null; // Section 3.3: KCT monthly intelligence calendar
+  private demandCalendar: { array: NpyArray; axes: Record<string, string[]> } | null = null;
 
   // Comprehensive seasonal fabric guidelines
   private readonly SEASONAL_FABRICS = {
@@ -221,6 +224,10 @@ class SeasonalRulesEngine {
     } catch (error) {
       console.warn('kct-monthly-calendar.json not found, monthly intelligence features unavailable');
     }
+
+    // Daily demand calendar precomputed by the research build (kct_build/demand.py)
+    const calendar = loadKnowledgeArray<{ array: string; axes: Record<string, string[]> }>('calendar');
+    this.demandCalendar = calendar && { array: calendar.array, axes: calendar.index.axes };
   }
 
   /**
@@ -797,6 +804,41 @@ class SeasonalRulesEngine {
     };
   }
 
+  /**
+   * Daily urgency (0-10) or relative demand for a category in a climate zone,
+   * optionally under a weather shock (`unseasonable_warm_spell`, ...).
+   * `week` is 1-based; without it `date` (default today) picks the day.
+   * Returns null when the build has not produced the calendar or a label is unknown.
+   */
+  getDailyDemand(
+    category: string,
+    region: string,
+    options: { week?: number; date?: Date; scenario?: string; quantity?: 'urgency' | 'demand' } = {}
+  ): number | null {
+    if (!this.demandCalendar) return null;
+    const { array, axes } = this.demandCalendar;
+    const slug = (label: string) => label.toLowerCase().replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '');
+
+    let day: number;
+    if (options.week !== undefined) {
+      day = (options.week - 1) * 7 + 3;
+    } else {
+      const date = options.date ?? new Date();
+      day = Math.floor((Date.UTC(date.getFullYear(), date.getMonth(), date.getDate()) - Date.UTC(date.getFullYear(), 0, 1)) / 86400000);
+    }
+    day = Math.min(Math.max(day, 0), array.shape[1] - 1);
+
+    const indices = [
+      axes.quantity.indexOf(options.quantity ?? 'urgency'),
+      day,
+      axes.category.indexOf(slug(category)),
+      axes.region.indexOf(slug(region)),
+      axes.scenario.indexOf(slug(options.scenario ?? 'baseline'))
+    ];
+    if (indices.some(i => i < 0)) return null;
+    return array.data[flatIndex(array.shape, indices)];
+  }
+
   /**
    * Check if current month is peak graduation season (Section 1.2)
    */
@@ -825,13 +867,15 @@ class SeasonalRulesEngine {
    * Get comprehensive seasonal context for a given month (Section 1.2)
    * This is what the recommendation context builder will call
    */
-  async getSeasonalContext(month: string, includeGraduation: boolean = true): Promise<{
+  async getSeasonalContext(month: string, includeGraduation: boolean = true, region: string = 'temperate'): Promise<{
     monthly_pattern: any;
     graduation_timing: any;
+    demand_outlook: Array<{ category: string; urgency: number }>;
     seasonal_insights: string[];
   }> {
     const monthlyPattern = await this.getMonthlyPattern(month);
     const graduationTiming = includeGraduation ? await this.getGraduationTiming(month) : null;
+    const demandOutlook = this.getDemandOutlook(month, region);
 
     const insights: string[] = [];
 
@@ -849,13 +893,44 @@ class SeasonalRulesEngine {
       insights.push(`Typical spend: $${graduationTiming.avg_spend}`);
     }
 
+    if (demandOutlook.length > 0) {
+      const urgent = demandOutlook.map(d => `${d.category.replace(/_/g, ' ')} (${d.urgency}/10)`);
+      insights.push(`Most urgent in ${region} climates: ${urgent.join(', ')}`);
+    }
+
     return {
       monthly_pattern: monthlyPattern,
       graduation_timing: graduationTiming,
+      demand_outlook: demandOutlook,
       seasonal_insights: insights
     };
   }
 
+  /**
+   * Highest-urgency categories in the middle of a month for a climate zone,
+   * read from the precomputed daily demand calendar
+   */
+  private getDemandOutlook(month: string, region: string, limit: number = 3): Array<{ category: string; urgency: number }> {
+    if (!this.demandCalendar) return [];
+
+    const monthNames = [
+      'january', 'february', 'march', 'april', 'may', 'june',
+      'july', 'august', 'september', 'october', 'november', 'december'
+    ];
+    const monthIndex = monthNames.indexOf(month.toLowerCase());
+    if (monthIndex < 0) return [];
+    const date = new Date(new Date().getFullYear(), monthIndex, 15);
+
+    const outlook: Array<{ category: string; urgency: number }> = [];
+    for (const category of this.demandCalendar.axes.category) {
+      const urgency = this.getDailyDemand(category, region, { date });
+      if (urgency !== null) {
+        outlook.push({ category, urgency: Math.round(urgency * 10) / 10 });
+      }
+    }
+    return outlook.sort((a, b) => b.urgency - a.urgency).slice(0, limit);
+  }
+
   /**
    * Section 2.4.1: Get current events for a given month
    * Returns primary + secondary events happening right now
@@ -38,6 +38,7 @@ export interface ValidationContext {
   industry_context?: string;
   religious_considerations?: string[];
   photography_importance?: 'low' | 'medium' | 'high';
+  colorblind_type?: string;
 }
 
 export interface OutfitCombination {
@@ -5,6 +5,8 @@
 
 import { cacheService } from './cache-service';
 import { enhancedDataLoader } from '../utils/enhanced-data-loader';
+import { loadKnowledgeArray } from '../utils/knowledge-artifacts';
+import { NpyArray, flatIndex } from '../utils/npy';
 import {
   VenueIntelligence,
   LightingConditions,
@@ -23,6 +25,10 @@ export class VenueIntelligenceService {
   private venueIndex: Map<string, any> = new Map();
   private lightingDatabase: Map<string, LightingConditions> = new Map();
   private venueRulesCache: Map<string, UnspokenRule[]> = new Map();
+  private perceivedColors: { array: NpyArray; index: any } | null = null;
+
+  // CIEDE2000 shift from daylight that guests notice side by side
+  private readonly NOTICEABLE_SHIFT = 2.0;
 
   /**
    * Initialize the service with venue intelligence data
@@ -66,6 +72,41 @@ export class VenueIntelligenceService {
       // Initialize with default venue data to prevent service failure
       this.venueData = this.createDefaultVenueData();
     }
+
+    // Palette colours under each lighting type, precomputed by the research build (kct_build/lighting.py)
+    this.perceivedColors = loadKnowledgeArray('lighting');
+  }
+
+  /**
+   * How a palette colour (`suits/navy/standard`, or a family name such as
+   * `navy`) looks under a researched lighting type (`incandescent`,
+   * `LED Warm (3000K)`, ...): perceived Lab, hex and CIEDE2000 shift from daylight.
+   * Returns null when the build has not produced the lookup or a label is unknown.
+   */
+  getPerceivedColor(
+    color: string,
+    lighting: string
+  ): { color: string; lighting: string; lab: [number, number, number]; hex: string; delta_e: number } | null {
+    if (!this.perceivedColors) return null;
+    const { array, index } = this.perceivedColors;
+    const slug = (label: string) => label.toLowerCase().replace(/\(\s*\d+\s*k\s*\)/g, '').replace(/[^a-z0-9]+/g, '_').replace(/^_+|_+$/g, '');
+
+    const family = slug(color);
+    let c = index.colors.indexOf(color);
+    if (c < 0) c = index.colors.findIndex((id: string) => id.split('/')[1] === family);
+    const key = slug(lighting);
+    let l = index.lights.findIndex((light: any) => light.id === key);
+    if (l < 0) l = index.lights.findIndex((light: any) => light.id.includes(key));
+    if (c < 0 || l < 0) return null;
+
+    const channel = (k: number) => array.data[flatIndex(array.shape, [c, l, k])];
+    return {
+      color: index.colors[c],
+      lighting: index.lights[l].label,
+      lab: [channel(0), channel(1), channel(2)],
+      hex: index.hex[c][l],
+      delta_e: channel(3)
+    };
   }
 
   /**
@@ -122,6 +163,14 @@ export class VenueIntelligenceService {
       lightingAnalysis
     );
 
+    // How the recommended colors actually look under the venue's lighting
+    const perceivedColors = this.getPerceivedColors(colorRecommendations, request.lighting_conditions);
+    perceivedColors
+      .filter(perceived => perceived.delta_e >= this.NOTICEABLE_SHIFT)
+      .forEach(perceived => potentialIssues.push(
+        `${perceived.color} reads as ${perceived.hex} under ${perceived.lighting} (ΔE ${perceived.delta_e.toFixed(1)} from daylight)`
+      ));
+
     const response: VenueOptimizationResponse = {
       color_recommendations: colorRecommendations,
       fabric_recommendations: fabricRecommendations,
@@ -130,6 +179,9 @@ export class VenueIntelligenceService {
       potential_issues: potentialIssues,
       photography_tips: photographyTips
     };
+    if (perceivedColors.length > 0) {
+      response.perceived_colors = perceivedColors;
+    }
 
     // Cache the response
     await cacheService.set(cacheKey, response, {
@@ -954,6 +1006,27 @@ export class VenueIntelligenceService {
     return recommendations;
   }
 
+  private getPerceivedColors(
+    colors: string[],
+    lightingTypes: string[]
+  ): NonNullable<VenueOptimizationResponse['perceived_colors']> {
+    const perceived: NonNullable<VenueOptimizationResponse['perceived_colors']> = [];
+    for (const color of colors) {
+      for (const lighting of lightingTypes) {
+        const shift = this.getPerceivedColor(color, lighting);
+        if (shift) {
+          perceived.push({
+            color,
+            lighting: shift.lighting,
+            hex: shift.hex,
+            delta_e: Math.round(shift.delta_e * 100) / 100
+          });
+        }
+      }
+    }
+    return perceived;
+  }
+
   private async generateFabricRecommendations(
     venueIntelligence: VenueIntelligence,
     season: string,
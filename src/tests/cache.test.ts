@@ -8,6 +8,9 @@ import { cacheInvalidationService } from '../services/cache-invalidation';
 import { healthMonitor } from '../services/health-monitor';
 import { metricsCollector } from '../services/metrics-collector';
 import RedisConnection from '../config/redis';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
 
 // Mock Redis for testing
 jest.mock('../config/redis');
@@ -163,6 +166,35 @@ describe('Cache Service', () => {
     });
   });
 
+  describe('Change Feed', () => {
+    test('should not re-apply the feed already on disk at startup', async () => {
+      const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'kct-feed-'));
+      const feedPath = path.join(dir, 'changes.json');
+      const feed = (sequence: number) => JSON.stringify({
+        sequence,
+        datasets: {
+          'career-trajectory-patterns/promotion_signals': {
+            path: 'src/Career Trajectory Patterns/promotion_signals.csv',
+            status: 'changed',
+            served: ['research/career/promotion_signals.csv'],
+            derived: [],
+          },
+        },
+      });
+
+      fs.writeFileSync(feedPath, feed(7));
+      expect(cacheInvalidationService.primeChangeFeed(feedPath)).toBe(7);
+      expect(await cacheInvalidationService.applyChangeFeed(feedPath)).toBeNull();
+
+      fs.writeFileSync(feedPath, feed(8));
+      const applied = await cacheInvalidationService.applyChangeFeed(feedPath);
+      expect(applied?.sequence).toBe(8);
+      expect(applied?.datasets).toEqual(['career-trajectory-patterns/promotion_signals']);
+
+      fs.rmSync(dir, { recursive: true, force: true });
+    });
+  });
+
   describe('Performance Metrics', () => {
     test('should track cache metrics correctly', async () => {
       // Perform some cache operations
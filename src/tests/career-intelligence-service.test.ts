@@ -5,6 +5,7 @@
 import { careerIntelligenceService } from '../services/career-intelligence-service';
 import { cacheService } from '../services/cache-service';
 import { enhancedDataLoader } from '../utils/enhanced-data-loader';
+import { loadKnowledgeJson } from '../utils/knowledge-artifacts';
 import {
   CareerTrajectoryRequest,
   CareerAdvancementStage,
@@ -14,9 +15,11 @@ import {
 // Mock dependencies
 jest.mock('../services/cache-service');
 jest.mock('../utils/enhanced-data-loader');
+jest.mock('../utils/knowledge-artifacts');
 
 const mockCacheService = cacheService as jest.Mocked<typeof cacheService>;
 const mockEnhancedDataLoader = enhancedDataLoader as jest.Mocked<typeof enhancedDataLoader>;
+const mockLoadKnowledgeJson = loadKnowledgeJson as jest.MockedFunction<typeof loadKnowledgeJson>;
 
 describe('CareerIntelligenceService', () => {
   const mockCareerData = [
@@ -517,4 +520,49 @@ describe('CareerIntelligenceService', () => {
       }
     });
   });
+
+  describe('Projected Spend', () => {
+    const spendProjections = {
+      horizon: 10,
+      age_bands: ['22-27', '28-32', '33-37'],
+      lookup: {
+        '33-37|mid_level': Array.from({ length: 10 }, (_, i) => ({
+          years: i + 1,
+          expected_spend: 2000 + i * 100,
+          cumulative_spend: (i + 1) * 2000 + (i * (i + 1) / 2) * 100,
+          stages: { mid_level: 0.5, senior_manager: 0.5 }
+        }))
+      }
+    };
+
+    it('should read projected spend from the career-stage model', () => {
+      mockLoadKnowledgeJson.mockReturnValue(spendProjections);
+
+      const projection = careerIntelligenceService.getProjectedSpend(33, 'Mid-Level (3-7 years)', 3);
+
+      expect(mockLoadKnowledgeJson).toHaveBeenCalledWith('career', 'spend.json');
+      expect(projection).toEqual({
+        expected_spend: 2200,
+        cumulative_spend: 6300,
+        stages: { mid_level: 0.5, senior_manager: 0.5 }
+      });
+      expect(careerIntelligenceService.getProjectedSpend(33, 'C-Suite', 3)).toBeNull();
+    });
+
+    it('should add projected spend to the investment strategy', async () => {
+      mockLoadKnowledgeJson.mockReturnValue(spendProjections);
+
+      const result = await careerIntelligenceService.analyzeCareerTrajectory({
+        ...mockCareerTrajectoryRequest,
+        customer_id: 'career-test-spend',
+        current_role: 'Senior Analyst'
+      });
+
+      expect(result.investment_strategy.projected_spend).toEqual([
+        { years: 1, expected_spend: 2000, cumulative_spend: 2000 },
+        { years: 3, expected_spend: 2200, cumulative_spend: 6300 },
+        { years: 5, expected_spend: 2400, cumulative_spend: 11000 }
+      ]);
+    });
+  });
 });
\ No newline at end of file
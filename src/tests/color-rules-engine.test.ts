@@ -0,0 +1,97 @@
+/**
+ * Unit Tests for the Color Rules Engine's color vision accessibility checks
+ */
+
+import { colorRulesEngine } from '../services/color-rules-engine';
+import { loadDataFile } from '../utils/data-loader';
+import { loadKnowledgeArray } from '../utils/knowledge-artifacts';
+
+// Mock dependencies
+jest.mock('../utils/data-loader');
+jest.mock('../utils/knowledge-artifacts');
+
+const mockLoadDataFile = loadDataFile as jest.MockedFunction<typeof loadDataFile>;
+const mockLoadKnowledgeArray = loadKnowledgeArray as jest.MockedFunction<typeof loadKnowledgeArray>;
+
+describe('ColorRulesEngine', () => {
+  // 2 suits x 1 shirt x 2 ties: with deuteranomaly the brown suit and
+  // green tie blend, bit (1 * 1 + 0) * 2 + 0 = 2
+  const mockColorVision = {
+    array: { shape: [2, 1], dtype: '|u1', data: new Uint8Array([0x00, 0x20]) },
+    index: {
+      array: 'confusable.npy',
+      layers: {
+        suits: ['suits/navy/standard', 'suits/brown/standard'],
+        shirts: ['shirts/white/crisp_white'],
+        ties: ['ties/green/hunter', 'ties/burgundy/classic']
+      },
+      types: [
+        { id: 'normal_vision', kind: 'normal' },
+        { id: 'deuteranomaly', kind: 'deutan' }
+      ]
+    }
+  };
+
+  beforeAll(async () => {
+    mockLoadDataFile.mockResolvedValue({});
+    mockLoadKnowledgeArray.mockImplementation(stage => (stage === 'colorvision' ? mockColorVision : null));
+    await colorRulesEngine.initialize();
+  });
+
+  describe('Confusable Combinations', () => {
+    it('should return the bitset for a colorblind type', () => {
+      expect(mockLoadKnowledgeArray).toHaveBeenCalledWith('colorvision');
+      expect(colorRulesEngine.getConfusableMask('Deuteranomaly (Green-weak)')).toEqual(new Uint8Array([0x20]));
+      expect(colorRulesEngine.getConfusableMask('deutan')).toEqual(new Uint8Array([0x20]));
+      expect(colorRulesEngine.getConfusableMask('tritanopia')).toBeNull();
+    });
+
+    it('should check a single combination against the bitset', () => {
+      const brownWithGreen = { suit_color: 'brown', shirt_color: 'white', tie_color: 'green' };
+
+      expect(colorRulesEngine.isDistinguishableFor(brownWithGreen, 'deuteranomaly')).toBe(false);
+      expect(colorRulesEngine.isDistinguishableFor({ ...brownWithGreen, tie_color: 'burgundy' }, 'deuteranomaly')).toBe(true);
+      expect(colorRulesEngine.isDistinguishableFor(brownWithGreen, 'normal vision')).toBe(true);
+      expect(colorRulesEngine.isDistinguishableFor({ ...brownWithGreen, suit_color: 'teal' }, 'deuteranomaly')).toBeNull();
+    });
+  });
+
+  describe('Color Vision Accessibility', () => {
+    it('should fail combinations that blend together and suggest ties that do not', async () => {
+      const result = await colorRulesEngine.validateColorVisionAccessibility(
+        { suit_color: 'brown', shirt_color: 'white', tie_color: 'green' },
+        { colorblind_type: 'deuteranomaly' }
+      );
+
+      expect(result).toMatchObject({
+        rule_id: 'CVA001',
+        passed: false,
+        severity: 'medium',
+        message: 'Some pieces blend together with deuteranomaly',
+        alternatives: ['burgundy']
+      });
+    });
+
+    it('should pass distinguishable combinations', async () => {
+      const result = await colorRulesEngine.validateColorVisionAccessibility(
+        { suit_color: 'navy', shirt_color: 'white', tie_color: 'green' },
+        { colorblind_type: 'deuteranomaly' }
+      );
+
+      expect(result.passed).toBe(true);
+      expect(result.severity).toBe('success');
+      expect(result.alternatives).toEqual([]);
+    });
+
+    it('should stay informational without a colorblind type', async () => {
+      const result = await colorRulesEngine.validateColorVisionAccessibility(
+        { suit_color: 'brown', shirt_color: 'white', tie_color: 'green' },
+        {}
+      );
+
+      expect(result.passed).toBe(true);
+      expect(result.severity).toBe('info');
+      expect(result.context_applied).toEqual([]);
+    });
+  });
+});
@@ -479,4 +479,49 @@ describe('CustomerPsychologyService', () => {
       });
     });
   });
+
+  describe('Emotional Trigger Rankings', () => {
+    it('should attach the top-ranked words to each emotional trigger', async () => {
+      mockEnhancedDataLoader.loadPrecomputedRanking.mockReturnValue({
+        rows: [
+          { 'Word/Phrase': 'Bespoke', Emotional_Category: 'Exclusivity', rank: 1 },
+          { 'Word/Phrase': 'Confidence', Emotional_Category: 'Self-Assurance', rank: 2 },
+          { 'Word/Phrase': 'Power', Emotional_Category: 'Personal Power', rank: 3 },
+          { 'Word/Phrase': 'Perfect Fit', Emotional_Category: 'Comfort', rank: 4 },
+          { 'Word/Phrase': 'Craftsmanship', Emotional_Category: 'Quality', rank: 5 }
+        ],
+        rank_by_key: { Bespoke: 1, Confidence: 2, Power: 3, 'Perfect Fit': 4, Craftsmanship: 5 }
+      });
+
+      const result = await customerPsychologyService.analyzeDecisionFatigue({
+        customer_id: 'test-customer-ranking',
+        session_duration: 5 * 60 * 1000,
+        choices_viewed: 8,
+        previous_sessions: []
+      });
+
+      expect(mockEnhancedDataLoader.loadPrecomputedRanking).toHaveBeenCalledWith('emotional_triggers_top10');
+      const wordsByTrigger = Object.fromEntries(
+        result.emotional_triggers.map(trigger => [trigger.trigger_type, trigger.power_words])
+      );
+      expect(wordsByTrigger).toEqual({
+        confidence: ['Confidence', 'Power'],
+        quality: ['Bespoke', 'Craftsmanship']
+      });
+    });
+
+    it('should keep the default triggers when the ranking is not built', async () => {
+      mockEnhancedDataLoader.loadPrecomputedRanking.mockReturnValue(null);
+
+      const result = await customerPsychologyService.analyzeDecisionFatigue({
+        customer_id: 'test-customer-no-ranking',
+        session_duration: 5 * 60 * 1000,
+        choices_viewed: 8,
+        previous_sessions: []
+      });
+
+      expect(result.emotional_triggers.length).toBeGreaterThan(0);
+      result.emotional_triggers.forEach(trigger => expect(trigger.power_words).toBeUndefined());
+    });
+  });
 });
\ No newline at end of file
@@ -0,0 +1,72 @@
+/**
+ * Unit Tests for the Seasonal Rules Engine's daily demand calendar
+ */
+
+import { seasonalRulesEngine } from '../services/seasonal-rules-engine';
+import { loadKnowledgeArray } from '../utils/knowledge-artifacts';
+
+// Mock dependencies
+jest.mock('../utils/knowledge-artifacts');
+
+const mockLoadKnowledgeArray = loadKnowledgeArray as jest.MockedFunction<typeof loadKnowledgeArray>;
+
+describe('SeasonalRulesEngine', () => {
+  // [quantity, day, category, region, scenario]: linen is urgent from May to
+  // September, outerwear the rest of the year
+  const days = 365;
+  const data = new Float32Array(2 * days * 2);
+  for (let day = 0; day < days; day++) {
+    const summer = day >= 120 && day < 270;
+    data[(days + day) * 2] = summer ? 8 : 2;
+    data[(days + day) * 2 + 1] = summer ? 2 : 8;
+  }
+  const mockCalendar = {
+    array: { shape: [2, days, 2, 1, 1], dtype: '<f4', data },
+    index: {
+      array: 'demand.npy',
+      axes: {
+        quantity: ['demand', 'urgency'],
+        category: ['linen', 'outerwear'],
+        region: ['temperate'],
+        scenario: ['baseline']
+      }
+    }
+  };
+
+  beforeAll(async () => {
+    mockLoadKnowledgeArray.mockReturnValue(mockCalendar);
+    await seasonalRulesEngine.initialize();
+  });
+
+  describe('Daily Demand', () => {
+    it('should read urgency from the demand calendar', () => {
+      expect(mockLoadKnowledgeArray).toHaveBeenCalledWith('calendar');
+      expect(seasonalRulesEngine.getDailyDemand('Linen', 'Temperate', { week: 30 })).toBe(8);
+      expect(seasonalRulesEngine.getDailyDemand('Outerwear', 'temperate', { week: 2 })).toBe(8);
+    });
+
+    it('should return null for unknown labels', () => {
+      expect(seasonalRulesEngine.getDailyDemand('linen', 'arctic', { week: 30 })).toBeNull();
+      expect(seasonalRulesEngine.getDailyDemand('linen', 'temperate', { week: 30, scenario: 'heatwave' })).toBeNull();
+    });
+  });
+
+  describe('Seasonal Context', () => {
+    it('should rank categories by urgency for the month', async () => {
+      const july = await seasonalRulesEngine.getSeasonalContext('July', false);
+      expect(july.demand_outlook).toEqual([
+        { category: 'linen', urgency: 8 },
+        { category: 'outerwear', urgency: 2 }
+      ]);
+      expect(july.seasonal_insights).toContain('Most urgent in temperate climates: linen (8/10), outerwear (2/10)');
+
+      const january = await seasonalRulesEngine.getSeasonalContext('January', false);
+      expect(january.demand_outlook[0]).toEqual({ category: 'outerwear', urgency: 8 });
+    });
+
+    it('should leave the outlook empty for an uncovered region', async () => {
+      const context = await seasonalRulesEngine.getSeasonalContext('July', false, 'tropical');
+      expect(context.demand_outlook).toEqual([]);
+    });
+  });
+});
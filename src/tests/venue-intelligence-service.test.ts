@@ -5,6 +5,7 @@
 import { VenueIntelligenceService } from '../services/venue-intelligence-service';
 import { cacheService } from '../services/cache-service';
 import { enhancedDataLoader } from '../utils/enhanced-data-loader';
+import { loadKnowledgeArray } from '../utils/knowledge-artifacts';
 import {
   VenueOptimizationRequest,
   LightingConditions,
@@ -14,9 +15,11 @@ import {
 // Mock dependencies
 jest.mock('../services/cache-service');
 jest.mock('../utils/enhanced-data-loader');
+jest.mock('../utils/knowledge-artifacts');
 
 const mockCacheService = cacheService as jest.Mocked<typeof cacheService>;
 const mockEnhancedDataLoader = enhancedDataLoader as jest.Mocked<typeof enhancedDataLoader>;
+const mockLoadKnowledgeArray = loadKnowledgeArray as jest.MockedFunction<typeof loadKnowledgeArray>;
 
 describe('VenueIntelligenceService', () => {
   let venueIntelligenceService: VenueIntelligenceService;
@@ -552,4 +555,62 @@ describe('VenueIntelligenceService', () => {
       expect(morningResult.fabric_recommendations).toBeDefined();
     });
   });
+
+  describe('Perceived Colors', () => {
+    // [color, light, (L, a, b, delta_e)]
+    const mockLighting = {
+      array: {
+        shape: [2, 2, 4],
+        dtype: '<f4',
+        data: new Float32Array([
+          20, 2, -25, 0.2,   19, 6, -18, 2.85,
+          30, 0, -3, 0.1,    31, 2, 1, 1.2
+        ])
+      },
+      index: {
+        array: 'perceived.npy',
+        colors: ['suits/navy/standard', 'suits/charcoal/standard'],
+        lights: [
+          { id: 'natural_daylight', label: 'Natural Daylight (5500K)' },
+          { id: 'incandescent', label: 'Incandescent (2700K)' }
+        ],
+        hex: [['#1f2a44', '#2e2a3a'], ['#36454f', '#3d4347']]
+      }
+    };
+
+    beforeEach(() => {
+      mockLoadKnowledgeArray.mockReturnValue(mockLighting);
+    });
+
+    it('should look up a palette color under a lighting type', async () => {
+      await venueIntelligenceService.initialize();
+
+      expect(mockLoadKnowledgeArray).toHaveBeenCalledWith('lighting');
+      const perceived = venueIntelligenceService.getPerceivedColor('navy', 'Incandescent (2700K)');
+      expect(perceived).toMatchObject({
+        color: 'suits/navy/standard',
+        lighting: 'Incandescent (2700K)',
+        hex: '#2e2a3a',
+        lab: [19, 6, -18]
+      });
+      expect(perceived!.delta_e).toBeCloseTo(2.85, 5);
+      expect(venueIntelligenceService.getPerceivedColor('navy', 'candlelight')).toBeNull();
+    });
+
+    it('should flag recommended colors that shift under the venue lighting', async () => {
+      const result = await venueIntelligenceService.optimizeForVenue({
+        venue_type: 'business',
+        lighting_conditions: ['incandescent'],
+        dress_code_level: 7,
+        season: 'fall',
+        time_of_day: 'evening'
+      });
+
+      expect(result.perceived_colors).toEqual(expect.arrayContaining([
+        { color: 'Navy', lighting: 'Incandescent (2700K)', hex: '#2e2a3a', delta_e: 2.85 }
+      ]));
+      expect(result.potential_issues).toContain('Navy reads as #2e2a3a under Incandescent (2700K) (ΔE 2.9 from daylight)');
+      expect(result.potential_issues.some(issue => issue.startsWith('Charcoal reads as'))).toBe(false);
+    });
+  });
 });
\ No newline at end of file
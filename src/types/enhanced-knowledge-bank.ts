@@ -26,6 +26,7 @@ export interface EmotionalTrigger {
   intensity: number; // 1-10 scale
   context: string[];
   messaging_approach: string;
+  power_words?: string[]; // Highest-converting words for this trigger
 }
 
 export interface BehaviorPattern {
@@ -415,6 +416,11 @@ export interface InvestmentStrategy {
   medium_term_goals: string[];
   long_term_vision: string;
   budget_allocation: { [category: string]: number };
+  projected_spend?: Array<{
+    years: number;
+    expected_spend: number;
+    cumulative_spend: number;
+  }>;
 }
 
 export interface VenueOptimizationRequest {
@@ -435,6 +441,12 @@ export interface VenueOptimizationResponse {
   confidence_score: number;
   potential_issues: string[];
   photography_tips: string[];
+  perceived_colors?: Array<{
+    color: string;
+    lighting: string;
+    hex: string;
+    delta_e: number;
+  }>;
 }
 
 export interface CulturalAdaptationRequest {
@@ -428,6 +428,13 @@ export interface KnowledgeBankIndex {
     visual: string[];
     validation: string[];
   };
+  // Written by `python -m kct_build --publish`
+  updated?: string;
+  checksums?: Record<string, { sha256: string; size: number }>;
+  published?: {
+    version: string;
+    files: string[];
+  };
 }
 
 // API Response Types
@@ -15,6 +15,7 @@ import {
   VenueIntelligence,
   EnhancedKnowledgeBankIndex
 } from '../types/enhanced-knowledge-bank';
+import { loadKnowledgeJson } from './knowledge-artifacts';
 
 export class EnhancedDataLoader {
   private enhancementDataPath: string;
@@ -22,9 +23,11 @@ export class EnhancedDataLoader {
   private cacheExpiry: Map<string, number> = new Map();
   private readonly CACHE_DURATION = 10 * 60 * 1000; // 10 minutes for enhancement data
   private readonly MAX_CACHE_ENTRIES = 50;
+  private readonly repoRoot = path.join(__dirname, '../..');
+  private canonicalAliases: Map<string, string> | null = null;
 
   constructor() {
-    this.enhancementDataPath = path.join(__dirname, '../../KCT Knowledge API Enhancement -Update-Info');
+    this.enhancementDataPath = path.join(this.repoRoot, 'KCT Knowledge API Enhancement -Update-Info');
     // Periodic cache cleanup every 5 minutes
     setInterval(() => this.evictExpiredEntries(), 5 * 60 * 1000);
   }
@@ -51,10 +54,31 @@ export class EnhancedDataLoader {
     }
   }
 
+  /**
+   * Map duplicate research copies (e.g. `video_call_undertones_1.csv`) to the
+   * canonical file chosen by the build (`build/knowledge/canonical.json`).
+   * Paths are relative to the enhancement data directory.
+   */
+  private resolveCanonicalPath(filePath: string): string {
+    if (this.canonicalAliases === null) {
+      this.canonicalAliases = new Map();
+      // Without the build manifest files load as requested
+      const manifest = loadKnowledgeJson<{ aliases?: Record<string, string> }>('canonical.json');
+      for (const [alias, canonical] of Object.entries(manifest?.aliases || {})) {
+        this.canonicalAliases.set(alias, canonical);
+      }
+    }
+
+    const repoRelative = path.relative(this.repoRoot, path.join(this.enhancementDataPath, filePath)).split(path.sep).join('/');
+    const canonical = this.canonicalAliases.get(repoRelative);
+    return canonical ? path.relative(this.enhancementDataPath, path.join(this.repoRoot, canonical)) : filePath;
+  }
+
   /**
    * Load and parse JSON file from enhancement data directory
    */
   public loadEnhancementJsonFile<T>(filePath: string): T {
+    filePath = this.resolveCanonicalPath(filePath);
     const cacheKey = `enhancement_${filePath}`;
     const now = Date.now();
 
@@ -84,6 +108,7 @@ export class EnhancedDataLoader {
    * Load and parse CSV file from enhancement data directory
    */
   public async loadEnhancementCsvFile<T>(filePath: string): Promise<T[]> {
+    filePath = this.resolveCanonicalPath(filePath);
     const cacheKey = `enhancement_csv_${filePath}`;
     const now = Date.now();
 
@@ -124,6 +149,28 @@ export class EnhancedDataLoader {
     });
   }
 
+  /**
+   * Load a ranking precomputed by the research build
+   * (`build/knowledge/rankings/<name>.json`, e.g. `emotional_triggers_top10`).
+   * Rows are already ordered; `rank_by_key` maps a row key to its rank.
+   * Returns null when the build has not produced it.
+   */
+  public loadPrecomputedRanking(name: string): { rows: any[]; rank_by_key: Record<string, number> } | null {
+    const cacheKey = `ranking_${name}`;
+    const now = Date.now();
+
+    if (this.cache.has(cacheKey) && this.cacheExpiry.get(cacheKey)! > now) {
+      return this.cache.get(cacheKey);
+    }
+
+    const ranking = loadKnowledgeJson('rankings', `${path.basename(name)}.json`);
+    if (ranking) {
+      this.cache.set(cacheKey, ranking);
+      this.cacheExpiry.set(cacheKey, now + this.CACHE_DURATION);
+    }
+    return ranking;
+  }
+
   /**
    * Create fallback data for missing files
    */
@@ -506,6 +553,27 @@ export class EnhancedDataLoader {
     }
   }
 
+  /**
+   * Evict the entries built from files listed in the research build's change
+   * feed (repo-relative paths) and the rankings derived from them.
+   * Everything else stays cached. Returns the number of entries removed.
+   */
+  evictChangedFiles(repoPaths: string[], rankings: string[] = []): number {
+    const keys = new Set<string>(rankings.map(name => `ranking_${name}`));
+    for (const repoPath of repoPaths) {
+      const filePath = path.relative(this.enhancementDataPath, path.join(this.repoRoot, repoPath));
+      keys.add(`enhancement_${filePath}`);
+      keys.add(`enhancement_csv_${filePath}`);
+    }
+
+    let removed = 0;
+    for (const key of keys) {
+      if (this.cache.delete(key)) removed++;
+      this.cacheExpiry.delete(key);
+    }
+    return removed;
+  }
+
   /**
    * Clear cache
    */
@@ -0,0 +1,69 @@
+/**
+ * Derived artifacts written by the research build (`python -m kct_build`):
+ * precomputed lookups, rankings and matrices under `build/knowledge/`.
+ *
+ * The directory sits at the repo root next to `src/` and `dist/`, so the
+ * same relative path works from ts-node and from the compiled server; the
+ * Docker image builds it in its `knowledge` stage. `KCT_KNOWLEDGE_DIR`
+ * points the API at another copy.
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { logger } from './logger';
+import { NpyArray, readNpy } from './npy';
+
+export const KNOWLEDGE_DIR = process.env.KCT_KNOWLEDGE_DIR
+  ? path.resolve(process.env.KCT_KNOWLEDGE_DIR)
+  : path.join(__dirname, '../../build/knowledge');
+
+/**
+ * Absolute path of an artifact, e.g. `knowledgePath('career', 'spend.json')`
+ */
+export function knowledgePath(...segments: string[]): string {
+  return path.join(KNOWLEDGE_DIR, ...segments);
+}
+
+const warned = new Set<string>();
+
+// Once per artifact: lookups retry on every request until the build has run.
+function warnMissing(relativePath: string, error: unknown): void {
+  if (warned.has(relativePath)) return;
+  warned.add(relativePath);
+  const reason = (error as NodeJS.ErrnoException)?.code === 'ENOENT'
+    ? 'not built'
+    : (error as Error)?.message ?? String(error);
+  logger.warn(`Knowledge artifact ${relativePath} unavailable (${reason}); using fallback heuristics`, {
+    knowledge_dir: KNOWLEDGE_DIR,
+  });
+}
+
+/**
+ * Parse a JSON artifact. Logs a warning and returns null when it is missing
+ * or unreadable, so callers can fall back to their heuristics.
+ */
+export function loadKnowledgeJson<T = any>(...segments: string[]): T | null {
+  try {
+    return JSON.parse(fs.readFileSync(knowledgePath(...segments), 'utf8'));
+  } catch (error) {
+    warnMissing(segments.join('/'), error);
+    return null;
+  }
+}
+
+/**
+ * Load a stage's `index.json` and the `.npy` array it names
+ * (`loadKnowledgeArray('lighting')`). Logs a warning and returns null when
+ * either is missing or unreadable.
+ */
+export function loadKnowledgeArray<I extends { array: string } = any>(
+  stage: string
+): { array: NpyArray; index: I } | null {
+  try {
+    const index: I = JSON.parse(fs.readFileSync(knowledgePath(stage, 'index.json'), 'utf8'));
+    return { array: readNpy(knowledgePath(stage, index.array)), index };
+  } catch (error) {
+    warnMissing(`${stage}/index.json`, error);
+    return null;
+  }
+}
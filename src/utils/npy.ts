@@ -0,0 +1,75 @@
+/**
+ * Minimal reader for the NumPy `.npy` arrays written by the research build
+ * (`python -m kct_build`, under `build/knowledge/`).
+ *
+ * Only C-ordered little-endian float32, float16 and uint8 arrays are
+ * supported; float16 is widened to float32 on load.
+ */
+
+import * as fs from 'fs';
+
+export interface NpyArray {
+  shape: number[];
+  dtype: string;
+  data: Float32Array | Uint8Array;
+}
+
+const MAGIC = '\x93NUMPY';
+
+function halfToFloat(bits: number): number {
+  const sign = bits & 0x8000 ? -1 : 1;
+  const exponent = (bits >> 10) & 0x1f;
+  const fraction = bits & 0x03ff;
+  if (exponent === 0) return sign * Math.pow(2, -14) * (fraction / 1024);
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  return sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+}
+
+export function readNpy(filePath: string): NpyArray {
+  const buffer = fs.readFileSync(filePath);
+  if (buffer.toString('latin1', 0, 6) !== MAGIC) {
+    throw new Error(`${filePath} is not a .npy file`);
+  }
+  const major = buffer[6];
+  const headerLength = major === 1 ? buffer.readUInt16LE(8) : buffer.readUInt32LE(8);
+  const offset = (major === 1 ? 10 : 12) + headerLength;
+  const header = buffer.toString('latin1', major === 1 ? 10 : 12, offset);
+
+  const dtype = /'descr':\s*'([^']+)'/.exec(header)?.[1] ?? '';
+  if (/'fortran_order':\s*True/.test(header)) {
+    throw new Error(`${filePath}: Fortran-ordered arrays are not supported`);
+  }
+  const shape = (/'shape':\s*\(([^)]*)\)/.exec(header)?.[1] ?? '')
+    .split(',')
+    .map(dim => dim.trim())
+    .filter(Boolean)
+    .map(Number);
+  const count = shape.reduce((total, dim) => total * dim, 1);
+  const body = buffer.subarray(offset);
+
+  switch (dtype) {
+    case '<f4': {
+      const data = new Float32Array(count);
+      for (let i = 0; i < count; i++) data[i] = body.readFloatLE(i * 4);
+      return { shape, dtype, data };
+    }
+    case '<f2': {
+      const data = new Float32Array(count);
+      for (let i = 0; i < count; i++) data[i] = halfToFloat(body.readUInt16LE(i * 2));
+      return { shape, dtype, data };
+    }
+    case '|u1':
+      return { shape, dtype, data: new Uint8Array(body.buffer, body.byteOffset, count) };
+    default:
+      throw new Error(`${filePath}: unsupported dtype ${dtype}`);
+  }
+}
+
+/** Flat offset of `indices` in a C-ordered array of `shape`. */
+export function flatIndex(shape: number[], indices: number[]): number {
+  let offset = 0;
+  for (let axis = 0; axis < shape.length; axis++) {
+    offset = offset * shape[axis] + indices[axis];
+  }
+  return offset;
+}
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from kct_build.aggregates import GroupBy, TopN, write_aggregates  # noqa: E402
+from kct_build.discovery import discover_generators  # noqa: E402
+from kct_build.graph import BuildGraph  # noqa: E402
+
+
+def test_rankings_and_group_tables(tmp_path):
+    topic = tmp_path / "src" / "Search"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('formal_menswear_search_themes.csv')\n")
+    (topic / "formal_menswear_search_themes.csv").write_text(
+        "Question_Theme,Search_Volume_2023,Search_Volume_2024,Growth_Rate,Peak_Season,Customer_Segment\n"
+        "Suit fit,90,100,11.1,Year-round,Professionals\n"
+        "Wedding attire,50,80,60.0,Wedding season,Grooms\n"
+        "Tux rental,70,120,71.4,Wedding season,Grooms\n"
+    )
+    graph = BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+    source = "formal_menswear_search_themes.csv"
+    out = tmp_path / "knowledge"
+
+    index = write_aggregates(
+        graph, out_dir=out,
+        rankings=[TopN("themes_top2", source, "Search_Volume_2024", 2), TopN("missing", "nope.csv", "x", 1)],
+        aggregates=[GroupBy("by_season", source, "Peak_Season", {"Search_Volume_2024": "sum"})],
+    )
+
+    assert sorted(index) == ["by_season", "themes_top2"]
+    ranking = json.loads((out / "rankings" / "themes_top2.json").read_text())
+    assert [row["Question_Theme"] for row in ranking["rows"]] == ["Tux rental", "Suit fit"]
+    assert ranking["rank_by_key"] == {"Tux rental": 1, "Suit fit": 2}
+
+    table = pd.read_parquet(out / index["by_season"]["path"])
+    assert table.set_index("Peak_Season")["Search_Volume_2024"].to_dict() == {"Wedding season": 200, "Year-round": 100}
+    assert table.set_index("Peak_Season")["count"].to_dict() == {"Wedding season": 2, "Year-round": 1}
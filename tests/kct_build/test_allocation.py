@@ -0,0 +1,58 @@
+import csv
+
+import pytest
+
+from kct_build.allocation import main, plan_allocation
+
+TIMING = [
+    {"Month": "March", "Graduation_Volume_Percentage": 20, "Peak_Purchase_Window_Days": 21,
+     "Average_Spend_Per_Customer": 800, "Inventory_Turnover_Rate": 2.0,
+     "Size_Range_Demand": "Slim/Modern Fit", "Color_Preference_Trend": "Navy, Charcoal"},
+    {"Month": "May", "Graduation_Volume_Percentage": 80, "Peak_Purchase_Window_Days": 28,
+     "Average_Spend_Per_Customer": 1500, "Inventory_Turnover_Rate": 5.0,
+     "Size_Range_Demand": "All Sizes Peak", "Color_Preference_Trend": "Basic Navy"},
+]
+
+
+def test_scarce_stock_goes_to_the_most_valuable_weeks():
+    np = pytest.importorskip("numpy")
+    sizes, colors = ["40R Slim", "42R Classic", "44L Classic"], ["Navy", "Charcoal", "Tan"]
+    stock = [100, 60, 40]
+    stores = {"detroit": 3, "troy": 1}
+
+    ample = plan_allocation(sizes, colors, stock, stores, TIMING, season_units=100, year=2026)
+    assert np.all(ample.units <= np.ceil(ample.demand))
+    assert ample.units.sum() == pytest.approx(100, abs=len(sizes))
+    assert ample.units[:, 0].sum() > 2.5 * ample.units[:, 1].sum()  # store demand shares
+    march_slim = ample.demand[0, :, :3].sum() / ample.demand[:, :, :3].sum()
+    assert march_slim > 100 / 200  # slim fit and navy favoured in March
+
+    scarce = plan_allocation(sizes, colors, stock, stores, TIMING, season_units=1000, year=2026)
+    assert np.all(scarce.units.sum(axis=(1, 2)) <= stock)
+    assert scarce.units.sum() == pytest.approx(sum(stock), abs=len(sizes))
+    may = [w for w, week in enumerate(scarce.weeks) if week.month in (4, 5)]
+    assert scarce.units[:, :, may].sum() == scarce.units.sum()  # all of it in the high-value window
+    april = [w for w, week in enumerate(scarce.weeks) if week.month == 4]
+    assert scarce.units[:, :, april].sum() > 0  # April buying for May graduations is priced as May
+
+
+def test_cli_writes_a_plan(tmp_path):
+    pytest.importorskip("numpy")
+    files = {
+        "stock.csv": [{"Size": "40R Slim", "Color": "Navy", "Units": 30}],
+        "stores.csv": [{"Store": "detroit", "Demand_Share": 1}],
+        "timing.csv": TIMING,
+    }
+    for name, rows in files.items():
+        with open(tmp_path / name, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    out = tmp_path / "plan.csv"
+    assert main([str(tmp_path / "stock.csv"), "--stores", str(tmp_path / "stores.csv"),
+                 "--timing", str(tmp_path / "timing.csv"), "--year", "2026", "-o", str(out)]) == 0
+    with open(out, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert {r["Store"] for r in rows} == {"detroit"}
+    assert sum(int(r["Units"]) for r in rows) == 30
+    assert rows[0]["Week_Start"].startswith("2026-0")
@@ -0,0 +1,46 @@
+from kct_build.benchmark import collect, load_history, record, regressions
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.runner import NodeResult
+
+
+def _run(seconds, peak_rss=100 * 2**20, size=10_000, jobs=4):
+    return {
+        "jobs": jobs,
+        "renderers": 2,
+        "topics": {"seasonal": {"seconds": seconds, "peak_rss": peak_rss, "bytes": size, "complete": True}},
+    }
+
+
+def test_regression_needs_ratio_and_absolute_growth():
+    history = [_run(2.0), _run(2.2), _run(1.8)]
+    assert regressions(_run(2.4), history) == []            # +20%
+    assert regressions(_run(1.2), [_run(1.0)]) == []        # +20% but only 0.2s
+    [message] = regressions(_run(3.0), history)
+    assert message.startswith("seasonal: seconds 3.00s vs baseline 2.00s")
+    assert regressions(_run(3.0, jobs=1), history) == []    # no comparable runs
+
+
+def test_memory_and_size_regressions():
+    history = [_run(2.0)]
+    found = regressions(_run(2.0, peak_rss=300 * 2**20, size=500_000), history)
+    assert [m.split(" ")[1] for m in found] == ["peak_rss", "bytes"]
+
+
+def test_collect_and_record_history(tmp_path):
+    topic = tmp_path / "src" / "Seasonal"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('weather.csv')\n")
+    (topic / "weather.csv").write_text("a,b\n1,2\n")
+    graph = BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+    result = NodeResult("Seasonal/script.py", "ok", duration=1.5, peak_rss=50 * 2**20)
+
+    run = collect(graph, [result], wall_seconds=2.0, jobs=4, renderers=2)
+    assert run["artifacts"] == {"seasonal/weather.csv": {"topic": "seasonal", "kind": "csv", "bytes": 8}}
+    assert run["topics"]["seasonal"]["seconds"] == 1.5
+
+    history_path = tmp_path / "benchmarks.json"
+    assert record(run, path=history_path)
+    slower = dict(run, topics={"seasonal": dict(run["topics"]["seasonal"], seconds=5.0)})
+    assert not record(slower, path=history_path)
+    assert len(load_history(history_path)) == 2
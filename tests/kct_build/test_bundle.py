@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+
+from kct_build.bundle import COMBINED_NAME, load_dataset, write_bundle  # noqa: E402
+from kct_build.discovery import discover_generators  # noqa: E402
+from kct_build.graph import BuildGraph  # noqa: E402
+
+
+def test_bundle_types_columns_and_round_trips(tmp_path):
+    topic = tmp_path / "src" / "Seasonal Micro-Patterns_ Advanced"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('weather.csv')\n")
+    (topic / "weather.csv").write_text(
+        "Weather_Pattern,Purchase_Spike_Percentage,Conversion_Probability,Note\n"
+        "Cold Snap,85,0.4,\n"
+        "Warm Spell,120,0.55,early\n"
+    )
+    graph = BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+    out = tmp_path / "bundle"
+
+    description = write_bundle(graph, out_dir=out)
+
+    key = "seasonal-micro-patterns-advanced/weather"
+    assert description[key]["columns"] == {
+        "Weather_Pattern": "string",
+        "Purchase_Spike_Percentage": "int64",
+        "Conversion_Probability": "double",
+        "Note": "string",
+    }
+    assert json.loads((out / "schema.json").read_text())["datasets"][key]["rows"] == 2
+
+    combined = load_dataset(out / COMBINED_NAME, key)
+    per_topic = load_dataset(out / "seasonal-micro-patterns-advanced.arrow", "weather")
+    assert combined.equals(per_topic)
+    assert combined.column("Purchase_Spike_Percentage").to_pylist() == [85, 120]
+    assert combined.column("Note").to_pylist() == [None, "early"]
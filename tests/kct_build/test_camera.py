@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from kct_build.camera import (
+    PATCHES, captured_patches, correct_images, fit_corrections, load_correction, reference_patches, write_corrections,
+)
+from kct_build.discovery import discover_generators
+from kct_build.errors import BuildError
+from kct_build.graph import BuildGraph
+from kct_build.palette import PALETTE_PATH
+
+HEADER = "Phone_Model," + ",".join(PATCHES) + ",HDR_Color_Distortion"
+ROWS = [
+    "Google Pixel 8 Pro,92,94,89,95,93,94,8",
+    "Huawei P60 Pro,75,78,72,80,76,78,25",
+    "Perfect,100,100,100,100,100,100,0",
+]
+
+
+def test_fit_inverts_the_modelled_capture():
+    np = pytest.importorskip("numpy")
+    reference = reference_patches(PALETTE_PATH)
+    assert reference.shape == (len(PATCHES), 3)
+    scores = np.array([[100] * len(PATCHES), [75, 78, 72, 80, 76, 78]])
+    captured = captured_patches(scores, np.array([0, 25]), reference)
+    assert np.allclose(captured[0], reference)
+    matrices = fit_corrections(captured, reference)
+    assert np.allclose(matrices[0], np.eye(3), atol=1e-6)
+    before = np.abs(captured[1] - reference).sum()
+    after = np.abs(captured[1] @ matrices[1].T - reference).sum()
+    assert after < before / 2
+
+
+def test_correct_images_batched():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, (3, 16, 8, 3), dtype=np.uint8)
+    assert np.array_equal(correct_images(images, np.eye(3)), images)
+
+    swap = np.array([[0, 0, 1], [0, 1, 0], [1, 0, 0]])
+    assert np.array_equal(correct_images(images, swap), images[..., ::-1])
+    per_image = np.stack([np.eye(3), swap, np.eye(3)])
+    out = correct_images(images, per_image)
+    assert np.array_equal(out[1], images[1, ..., ::-1]) and np.array_equal(out[2], images[2])
+
+    floats = correct_images(images[0] / 255.0, np.eye(3))
+    assert floats.dtype == np.float32 and np.allclose(floats, images[0] / 255.0, atol=1e-5)
+    with pytest.raises(ValueError):
+        correct_images(images[..., :2], np.eye(3))
+
+
+def test_written_corrections(tmp_path):
+    np = pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Visual Recognition"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('phone_camera_color_distortion.csv')\n")
+    (topic / "phone_camera_color_distortion.csv").write_text("\n".join([HEADER, *ROWS]))
+    out = tmp_path / "camera"
+    index = write_corrections(BuildGraph(discover_generators(roots=[tmp_path / "src"])), out)
+
+    assert [p["id"] for p in index["phones"]] == ["google_pixel_8_pro", "huawei_p60_pro", "perfect"]
+    pixel, huawei, perfect = index["phones"]
+    assert huawei["delta_e_before"] > pixel["delta_e_before"]
+    assert huawei["delta_e_after"] < huawei["delta_e_before"]
+    assert perfect["delta_e_before"] == 0
+    assert np.asarray(load_correction("Huawei P60 Pro", out)).shape == (3, 3)
+    with pytest.raises(BuildError):
+        load_correction("Nokia 3310", out)
+    assert json.loads((out / "index.json").read_text()) == index
@@ -0,0 +1,42 @@
+from kct_build.canonical import resolve_canonical, superseded_generators
+from kct_build.discovery import discover_generators
+
+
+def _topic(tmp_path):
+    topic = tmp_path / "src" / "Color Science"
+    topic.mkdir(parents=True)
+    writes = "df.to_csv('video.csv')\ndf.to_csv('lighting.csv')\n"
+    (topic / "script.py").write_text(writes)
+    (topic / "script_1.py").write_text(writes)
+    (topic / "video.csv").write_text("Undertone,Score\nWarm,8\n")
+    (topic / "video_1.csv").write_text("Undertone,Score\nWarm,8\n")
+    (topic / "lighting.csv").write_text("Lighting,Red\nLED,9\n")
+    (topic / "lighting_1.csv").write_text("Lighting,Red,Overall_Accuracy\nLED,9,9.5\n")
+    (topic / "notes_1.csv").write_text("A\n1\n")
+    (topic / "notes.csv").write_text("B\n2\n")
+    return topic
+
+
+def test_superseded_generator_is_the_earlier_copy(tmp_path):
+    _topic(tmp_path)
+    generators = discover_generators(roots=[tmp_path / "src"])
+    assert superseded_generators(generators) == {"Color Science/script.py": "Color Science/script_1.py"}
+
+
+def test_duplicates_collapse_and_superset_variant_wins(tmp_path):
+    topic = _topic(tmp_path)
+    manifest = resolve_canonical(discover_generators(roots=[tmp_path / "src"]), roots=[tmp_path / "src"])
+    artifacts = manifest["artifacts"]
+
+    video = artifacts["color-science/video"]
+    assert video["path"].endswith("/video.csv")
+    assert video["producer"] == "Color Science/script_1.py"
+    assert [a.rsplit("/", 1)[-1] for a in video["aliases"]] == ["video_1.csv"]
+
+    lighting = artifacts["color-science/lighting"]
+    assert lighting["path"].endswith("/lighting_1.csv")
+    assert manifest["aliases"][(topic / "lighting.csv").as_posix()].endswith("/lighting_1.csv")
+
+    # Differing files without a column superset are both kept.
+    assert artifacts["color-science/notes"]["aliases"] == []
+    assert artifacts["color-science/notes_1"]["aliases"] == []
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from kct_build.career import build_model, stage_key, write_career_model
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+
+STAGES = [
+    {"Career_Stage": "Entry Level (0-1 years)", "Average_Wardrobe_Investment": 1000, "Accessory_Investment": 100},
+    {"Career_Stage": "Manager (2+ years)", "Average_Wardrobe_Investment": 3000, "Accessory_Investment": 500},
+    {"Career_Stage": "Executive (6+ years)", "Average_Wardrobe_Investment": 9000, "Accessory_Investment": 1000},
+]
+AGES = [{"Age_Range": "22-26"}, {"Age_Range": "27-31"}, {"Age_Range": "32+"}]
+UPGRADES = [{"Upgrade_Trigger": "New Role Confirmation", "Typical_Spend": 2000}]
+
+
+def test_powers_and_spend_lookup():
+    np = pytest.importorskip("numpy")
+    model = build_model(STAGES, AGES, UPGRADES, horizon=4)
+    matrix, powers = model["matrix"], model["powers"]
+    assert np.allclose(matrix.sum(axis=1), 1)
+    assert np.allclose(powers[3], np.linalg.matrix_power(matrix, 3), atol=1e-6)
+    assert model["stages"] == ["entry_level", "manager", "executive"]
+    assert stage_key("VP/Executive (15+ years)") == "vp_executive"
+
+    entry = model["lookup"]["22-26|entry_level"]
+    # Two-year stage: promoted half the time in year one, plus the new-role spend.
+    assert entry[0]["expected_spend"] == pytest.approx(1100 + 0.5 * 2000)
+    assert entry[0]["stages"] == {"entry_level": 0.5, "manager": 0.5}
+    assert entry[3]["cumulative_spend"] == pytest.approx(sum(row["expected_spend"] for row in entry))
+    assert all(abs(sum(row["stages"].values()) - 1) < 1e-3 for row in entry)
+
+    # Behind the typical stage for the age band: promoted more slowly.
+    late = model["lookup"]["32+|entry_level"][0]["stages"]["manager"]
+    assert late < 0.5
+    assert model["lookup"]["32+|executive"][2]["stages"] == {"executive": 1.0}
+
+
+def test_written_lookup(tmp_path):
+    pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Career"
+    topic.mkdir(parents=True)
+    tables = {
+        "career_stage_wardrobe.csv": STAGES,
+        "age_career_progression.csv": AGES,
+        "wardrobe_upgrade_timing.csv": UPGRADES,
+    }
+    (topic / "script.py").write_text("".join(f"df.to_csv('{name}')\n" for name in tables))
+    for name, rows in tables.items():
+        header = list(rows[0])
+        (topic / name).write_text("\n".join([",".join(header)] + [",".join(f'"{r[c]}"' for c in header) for r in rows]))
+    write_career_model(BuildGraph(discover_generators(roots=[tmp_path / "src"])), tmp_path / "career")
+
+    import numpy as np
+    model = build_model(STAGES, AGES, UPGRADES)
+    payload = json.loads((tmp_path / "career" / "spend.json").read_text())
+    assert len(payload["lookup"]["27-31|manager"]) == payload["horizon"] == 10
+    assert payload["lookup"] == json.loads(json.dumps(model["lookup"]))
+    assert payload["lookup"]["22-26|entry_level"][0]["expected_spend"] == pytest.approx(1100 + 0.5 * 2000)
+    powers = np.load(tmp_path / "career" / "transitions.npy", mmap_mode="r")
+    assert powers.shape == (11, 9, 9) and powers.dtype == np.float32
+    assert np.array_equal(powers, model["powers"])
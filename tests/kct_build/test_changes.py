@@ -0,0 +1,38 @@
+import json
+
+from kct_build.changes import write_changes
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+
+
+def test_feed_reports_changed_records_only(tmp_path):
+    topic = tmp_path / "src" / "Career"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text(
+        "df.to_csv('promotion_signals.csv')\njson.dump(d, open('venue_microdata_analysis.json', 'w'))\n"
+    )
+    signals = topic / "promotion_signals.csv"
+    signals.write_text("Signal_Category,Reliability_Score\nHaircut,70\nNew Shoes,55\n")
+    (topic / "venue_microdata_analysis.json").write_text("{}")
+    graph = BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+    out, state = tmp_path / "changes.json", tmp_path / "records.json"
+
+    assert write_changes(graph, out_path=out, state_path=state) is None  # first build: state only
+    assert write_changes(graph, out_path=out, state_path=state) is None
+    assert not out.exists()
+
+    signals.write_text("Signal_Category,Reliability_Score\nHaircut,75\nWatch,60\n")
+    feed = write_changes(graph, out_path=out, state_path=state)
+    assert feed == json.loads(out.read_text())
+    assert (feed["sequence"], feed["previous"]) == (1, 0)
+    [(key, entry)] = feed["datasets"].items()
+    assert key == "career/promotion_signals"
+    assert entry["key"] == "Signal_Category"
+    assert (entry["added"], entry["removed"]) == (["Watch"], ["New Shoes"])
+    assert entry["changed"] == {"Haircut": ["Reliability_Score"]}
+    assert entry["served"] == ["research/career/promotion_signals.csv"]
+
+    (topic / "venue_microdata_analysis.json").write_text('{"venues": []}')
+    feed = write_changes(graph, out_path=out, state_path=state)
+    assert feed["sequence"] == 2
+    assert feed["datasets"]["career/venue_microdata_analysis"]["rows"] is False
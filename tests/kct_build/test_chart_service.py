@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from kct_build import render
+from kct_build.chart_service import ChartCatalog, ChartNotFound, ChartRenderer, DiskLRU
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+
+
+def test_disk_lru_evicts_least_recently_used(tmp_path):
+    cache = DiskLRU(tmp_path, max_bytes=350)
+    for n, key in enumerate(("aa1", "bb2", "cc3")):
+        cache.put(key, "png", b"x" * 100)
+        os.utime(cache._path(key, "png"), (n, n))
+    assert cache.get("aa1", "png") == b"x" * 100  # touch: bb2 is now the oldest
+    cache.put("dd4", "png", b"y" * 100)
+    assert cache.get("bb2", "png") is None
+    assert cache.get("aa1", "png") and cache.get("dd4", "png")
+    assert cache.size == 300
+
+
+def test_disk_lru_root_survives_chdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = DiskLRU("cache")
+    monkeypatch.chdir(tmp_path.parent)  # a render thread entering a topic folder
+    cache.put("ab1", "png", b"x")
+    assert (tmp_path / "cache" / "ab" / "ab1.png").read_bytes() == b"x"
+
+
+def test_chart_spec_follows_its_data(tmp_path):
+    pytest.importorskip("plotly")
+    render.install_capture_hook()
+    topic = tmp_path / "src" / "Detroit Style"
+    topic.mkdir(parents=True)
+    (topic / "chart_script.py").write_text(
+        "import pandas as pd\nimport plotly.express as px\n"
+        "df = pd.read_csv('styles.csv')\n"
+        "px.bar(df, x='style', y='share').write_image('detroit_style_chart.png')\n"
+    )
+    (topic / "styles.csv").write_text("style,share\nBold,60\nClassic,40\n")
+    catalog = ChartCatalog(BuildGraph(discover_generators(roots=[tmp_path / "src"])))
+    renderer = ChartRenderer(catalog, DiskLRU(tmp_path / "cache"))
+    assert renderer.catalog.ids() == ["detroit-style/detroit_style_chart"]
+
+    first, key, hit = renderer.render("detroit-style/detroit_style_chart", "json", width=400)
+    assert not hit and json.loads(first)["data"][0]["y"] == [60, 40]
+    assert renderer.render("detroit-style/detroit_style_chart", "json", width=400)[1:] == (key, True)
+    assert renderer.render("detroit-style/detroit_style_chart", "json", width=800)[1] != key
+
+    (topic / "styles.csv").write_text("style,share\nBold,70\nClassic,30\n")
+    data, new_key, hit = renderer.render("detroit-style/detroit_style_chart", "json", width=400)
+    assert new_key != key and not hit and json.loads(data)["data"][0]["y"] == [70, 30]
+    with pytest.raises(ChartNotFound):
+        renderer.render("detroit-style/missing", "png")
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from kct_build.colorvision import (
+    confusable, deficiency_kind, severities, simulate, simulation_matrices, write_colorvision,
+)
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.palette import hex_to_rgb, rgb_to_lab
+
+ROWS = [
+    {"Colorblind_Type": "Normal Vision",
+     "Red_Green_Confusion": 0, "Blue_Yellow_Confusion": 0, "Population_Percentage": 92},
+    {"Colorblind_Type": "Protanopia (Red-blind)",
+     "Red_Green_Confusion": 9, "Blue_Yellow_Confusion": 2, "Population_Percentage": 1},
+    {"Colorblind_Type": "Protanomaly (Red-weak)",
+     "Red_Green_Confusion": 6, "Blue_Yellow_Confusion": 1, "Population_Percentage": 1},
+    {"Colorblind_Type": "Complete Achromatopsia",
+     "Red_Green_Confusion": 10, "Blue_Yellow_Confusion": 10, "Population_Percentage": 0.003},
+]
+PALETTE = {
+    "suits": {"burgundy": {"standard": {"hex": "#800020"}}, "navy": {"standard": {"hex": "#1F2937"}}},
+    "shirts": {"white": {"crisp_white": {"hex": "#FFFFFF"}}},
+    "ties": {"brown": {"standard": {"hex": "#3E2723"}}, "red": {"standard": {"hex": "#C41E3A"}}},
+}
+
+
+def test_kinds_and_severities():
+    assert [deficiency_kind(row["Colorblind_Type"]) for row in ROWS] == ["normal", "protan", "protan", "achromat"]
+    assert deficiency_kind("Deuteranomaly (Green-weak)") == "deutan"
+    assert severities(ROWS) == pytest.approx([0.0, 1.0, 6 / 9, 1.0])
+
+
+def test_simulation():
+    np = pytest.importorskip("numpy")
+    matrices = simulation_matrices(["normal", "protan", "achromat"], [0.0, 1.0, 1.0])
+    # Every simulation keeps white white.
+    assert np.allclose(matrices.sum(axis=2), 1, atol=1e-3)
+    rgb = hex_to_rgb(["#C41E3A", "#FFFFFF"])
+    seen = simulate(rgb, matrices)
+    assert np.allclose(seen[0], rgb)
+    assert np.allclose(seen[2, 0], seen[2, 0, 0])  # grey
+
+    lab = rgb_to_lab(hex_to_rgb(["#800020", "#3E2723", "#FFFFFF"]))
+    sim = rgb_to_lab(simulate(hex_to_rgb(["#800020", "#3E2723", "#FFFFFF"]), matrices))
+    mask = confusable(sim, lab, [[0], [2], [1]])
+    # A burgundy suit and a brown tie merge for a protanope only.
+    assert mask.shape == (3, 1, 1, 1)
+    assert mask[:, 0, 0, 0].tolist() == [False, True, False]
+
+
+def test_written_bitsets(tmp_path):
+    np = pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Color Science"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('colorblind_perception_analysis.csv')\n")
+    header = list(ROWS[0])
+    (topic / "colorblind_perception_analysis.csv").write_text(
+        "\n".join([",".join(header)] + [",".join(str(row[c]) for c in header) for row in ROWS])
+    )
+    palette_path = tmp_path / "palette.json"
+    palette_path.write_text(json.dumps(PALETTE))
+    out = tmp_path / "colorvision"
+    index = write_colorvision(BuildGraph(discover_generators(roots=[tmp_path / "src"])), out, palette_path)
+
+    assert index["shape"] == [2, 1, 2]
+    assert [t["id"] for t in index["types"]] == ["normal_vision", "protanopia", "protanomaly", "complete_achromatopsia"]
+    bits = np.load(out / index["array"])
+    assert bits.dtype == np.uint8 and bits.shape == (4, 1)
+    mask = np.unpackbits(bits, axis=1)[:, :4].reshape(4, 2, 1, 2)
+    assert not mask[0].any()
+    assert mask[1, 0, 0, 0]  # burgundy suit, white shirt, brown tie
+    assert [t["confusable"] for t in index["types"]] == mask.reshape(4, -1).sum(axis=1).tolist()
@@ -0,0 +1,77 @@
+import pytest
+
+from kct_build.demand import DemandCalendar, build_tensor, day_index, write_calendar
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.schemas import MONTHS
+
+MONTHLY = [
+    {"Month": m, "Weather_Sensitivity": 8, "Purchase_Urgency_Score": 5 if i < 6 else 9} for i, m in enumerate(MONTHS)
+]
+GRADUATION = [{"Month": "May", "Graduation_Volume_Percentage": 50}]
+WEATHER = [
+    {"Weather_Pattern": "Unexpected Cold Snap", "Purchase_Spike_Percentage": 80,
+     "Affected_Categories": "Outerwear, Wool Suits", "Lead_Time_Days": 3, "Inventory_Impact_Score": 9,
+     "Regional_Variation": 8},
+    {"Weather_Pattern": "Early Heat Wave", "Purchase_Spike_Percentage": 100, "Affected_Categories": "Linen",
+     "Lead_Time_Days": 14, "Inventory_Impact_Score": 6, "Regional_Variation": 5},
+]
+
+
+def test_tensor_interpolates_months_and_overlays_shocks():
+    np = pytest.importorskip("numpy")
+    tensor, axes = build_tensor(MONTHLY, GRADUATION, WEATHER)
+    assert tensor.shape == (2, 365, 3, 4, 3) and tensor.dtype == np.float32
+    assert axes["category"] == ["outerwear", "wool_suits", "linen"]
+    assert axes["scenario"] == ["baseline", "unexpected_cold_snap", "early_heat_wave"]
+
+    demand, urgency = tensor[:, :, :, :, 0]
+    assert np.all(np.abs(np.diff(urgency, axis=0)) < 0.2)  # no steps at month boundaries
+    linen, outerwear, temperate = 2, 0, axes["region"].index("temperate")
+    summer, winter = day_index(week=28), day_index(week=2)
+    assert urgency[summer, linen, temperate] > urgency[summer, outerwear, temperate]
+    assert urgency[winter, linen, temperate] < urgency[winter, outerwear, temperate]
+    assert demand[day_index(month=5), linen].mean() > demand[day_index(month=4), linen].mean()  # graduation
+
+    cold = tensor[:, :, :, :, 1]
+    assert np.array_equal(cold[:, :, linen], tensor[:, :, linen, :, 0])  # unaffected category
+    assert np.all(cold[0, :, outerwear] > demand[:, outerwear])
+    assert np.all(cold[1] <= 10)
+    tropical = axes["region"].index("tropical")
+    assert (cold[0, :, outerwear, tropical] / demand[:, outerwear, tropical]).max() < \
+        (cold[0, :, outerwear, temperate] / demand[:, outerwear, temperate]).min()
+
+
+def test_calendar_round_trips_through_mmap(tmp_path):
+    pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Seasonal"
+    topic.mkdir(parents=True)
+    names = ("monthly_seasonal_patterns.csv", "graduation_season_timing.csv", "unseasonable_weather_impact.csv")
+    (topic / "script.py").write_text("".join(f"df.to_csv('{name}')\n" for name in names))
+    for name, rows in zip(names, (MONTHLY, GRADUATION, WEATHER)):
+        header = list(rows[0])
+        lines = [",".join(header)] + [",".join(f'"{row[col]}"' for col in header) for row in rows]
+        (topic / name).write_text("\n".join(lines) + "\n")
+    graph = BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+    index = write_calendar(graph, tmp_path / "calendar")
+    assert index["layout"] == ["quantity", "day", "category", "region", "scenario"]
+
+    calendar = DemandCalendar.load(tmp_path / "calendar")
+    assert calendar.array.filename  # memory-mapped
+    tensor, _ = build_tensor(MONTHLY, GRADUATION, WEATHER)
+    assert calendar.value("Linen", "temperate", week=22) == pytest.approx(float(tensor[1, 150, 2, 1, 0]))
+    cold_demand = calendar.value(
+        "wool suits", "continental", day_of_year=10, scenario="unexpected_cold_snap", quantity="demand",
+    )
+    assert cold_demand == pytest.approx(float(tensor[0, 9, 1, 2, 1]))
+    assert calendar.value("Linen", "temperate", week=53) == pytest.approx(float(tensor[1, 364, 2, 1, 0]))
+    with pytest.raises(KeyError):
+        calendar.value("sneakers", "temperate", week=1)
+
+
+def test_day_index_clamps_week_53_to_the_last_day():
+    assert day_index(week=52) == 360
+    assert day_index(week=53) == 364
+    assert day_index(day_of_year=366) == 364  # 31 December of a leap year
+    with pytest.raises(ValueError):
+        day_index(week=54)
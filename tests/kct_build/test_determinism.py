@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from kct_build.determinism import VOLATILE_PNG_CHUNKS, _png_chunks, seed_for, strip_json
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.runner import run_graph
+
+
+def _build(root, out, seed):
+    graph = BuildGraph(discover_generators(roots=[root]))
+    results = run_graph(graph, jobs=1, output_root=out, seed=seed)
+    assert all(r.ok for r in results.values()), [r.error for r in results.values()]
+    return graph
+
+
+def test_seeded_builds_are_byte_identical(tmp_path):
+    pytest.importorskip("matplotlib")
+    topic = tmp_path / "src" / "Topic"
+    topic.mkdir(parents=True)
+    (topic / "chart_script.py").write_text(
+        "import json, random\n"
+        "import matplotlib.pyplot as plt\n"
+        "import numpy as np\n"
+        "xs = [random.uniform(0, 1) for _ in range(5)]\n"
+        "plt.plot(xs, np.random.rand(5))\n"
+        "plt.savefig('chart.png', dpi=20)\n"
+        "json.dump({'points': xs, 'generated_at': str(id(xs))}, open('chart.json', 'w'))\n"
+    )
+    first = tmp_path / "a" / "Topic"
+    second = tmp_path / "b" / "Topic"
+    _build(tmp_path / "src", tmp_path / "a", seed=7)
+    _build(tmp_path / "src", tmp_path / "b", seed=7)
+
+    for name in ("chart.png", "chart.json"):
+        assert (first / name).read_bytes() == (second / name).read_bytes()
+    kinds = [kind for kind, _ in _png_chunks((first / "chart.png").read_bytes())]
+    assert b"IDAT" in kinds and not VOLATILE_PNG_CHUNKS & set(kinds)
+    assert "generated_at" not in json.loads((first / "chart.json").read_text())
+
+    _build(tmp_path / "src", tmp_path / "c", seed=8)
+    assert (tmp_path / "c" / "Topic" / "chart.json").read_bytes() != (first / "chart.json").read_bytes()
+
+
+def test_seed_per_generator_and_json_left_alone(tmp_path):
+    assert seed_for("A/script.py", 0) == seed_for("A/script.py", 0)
+    assert seed_for("A/script.py", 0) != seed_for("B/script.py", 0)
+    path = tmp_path / "data.json"
+    path.write_text('{"a":1}')
+    assert not strip_json(path)
+    assert path.read_text() == '{"a":1}'
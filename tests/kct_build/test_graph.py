@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from kct_build.discovery import discover_generators, scan_io
+from kct_build.errors import GraphError
+from kct_build.graph import BuildGraph
+from kct_build.runner import run_graph
+
+
+def _topic(root: Path, name: str, scripts: dict) -> Path:
+    topic = root / name
+    topic.mkdir(parents=True)
+    for filename, source in scripts.items():
+        (topic / filename).write_text(source)
+    return topic
+
+
+def test_scan_io_finds_literal_reads_and_writes():
+    source = (
+        "import pandas as pd\n"
+        "df = pd.read_csv('in.csv')\n"
+        "df.to_csv('out.csv', index=False)\n"
+        "with open('data.json', 'w') as f: pass\n"
+        "with open('notes.txt') as f: pass\n"
+        "fig.write_image(\"chart.png\")\n"
+        "df.to_csv(name)\n"
+    )
+    inputs, outputs = scan_io(source)
+    assert inputs == ["in.csv", "notes.txt"]
+    assert outputs == ["out.csv", "data.json", "chart.png"]
+
+
+def test_graph_orders_data_before_charts_and_duplicate_writers(tmp_path):
+    _topic(tmp_path, "Topic A", {
+        "script.py": "df.to_csv('a.csv')\n",
+        "script_1.py": "df.to_csv('a.csv')\n",
+        "chart_script.py": "fig.write_image('a.png')\n",
+    })
+    _topic(tmp_path, "Topic B", {
+        "script.py": "pd.read_csv('../Topic A/a.csv')\n",
+    })
+    graph = BuildGraph(discover_generators(roots=[tmp_path]))
+
+    deps = graph.dependencies
+    assert deps["Topic A/script_1.py"] == {"Topic A/script.py"}
+    assert deps["Topic A/chart_script.py"] == {"Topic A/script.py", "Topic A/script_1.py"}
+    assert not graph.is_hard_dependency("Topic A/chart_script.py", "Topic A/script.py")
+    assert graph.levels()[0] == ["Topic A/script.py"]
+    assert graph.descendants(["Topic A/script_1.py"]) == {
+        "Topic A/script_1.py", "Topic A/chart_script.py", "Topic B/script.py",
+    }
+
+
+def test_graph_rejects_cycles(tmp_path):
+    _topic(tmp_path, "Loop", {
+        "script.py": "pd.read_csv('b.csv'); df.to_csv('a.csv')\n",
+        "script_1.py": "pd.read_csv('a.csv'); df.to_csv('b.csv')\n",
+    })
+    with pytest.raises(GraphError):
+        BuildGraph(discover_generators(roots=[tmp_path]))
+
+
+def test_run_graph_skips_readers_of_failed_producer(tmp_path):
+    _topic(tmp_path, "Broken", {
+        "script.py": "open('a.csv', 'w').write('x'); raise RuntimeError('boom')\n",
+        "chart_script.py": "open('chart.png', 'w').write('x')\n",
+    })
+    _topic(tmp_path, "Reader", {
+        "script.py": "open('../Broken/a.csv').read()\n",
+    })
+    graph = BuildGraph(discover_generators(roots=[tmp_path]))
+    results = run_graph(graph, jobs=1)
+
+    assert results["Broken/script.py"].status == "failed"
+    assert results["Reader/script.py"].status == "skipped"
+    # Chart edges only order execution; the chart still renders.
+    assert results["Broken/chart_script.py"].ok
+    assert (tmp_path / "Broken" / "chart.png").exists()
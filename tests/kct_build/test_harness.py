@@ -0,0 +1,43 @@
+import pytest
+
+from kct_build.runner import OK, execute_script
+
+
+def _topic(tmp_path):
+    topic = tmp_path / "Topic"
+    topic.mkdir()
+    (topic / "data.csv").write_text("a\n1\n")
+    (topic / "script.py").write_text(
+        "rows = open('data.csv').read().splitlines()\n"
+        "print('rows:', len(rows))\n"
+        "with open('out.txt', 'w') as fh:\n"
+        "    fh.write(str(len(rows)))\n"
+    )
+    return topic
+
+
+def test_report_is_captured_and_outputs_land_in_topic(tmp_path, capsys):
+    topic = _topic(tmp_path)
+    result = execute_script("Topic/script.py", str(topic / "script.py"))
+    assert result.status == OK
+    assert result.output == "rows: 2\n"
+    assert capsys.readouterr().out == ""
+    assert (topic / "out.txt").read_text() == "2"
+
+
+def test_output_dir_stages_inputs_and_keeps_only_outputs(tmp_path):
+    topic = _topic(tmp_path)
+    out = tmp_path / "out" / "Topic"
+    result = execute_script("Topic/script.py", str(topic / "script.py"), str(out), ("data.csv",))
+    assert result.ok, result.error
+    assert sorted(p.name for p in out.iterdir()) == ["out.txt"]
+    assert not (topic / "out.txt").exists()
+
+
+def test_matplotlib_style_does_not_leak_between_scripts(tmp_path):
+    mpl = pytest.importorskip("matplotlib")
+    before = mpl.rcParams["axes.facecolor"]
+    script = tmp_path / "script.py"
+    script.write_text("import matplotlib.pyplot as plt\nplt.style.use('ggplot')\n")
+    assert execute_script("t/script.py", str(script)).ok
+    assert mpl.rcParams["axes.facecolor"] == before
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.images import hamming, optimize_png, perceptual_hash, write_image_report
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+
+def _chart(path, size=(400, 300), bar=(60, 120, 200)):
+    pixels = np.full((size[1], size[0], 4), 255, dtype=np.uint8)
+    pixels[size[1] // 3:, size[0] // 4:size[0] // 2, :3] = bar
+    pixels[size[1] // 2:, size[0] * 5 // 8:size[0] * 7 // 8, :3] = (220, 60, 60)
+    Image.fromarray(pixels, "RGBA").save(path, compress_level=1)
+    return pixels
+
+
+def test_optimize_is_lossless_and_smaller(tmp_path):
+    path = tmp_path / "chart.png"
+    pixels = _chart(path)
+    result = optimize_png(path)
+    assert result.after < result.before and result.mode == "P"
+    with Image.open(path) as image:
+        assert np.array_equal(np.asarray(image.convert("RGBA")), pixels)
+
+
+def test_rerendered_chart_is_a_near_duplicate(tmp_path):
+    _chart(tmp_path / "a.png")
+    _chart(tmp_path / "b.png", size=(800, 600))
+    pixels = np.full((300, 400, 4), 255, dtype=np.uint8)
+    pixels[:100, :, :3] = (30, 30, 30)
+    Image.fromarray(pixels, "RGBA").save(tmp_path / "c.png")
+    a, b, c = (perceptual_hash(tmp_path / name) for name in ("a.png", "b.png", "c.png"))
+    assert hamming(a, b) <= 4
+    assert hamming(a, c) > 60
+
+
+def test_report_pairs_near_duplicate_charts(tmp_path):
+    topic = tmp_path / "src" / "Style"
+    topic.mkdir(parents=True)
+    (topic / "chart_script.py").write_text("".join(f"fig.write_image('{n}.png')\n" for n in "abc"))
+    _chart(topic / "a.png")
+    _chart(topic / "b.png", size=(800, 600))
+    Image.fromarray(np.zeros((300, 400, 4), dtype=np.uint8), "RGBA").save(topic / "c.png")
+    out = tmp_path / "images.json"
+
+    report = write_image_report(BuildGraph(discover_generators(roots=[tmp_path / "src"])), out)
+    assert report == json.loads(out.read_text())
+    assert len(report["images"]) == 3
+    [pair] = report["near_duplicates"]
+    assert (pair["a"].rsplit("/", 1)[-1], pair["b"].rsplit("/", 1)[-1]) == ("a.png", "b.png")
+    a = report["images"][pair["a"]]
+    assert int(a["phash"], 16) == perceptual_hash(topic / "a.png")
+    assert a["producer"] == "Style/chart_script.py"
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.lighting import (
+    adaptation_degree, adaptation_matrices, light_key, perceive, white_point, write_lighting,
+)
+from kct_build.palette import D65, hex_to_rgb
+
+PALETTE = {
+    "suits": {"navy": {"standard": {"hex": "#1F2937"}}},
+    "shirts": {"white": {"crisp_white": {"hex": "#FFFFFF"}}},
+    "ties": {},
+}
+
+
+def test_white_points_and_adaptation():
+    np = pytest.importorskip("numpy")
+    assert white_point(6504) == pytest.approx(D65, abs=2e-3)
+    # Planckian below 5000K: incandescent is strongly red-shifted.
+    warm = white_point(2700)
+    assert warm[0] > 1.05 and warm[2] < 0.4
+    assert adaptation_degree(0.0) == pytest.approx(0.9122, abs=1e-4)
+    assert adaptation_degree(2.0) < adaptation_degree(0.5)
+
+    for method in ("cat16", "bradford"):
+        # Fully adapted: colour constancy; not adapted: the light's own white.
+        assert np.allclose(adaptation_matrices(warm[None], [1.0], method)[0], np.eye(3))
+        assert adaptation_matrices(warm[None], [0.0], method)[0] @ np.array(D65) == pytest.approx(warm)
+
+
+def test_perceived_cube():
+    np = pytest.importorskip("numpy")
+    rgb = hex_to_rgb(["#1F2937", "#FFFFFF", "#800020"])
+    lab, delta_e = perceive(rgb, [6504, 2700, 4000], [0.0, 1.4, 2.1])
+    assert lab.shape == (3, 3, 3) and delta_e.shape == (3, 3)
+    assert delta_e[:, 0].max() < 0.05
+    # Under incandescent light whites turn yellow (b* > 0) and colours move.
+    assert lab[1, 1, 2] > 5
+    assert (delta_e[:, 1] > 1).all()
+
+
+def test_written_lookup(tmp_path):
+    np = pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Color Science"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('lighting_color_perception_1.csv')\n")
+    (topic / "lighting_color_perception_1.csv").write_text(
+        "Lighting_Type,Color_Temperature_K,Fabric_Color_Shift\n"
+        "Natural Daylight (5500K),5500,0.1\n"
+        "Incandescent (2700K),2700,1.4\n"
+    )
+    palette_path = tmp_path / "palette.json"
+    palette_path.write_text(json.dumps(PALETTE))
+    out = tmp_path / "lighting"
+    index = write_lighting(BuildGraph(discover_generators(roots=[tmp_path / "src"])), out, palette_path)
+
+    assert [light["id"] for light in index["lights"]] == ["natural_daylight", "incandescent"]
+    assert light_key("LED Cool (6000K)") == "led_cool"
+    assert index["colors"] == ["suits/navy/standard", "shirts/white/crisp_white"]
+    cube = np.load(out / index["array"])
+    assert cube.shape == (2, 2, 4) and cube.dtype == np.float32
+    lab, delta_e = perceive(hex_to_rgb(["#1F2937", "#FFFFFF"]), [5500, 2700], [0.1, 1.4])
+    assert np.allclose(cube[..., :3], lab, atol=1e-3) and np.allclose(cube[..., 3], delta_e, atol=1e-3)
+    assert cube[1, 1, 2] > 5  # white shirt reads yellow under incandescent
+    assert len(index["hex"]) == 2 and index["hex"][0][0].startswith("#")
+    assert json.loads((out / "index.json").read_text()) == index
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.luts import LOOKS, apply_lut, build_luts, filter_colors, identity_lut, load_lut, write_cube, write_luts
+
+HEADER = (
+    "Filter_Name,Color_Accuracy_Impact,Navy_Suit_Distortion,Gray_Suit_Distortion,Brown_Suit_Distortion,"
+    "White_Shirt_Impact"
+)
+ROWS = [
+    {"Filter_Name": "No Filter", "Navy_Suit_Distortion": 0, "Gray_Suit_Distortion": 0,
+     "Brown_Suit_Distortion": 0, "White_Shirt_Impact": 0},
+    {"Filter_Name": "Valencia", "Navy_Suit_Distortion": 25, "Gray_Suit_Distortion": 20,
+     "Brown_Suit_Distortion": 15, "White_Shirt_Impact": 30},
+    {"Filter_Name": "Inkwell", "Navy_Suit_Distortion": 70, "Gray_Suit_Distortion": 65,
+     "Brown_Suit_Distortion": 60, "White_Shirt_Impact": 75},
+]
+
+
+def test_trilinear_lookup():
+    np = pytest.importorskip("numpy")
+    grid = identity_lut(5)
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, (2, 6, 4, 3), dtype=np.uint8)
+    assert np.array_equal(apply_lut(images, grid), images)
+    floats = rng.random((10, 3))
+    assert np.allclose(apply_lut(floats, grid), floats, atol=1e-6)
+    # Any affine map is reproduced exactly between grid points.
+    matrix = np.array([[0.5, 0.2, 0.0], [0.0, 0.5, 0.1], [0.1, 0.0, 0.6]])
+    assert np.allclose(apply_lut(floats, grid @ matrix.T + 0.1), floats @ matrix.T + 0.1, atol=1e-5)
+    # Chunking does not change the result.
+    warm = grid ** 0.8
+    assert np.array_equal(apply_lut(images, warm, chunk=7), apply_lut(images, warm))
+    with pytest.raises(ValueError):
+        apply_lut(images[..., :2], grid)
+
+
+def test_forward_and_inverse_luts():
+    np = pytest.importorskip("numpy")
+    built = build_luts(ROWS, size=9)
+    assert built["ids"] == ["no_filter", "valencia", "inkwell"]
+    luts = built["luts"].astype(np.float32)
+    assert luts.shape == (3, 2, 9, 9, 9, 3) and built["luts"].dtype == np.float16
+    assert np.allclose(luts[0], identity_lut(9), atol=1e-3)
+
+    # Valencia warms a grey and lifts black; its inverse undoes that.
+    grey = np.array([0.5, 0.5, 0.5])
+    warmed = filter_colors(grey, LOOKS["valencia"], [0.25, 0.2, 0.3], 0.15)
+    assert warmed[0] > warmed[2]
+    assert filter_colors(np.zeros(3), LOOKS["valencia"], [0.25, 0.2, 0.3], 0.15).min() > 0
+    assert built["roundtrip_error"][1] < 2.0
+    # Inkwell is close to black and white and cannot be undone.
+    assert built["roundtrip_error"][2] > 10
+    red = apply_lut(np.array([1.0, 0.0, 0.0]), luts[2, 0])
+    assert red.max() - red.min() < 0.2
+
+
+def test_written_luts_and_cube(tmp_path):
+    np = pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Visual Recognition"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('instagram_filter_color_impact.csv')\n")
+    (topic / "instagram_filter_color_impact.csv").write_text(
+        "\n".join([HEADER] + [f"{r['Filter_Name']},0,{r['Navy_Suit_Distortion']},{r['Gray_Suit_Distortion']},"
+                              f"{r['Brown_Suit_Distortion']},{r['White_Shirt_Impact']}" for r in ROWS[:2]])
+    )
+    out = tmp_path / "filters"
+    index = write_luts(BuildGraph(discover_generators(roots=[tmp_path / "src"])), out)
+    assert [f["id"] for f in index["filters"]] == ["no_filter", "valencia"]
+    assert json.loads((out / "index.json").read_text()) == index
+
+    inverse = np.asarray(load_lut("Valencia", directory=out))
+    assert inverse.shape == (33, 33, 33, 3)
+    forward = np.asarray(load_lut("valencia", inverse=False, directory=out))
+    grey = np.array([0.5, 0.5, 0.5])
+    warmed = apply_lut(grey, forward)
+    assert warmed[0] > warmed[2]  # the stored forward LUT is Valencia's warm cast
+    assert apply_lut(warmed, inverse) == pytest.approx(grey, abs=0.02)
+    cube = tmp_path / "valencia.cube"
+    write_cube(cube, inverse, "Valencia inverse")
+    lines = cube.read_text().splitlines()
+    assert lines[:2] == ['TITLE "Valencia inverse"', "LUT_3D_SIZE 33"]
+    assert len(lines) == 2 + 33**3
+    # Red varies fastest.
+    assert [float(v) for v in lines[3].split()] == pytest.approx(inverse[1, 0, 0], abs=1e-3)
@@ -0,0 +1,63 @@
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.manifest import Manifest, stale_nodes
+from kct_build.runner import run_graph
+
+
+def _build(tmp_path):
+    topic = tmp_path / "Topic"
+    topic.mkdir()
+    (topic / "script.py").write_text("open('a.csv', 'w').write('1')\n")
+    (topic / "chart_script.py").write_text("open('a.png', 'w').write('p')\n")
+    other = tmp_path / "Other"
+    other.mkdir()
+    (other / "script.py").write_text("open('b.csv', 'w').write('2')\n")
+    return topic, BuildGraph(discover_generators(roots=[tmp_path]))
+
+
+def _record_all(graph, manifest):
+    for node_id, result in run_graph(graph, jobs=1).items():
+        assert result.ok
+        manifest.record(graph.nodes[node_id])
+
+
+def test_fresh_manifest_marks_everything_stale(tmp_path):
+    _, graph = _build(tmp_path)
+    manifest = Manifest(tmp_path / "state" / "manifest.json")
+    assert stale_nodes(graph, manifest) == set(graph.nodes)
+
+
+def test_only_changed_topic_is_rebuilt(tmp_path):
+    topic, graph = _build(tmp_path)
+    manifest = Manifest(tmp_path / "state" / "manifest.json")
+    _record_all(graph, manifest)
+    manifest.save()
+
+    reloaded = Manifest(manifest.path)
+    assert stale_nodes(graph, reloaded) == set()
+
+    (topic / "script.py").write_text("open('a.csv', 'w').write('changed')\n")
+    assert stale_nodes(graph, reloaded) == {"Topic/script.py", "Topic/chart_script.py"}
+
+
+def test_missing_or_edited_output_is_stale(tmp_path):
+    topic, graph = _build(tmp_path)
+    manifest = Manifest(tmp_path / "manifest.json")
+    _record_all(graph, manifest)
+
+    (topic / "a.png").unlink()
+    assert stale_nodes(graph, manifest) == {"Topic/chart_script.py"}
+
+    (tmp_path / "Other" / "b.csv").write_text("hand edit")
+    assert "Other/script.py" in stale_nodes(graph, manifest)
+
+
+def test_chart_png_is_optional_without_png_format(tmp_path):
+    topic, graph = _build(tmp_path)
+    manifest = Manifest(tmp_path / "manifest.json", optional_outputs=(".png",))
+    _record_all(graph, manifest)
+
+    (topic / "a.png").unlink()  # e.g. a --chart-formats json build
+    manifest.record(graph.nodes["Topic/chart_script.py"])
+    assert stale_nodes(graph, manifest) == set()
+    assert stale_nodes(graph, Manifest(tmp_path / "other.json")) == set(graph.nodes)
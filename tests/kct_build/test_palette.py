@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from kct_build.palette import (
+    PaletteScores, contrast_ratio, delta_e_2000, hex_to_rgb, lab_to_rgb, load_palette, palette_stale, rgb_to_lab,
+    write_palette,
+)
+
+# Sharma, Wu & Dalal (2005) test pairs.
+SHARMA = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((50.0, 2.5, 0.0), (50.0, 3.1736, 0.5854), 1.0),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((2.0776, 0.0795, -1.135), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+PALETTE = {
+    "suits": {"navy": {"standard": {"hex": "#1F2937", "marketing_name": "Navy"},
+                       "royal_navy": {"hex": "#1E3A8A"}}},
+    "shirts": {"white": {"crisp_white": {"hex": "#FFFFFF"}}},
+    "ties": {"burgundy": {"standard": {"hex": "#800020"}}},
+    "color_matching_rules": {"complementary_colors": {}},
+}
+
+
+def test_delta_e_2000_matches_reference_pairs():
+    np = pytest.importorskip("numpy")
+    lab1 = np.array([pair[0] for pair in SHARMA])
+    lab2 = np.array([pair[1] for pair in SHARMA])
+    assert delta_e_2000(lab1, lab2) == pytest.approx([pair[2] for pair in SHARMA], abs=1e-4)
+    assert delta_e_2000(lab2, lab1) == pytest.approx([pair[2] for pair in SHARMA], abs=1e-4)
+
+
+def test_conversions_round_trip():
+    np = pytest.importorskip("numpy")
+    rgb = hex_to_rgb(["#FFFFFF", "#000000", "#1F2937", "#800020"])
+    lab = rgb_to_lab(rgb)
+    assert lab[0] == pytest.approx([100, 0, 0], abs=0.01)
+    assert np.allclose(lab_to_rgb(lab), rgb, atol=1e-6)
+    assert contrast_ratio(rgb[0], rgb[1]) == pytest.approx(21)
+
+
+def test_written_matrices(tmp_path):
+    np = pytest.importorskip("numpy")
+    source = tmp_path / "color-hex-mapping.json"
+    source.write_text(json.dumps(PALETTE))
+    out = tmp_path / "palette"
+    assert palette_stale(source, out)
+    index = write_palette(source, out)
+    assert not palette_stale(source, out)
+    assert [c["id"] for c in index["colors"]] == [
+        "suits/navy/standard", "suits/navy/royal_navy", "shirts/white/crisp_white", "ties/burgundy/standard",
+    ]
+    assert [c.id for c in load_palette(source)] == [c["id"] for c in index["colors"]]
+
+    scores = PaletteScores.load(out)
+    assert scores.array.dtype == np.float16 and scores.array.shape == (3, 4, 4)
+    assert np.allclose(scores.array[0].astype(float), scores.array[0].T.astype(float))
+    assert scores.array[0].diagonal().max() == 0
+    pair = scores.scores("suits/navy/standard", "shirts/white/crisp_white")
+    assert pair["contrast"] == pytest.approx(14.7, abs=0.1)
+    assert 0 <= pair["harmony"] <= 1
+    assert scores.position("navy", "suits") == 0
+    assert scores.position("white", "shirts") == 2
+    with pytest.raises(KeyError):
+        scores.position("teal", "ties")
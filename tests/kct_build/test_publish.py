@@ -0,0 +1,84 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.publish import CURRENT, STORE_NAME, current_version, publish
+
+TARGETS = {"research/career": ("promotion_signals.csv",), "intelligence": ("venue.json",)}
+
+
+def _setup(tmp_path):
+    topic = tmp_path / "src" / "Career"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('promotion_signals.csv')\njson.dump(d, open('venue.json', 'w'))\n")
+    (topic / "promotion_signals.csv").write_text("Signal_Category,Reliability_Score\nHaircut,70\n")
+    (topic / "venue.json").write_text('{"venues": 1}')
+    data = tmp_path / "data"
+    (data / "intelligence").mkdir(parents=True)
+    (data / "intelligence" / "venue.json").write_text('{"stale": true}')
+    (data / "intelligence" / "curated.json").write_text("{}")
+    (data / "index.json").write_text(json.dumps({
+        "version": "1.0.0", "created": "2025-07-08", "files": {"intelligence": ["curated.json"]},
+    }))
+    return topic, data, BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+
+
+def test_publish_flips_current_and_indexes(tmp_path):
+    topic, data, graph = _setup(tmp_path)
+
+    first = publish(graph, data_dir=data, targets=TARGETS)
+    served = data / "intelligence" / "venue.json"
+    assert served.is_file() and not served.is_symlink()
+    assert served.read_text() == '{"venues": 1}'
+    assert (data / "research" / "career" / "promotion_signals.csv").read_text().startswith("Signal_Category")
+
+    index = json.loads((data / "index.json").read_text())
+    assert index["created"] == "2025-07-08"
+    assert index["files"] == {"intelligence": ["curated.json"]}  # curated lists are kept
+    assert sorted(index["checksums"]) == [
+        "intelligence/curated.json", "intelligence/venue.json", "research/career/promotion_signals.csv",
+    ]
+    assert index["checksums"]["intelligence/venue.json"]["size"] == 13
+    assert index["published"] == {
+        "version": first,
+        "files": ["intelligence/venue.json", "research/career/promotion_signals.csv"],
+    }
+
+    assert publish(graph, data_dir=data, targets=TARGETS) == first  # unchanged -> no new version
+
+    (topic / "venue.json").write_text('{"venues": 2}')
+    second = publish(graph, data_dir=data, targets=TARGETS)
+    assert second != first and current_version(data) == second
+    assert served.read_text() == '{"venues": 2}'
+    assert (data / STORE_NAME / first).is_dir()  # previous version kept for rollback
+    assert (data / STORE_NAME / CURRENT).is_symlink()
+
+
+@pytest.mark.skipif(shutil.which("cp") is None, reason="needs cp")
+def test_copy_over_published_tree_is_repaired(tmp_path):
+    topic, data, graph = _setup(tmp_path)
+    version = publish(graph, data_dir=data, targets=TARGETS)
+    published = data / STORE_NAME / version / "intelligence" / "venue.json"
+
+    # `npm run build` copies src/data over the published tree
+    src = tmp_path / "repo" / "data"
+    (src / "intelligence").mkdir(parents=True)
+    (src / "intelligence" / "venue.json").write_text('{"tracked": true}')
+    (src / "index.json").write_text('{"files": {}}')
+    subprocess.run(["cp", "-r", str(src), str(tmp_path)], check=True)
+
+    served = data / "intelligence" / "venue.json"
+    assert served.read_text() == '{"tracked": true}'
+    assert published.read_text() == '{"venues": 1}'  # the store is not written through
+
+    assert publish(graph, data_dir=data, targets=TARGETS) == version
+    assert served.read_text() == '{"venues": 1}'
+    assert json.loads((data / "index.json").read_text())["published"]["version"] == version
+
+    published.write_text('{"edited": true}')  # a store modified in place is rewritten
+    assert publish(graph, data_dir=data, targets=TARGETS) == version
+    assert published.read_text() == '{"venues": 1}'
@@ -0,0 +1,61 @@
+import pytest
+
+from kct_build import render
+from kct_build.runner import execute_script
+
+plotly = pytest.importorskip("plotly")
+from plotly.basedatatypes import BaseFigure  # noqa: E402
+
+
+@pytest.fixture
+def capture_hook(monkeypatch):
+    monkeypatch.setattr(BaseFigure, "write_image", BaseFigure.write_image)
+    assert render.install_capture_hook()
+
+
+def test_write_image_is_captured_instead_of_rendered(tmp_path, capture_hook):
+    script = tmp_path / "chart_script.py"
+    script.write_text(
+        "import plotly.graph_objects as go\n"
+        "fig = go.Figure(go.Bar(x=['a'], y=[1]))\n"
+        "fig.write_image('chart.png', width=800, scale=2)\n"
+    )
+    result = execute_script("Topic/chart_script.py", str(script))
+
+    assert result.ok
+    assert not (tmp_path / "chart.png").exists()
+    [job] = result.figures
+    assert job.node_id == "Topic/chart_script.py"
+    assert job.path == str(tmp_path / "chart.png")
+    assert job.options == {"width": 800, "scale": 2}
+    assert '"type":"bar"' in job.spec
+
+
+def test_failed_script_discards_captured_figures(tmp_path, capture_hook):
+    script = tmp_path / "chart_script.py"
+    script.write_text(
+        "import plotly.graph_objects as go\n"
+        "go.Figure().write_image('a.png')\n"
+        "raise ValueError('bad data')\n"
+    )
+    result = execute_script("Topic/chart_script.py", str(script))
+
+    assert result.status == "failed"
+    assert result.figures == []
+    assert render.end_capture() == []
+
+
+def test_json_outputs_skip_kaleido_and_are_indexed(tmp_path):
+    outputs = render.ChartOutputs(formats=("json",), directory=tmp_path / "charts")
+    assert not outputs.needs_kaleido
+    job = render.FigureJob("Seasonal Trends/chart_script.py", str(tmp_path / "trend.png"), '{"data": []}', {})
+
+    result = render.render_figure(job, outputs)
+    spec = tmp_path / "charts" / "seasonal-trends" / "trend.plotly.json"
+    assert result.ok and result.outputs == {str(spec): 12}
+    assert not (tmp_path / "trend.png").exists()
+
+    index = render.write_chart_index([result], outputs)
+    assert index["charts"]["seasonal-trends/trend"]["json"]["bytes"] == 12
+    with pytest.raises(ValueError):
+        render.ChartOutputs(formats=("gif",))
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from kct_build.errors import BuildError
+from kct_build.snapshot import Snapshot, _typed, iter_sources, read_version, write_snapshot
+
+
+@pytest.fixture
+def tree(tmp_path):
+    data = tmp_path / "data" / "intelligence"
+    data.mkdir(parents=True)
+    (data / "cultural_regional_nuances.json").write_text(json.dumps({
+        "detroit_regional_styles": {
+            "Downtown_Detroit": {"brands": ["Shinola"], "dress_code": "Varies"},
+            "Suburban_Detroit": {"brands": ["Brooks Brothers"]},
+        },
+        "key_insights": ["a", "b"],
+    }))
+    topic = tmp_path / "research" / "Visual Recognition Gaps"
+    topic.mkdir(parents=True)
+    (topic / "phone_camera_color_distortion.csv").write_text(
+        "Phone_Model,Navy_Color_Accuracy,HDR\n"
+        "iPhone 15 Pro,85,0.5\n"
+        "Pixel 8,88,\n"
+    )
+    return tmp_path
+
+
+def _sources(tree):
+    return list(iter_sources(data_dir=tree / "data", roots=[tree / "research"]))
+
+
+def test_sources_are_named_by_tree(tree):
+    assert [name for name, _ in _sources(tree)] == [
+        "data/intelligence/cultural_regional_nuances",
+        "visual-recognition-gaps/phone_camera_color_distortion",
+    ]
+
+
+def test_records_are_addressable_by_offset(tree):
+    out = tree / "knowledge.snap"
+    header = write_snapshot(out, _sources(tree))
+
+    with Snapshot(out) as snap:
+        assert snap.version == header["version"]
+        nuances = "data/intelligence/cultural_regional_nuances"
+        assert snap.get(nuances, "detroit_regional_styles/Downtown_Detroit") == {
+            "brands": ["Shinola"], "dress_code": "Varies",
+        }
+        assert snap.get(nuances, "key_insights") == ["a", "b"]
+        assert snap.get(nuances)["detroit_regional_styles"]["Suburban_Detroit"]["brands"] == ["Brooks Brothers"]
+
+        phones = "visual-recognition-gaps/phone_camera_color_distortion"
+        assert snap.keys(phones) == ["iPhone 15 Pro", "Pixel 8"]
+        assert snap.get(phones, "iPhone 15 Pro") == {
+            "Phone_Model": "iPhone 15 Pro", "Navy_Color_Accuracy": 85, "HDR": 0.5,
+        }
+        assert snap.get(phones)[1]["HDR"] is None
+
+
+def test_only_plain_decimals_are_typed():
+    assert [_typed(v) for v in ("85", "-3", "0.5", "1e3", "0")] == [85, -3, 0.5, 1000.0, 0]
+    assert [_typed(v) for v in ("007", "1_000", "nan", "inf", "1e999", " 5")] == [
+        "007", "1_000", "nan", "inf", "1e999", " 5",
+    ]
+
+
+def test_non_finite_json_is_skipped(tree):
+    (tree / "data" / "intelligence" / "broken.json").write_text('{"score": NaN}')
+    header = write_snapshot(tree / "knowledge.snap", _sources(tree))
+    assert "data/intelligence/broken" not in header["datasets"]
+    assert "data/intelligence/cultural_regional_nuances" in header["datasets"]
+
+
+def test_unchanged_sources_are_not_repacked(tree):
+    out = tree / "knowledge.snap"
+    first = write_snapshot(out, _sources(tree))
+    mtime = out.stat().st_mtime_ns
+    assert write_snapshot(out, _sources(tree))["version"] == first["version"]
+    assert out.stat().st_mtime_ns == mtime
+
+    (tree / "data" / "intelligence" / "cultural_regional_nuances.json").write_text("{}")
+    assert write_snapshot(out, _sources(tree))["version"] != first["version"]
+    assert read_version(out) != first["version"]
+
+
+def test_rejects_foreign_files(tmp_path):
+    bogus = tmp_path / "bogus.snap"
+    bogus.write_bytes(b"not a snapshot at all")
+    assert read_version(bogus) is None
+    with pytest.raises(BuildError):
+        Snapshot(bogus)
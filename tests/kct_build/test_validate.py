@@ -0,0 +1,66 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from kct_build.artifacts import collect_artifacts  # noqa: E402
+from kct_build.discovery import discover_generators  # noqa: E402
+from kct_build.graph import BuildGraph  # noqa: E402
+from kct_build.schemas import SCHEMAS, choice, integer, rating, table, text  # noqa: E402
+from kct_build.validate import validate_artifact, validate_frame  # noqa: E402
+
+SCHEMA = table("Weather_Pattern", {
+    "Weather_Pattern": text(),
+    "Lead_Time_Days": integer(0, 90),
+    "Inventory_Impact_Score": rating(),
+    "Season": choice("Spring", "Fall"),
+})
+
+
+def test_valid_frame_has_no_violations():
+    df = pd.DataFrame({
+        "Weather_Pattern": ["Cold Snap", "Warm Spell"],
+        "Lead_Time_Days": [7, 14],
+        "Inventory_Impact_Score": [8.5, 6.0],
+        "Season": ["Fall", "Spring"],
+    })
+    assert validate_frame(df, SCHEMA) == []
+
+
+def test_violations_name_column_and_rows():
+    df = pd.DataFrame({
+        "Weather_Pattern": ["Cold Snap", "Cold Snap", "Heat Wave"],
+        "Lead_Time_Days": [7, "soon", 120],
+        "Inventory_Impact_Score": [85, 6.0, 7.5],
+        "Season": ["Fall", "Winter", None],
+        "Extra": [1, 2, 3],
+    })
+    messages = {str(v) for v in validate_frame(df, SCHEMA)}
+    assert "unexpected columns ['Extra']" in messages
+    assert "Weather_Pattern: 2 duplicated key values (rows 0, 1)" in messages
+    assert "Lead_Time_Days: 1 non-numeric values (rows 1)" in messages
+    assert "Lead_Time_Days: 1 values above 90 (max 120) (rows 2)" in messages
+    assert "Inventory_Impact_Score: 1 values above 10 (max 85) (rows 0)" in messages
+    assert "Season: 1 empty values (rows 2)" in messages
+    assert "Season: unknown values ['Winter'] (rows 1)" in messages
+
+
+def test_artifact_lookup_by_file_name(tmp_path):
+    topic = tmp_path / "src" / "Seasonal Micro-Patterns_ Advanced"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('unseasonable_weather_impact.csv')\n")
+    (topic / "unseasonable_weather_impact.csv").write_text(
+        "Weather_Pattern,Purchase_Spike_Percentage,Affected_Categories,"
+        "Lead_Time_Days,Inventory_Impact_Score,Regional_Variation\n"
+        "Cold Snap,85,Outerwear,7,11,6\n"
+    )
+    graph = BuildGraph(discover_generators(roots=[tmp_path / "src"]))
+    [artifact] = collect_artifacts(graph, suffixes=[".csv"])
+
+    [violation] = validate_artifact(artifact)
+    assert artifact.producer.endswith("/script.py")
+    assert violation.column == "Inventory_Impact_Score"
+
+
+def test_every_registered_schema_declares_its_key():
+    for name, schema in SCHEMAS.items():
+        assert schema.key is None or schema.key in schema.columns, name
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from kct_build.discovery import discover_generators
+from kct_build.graph import BuildGraph
+from kct_build.weather import bucket_labels, simulate, write_simulation
+
+WEATHER = [
+    {"Weather_Pattern": "Unexpected Cold Snap", "Purchase_Spike_Percentage": 80,
+     "Affected_Categories": "Outerwear, Wool Suits", "Lead_Time_Days": 3, "Inventory_Impact_Score": 9,
+     "Regional_Variation": 8},
+    {"Weather_Pattern": "Drought Conditions", "Purchase_Spike_Percentage": 40, "Affected_Categories": "Linen",
+     "Lead_Time_Days": 14, "Inventory_Impact_Score": 5, "Regional_Variation": 2},
+]
+
+
+def test_quantiles_track_the_point_estimates():
+    pytest.importorskip("numpy")
+    regions = {"cold": (1.0, {"cold": 1.0, "heat": 0.5, "wet": 0.5, "variable": 0.5}),
+               "warm": (0.1, {"cold": 0.1, "heat": 1.0, "wet": 0.5, "variable": 0.5})}
+    tables = simulate(WEATHER, scenarios=200_000, seed=1, regions=regions)
+
+    cold = tables["cold"]
+    assert cold["outerwear"]["probability"] == pytest.approx(2 / 3, abs=0.01)
+    assert cold["outerwear"]["probability"] + cold["linen"]["probability"] == pytest.approx(1)
+    spike = cold["outerwear"]["lead_times"]["all"]["spike_pct"]
+    assert spike["mean"] == pytest.approx(80, rel=0.02)  # full exposure: mean-preserving
+    assert spike["p5"] < spike["p50"] < spike["p95"] < spike["p99"]
+    narrow = cold["linen"]["lead_times"]["all"]["spike_pct"]
+    assert narrow["p95"] / narrow["p5"] < spike["p95"] / spike["p5"]  # lower Regional_Variation
+    assert set(cold["linen"]["lead_times"]) <= {"all", *bucket_labels()}
+    assert tables["warm"]["outerwear"]["probability"] < 0.2
+    assert tables["warm"]["outerwear"]["lead_times"]["all"]["spike_pct"]["mean"] < 0.5 * spike["mean"]
+
+
+def test_process_pool_matches_serial():
+    pytest.importorskip("numpy")
+    assert simulate(WEATHER, scenarios=5_000, seed=3, workers=2) == simulate(WEATHER, scenarios=5_000, seed=3)
+
+
+def test_written_simulation_matches_simulate(tmp_path):
+    pytest.importorskip("numpy")
+    topic = tmp_path / "src" / "Seasonal"
+    topic.mkdir(parents=True)
+    (topic / "script.py").write_text("df.to_csv('unseasonable_weather_impact.csv')\n")
+    header = list(WEATHER[0])
+    lines = [",".join(header)] + [",".join(f'"{row[col]}"' for col in header) for row in WEATHER]
+    (topic / "unseasonable_weather_impact.csv").write_text("\n".join(lines) + "\n")
+    out = tmp_path / "weather_shocks.json"
+
+    report = write_simulation(BuildGraph(discover_generators(roots=[tmp_path / "src"])), out, scenarios=5_000, seed=3)
+    assert report == json.loads(out.read_text())
+    assert (report["scenarios_per_region"], report["seed"]) == (5_000, 3)
+    assert report["regions"] == json.loads(json.dumps(simulate(WEATHER, scenarios=5_000, seed=3)))